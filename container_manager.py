@@ -5,6 +5,7 @@ Uses subprocess for maximum compatibility on macOS
 """
 
 import asyncio
+import copy
 import logging
 import os
 import json
@@ -60,6 +61,20 @@ class VLLMContainerManager:
         if self.use_sudo:
             logger.info("Container manager initialized with sudo enabled")
     
+    def for_replica(self, index: int) -> "VLLMContainerManager":
+        """
+        Manager for an additional replica of the vLLM service
+        
+        The replica shares the runtime settings but runs in its own container
+        (vllm-service-<index>), so it can be started and stopped independently.
+        
+        Args:
+            index: Replica number (1, 2, ...; the primary container is replica 0)
+        """
+        replica = copy.copy(self)
+        replica.CONTAINER_NAME = f"{self.CONTAINER_NAME}-{index}"
+        return replica
+    
     def get_default_image(self, use_cpu: bool = False) -> str:
         """
         Get the appropriate container image based on environment, platform, and CPU/GPU mode.
@@ -606,17 +621,22 @@ class VLLMContainerManager:
             if not use_cpu:
                 # For NVIDIA GPU support with Podman/Docker
                 # Try CDI (Container Device Interface) first, then fall back to legacy
+                # gpu_devices (e.g. "0" or "2,3") restricts the container to some GPUs
+                gpu_devices = vllm_config.get('gpu_devices')
                 if self.runtime == "docker":
                     # Docker uses --gpus flag
-                    podman_cmd.extend(["--gpus", "all"])
+                    podman_cmd.extend(["--gpus", f'"device={gpu_devices}"' if gpu_devices else "all"])
                 else:
                     # Podman uses --device with CDI
                     # Also add security options needed for GPU access
-                    podman_cmd.extend([
-                        "--device", "nvidia.com/gpu=all",
-                        "--security-opt=label=disable",
-                    ])
-                logger.info("GPU passthrough enabled for container")
+                    for device in (gpu_devices.split(',') if gpu_devices else ["all"]):
+                        podman_cmd.extend(["--device", f"nvidia.com/gpu={device.strip()}"])
+                    podman_cmd.append("--security-opt=label=disable")
+                logger.info(f"GPU passthrough enabled for container (devices: {gpu_devices or 'all'})")
+            elif vllm_config.get('cpuset_cpus'):
+                # Pin the container to some CPUs (e.g. one socket per replica)
+                podman_cmd.extend(["--cpuset-cpus", vllm_config['cpuset_cpus']])
+                logger.info(f"Container pinned to CPUs: {vllm_config['cpuset_cpus']}")
             
             # Add environment variables
             podman_cmd.extend(config['environment'])
@@ -760,7 +780,8 @@ class VLLMContainerManager:
             # Check if container exists
             result = await self._run_podman_cmd_async("ps", "-a", "--filter", f"name={self.CONTAINER_NAME}", "--format", "{{.Names}}", check=False)
             
-            if self.CONTAINER_NAME in result.stdout:
+            # The name filter also matches replica containers (vllm-service-1, ...)
+            if self.CONTAINER_NAME in result.stdout.split():
                 logger.info(f"Stopping container: {self.CONTAINER_NAME}")
                 
                 # Stop container
@@ -799,7 +820,11 @@ class VLLMContainerManager:
             )
             
             if result.returncode == 0 and result.stdout.strip():
-                containers = json.loads(result.stdout)
+                # The name filter also matches replica containers (vllm-service-1, ...)
+                containers = [
+                    c for c in json.loads(result.stdout)
+                    if self.CONTAINER_NAME in (c.get('Names') if isinstance(c.get('Names'), list) else [c.get('Names')])
+                ]
                 if containers:
                     container = containers[0]
                     return {
@@ -859,6 +884,80 @@ class VLLMContainerManager:
             logger.error(f"Error streaming logs: {e}")
             yield f"[ERROR] Failed to stream logs: {e}"
     
+    # Container lifecycle events and whether they leave the container running
+    # (None means the event does not tell us - re-check with get_container_status)
+    EVENT_RUNNING_STATE = {
+        'start': True,
+        'restart': True,
+        'unpause': True,
+        'died': False,
+        'die': False,
+        'stop': False,
+        'kill': False,
+        'pause': False,
+        'remove': False,
+        'destroy': False,
+    }
+    
+    async def watch_events(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Watch lifecycle events of the vLLM container
+        
+        Follows `podman events` filtered to the vLLM container, so callers can
+        track liveness without polling `podman ps`. The generator ends when the
+        events process exits.
+        
+        Yields:
+            Dictionary with 'event'/'status' (start, died, stop, remove, ...),
+            'running' (True/False, or None if the event is not conclusive) and
+            'id' (short container id, None if the runtime didn't report it)
+        """
+        # Podman accepts "json", Docker needs a Go template for JSON lines
+        event_format = "{{json .}}" if self.runtime == "docker" else "json"
+        cmd = [
+            self.runtime, "events",
+            "--filter", f"container={self.CONTAINER_NAME}",
+            "--filter", "type=container",
+            "--format", event_format,
+        ]
+        if self._should_use_sudo():
+            cmd = ["sudo"] + cmd
+        
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                
+                # Podman uses "Status", Docker uses "status"/"Action"
+                action = str(event.get('Status') or event.get('status') or event.get('Action') or '').lower()
+                if not action:
+                    continue
+                
+                # Podman uses "ID", Docker uses "id"
+                container_id = str(event.get('ID') or event.get('id') or '')[:12]
+                yield {
+                    'event': action,
+                    'running': self.EVENT_RUNNING_STATE.get(action),
+                    'status': action,
+                    'id': container_id or None,
+                }
+        finally:
+            if process.returncode is None:
+                process.terminate()
+            await process.wait()
+    
     def close(self):
         """Close any open connections (not needed for CLI-based approach)"""
         pass
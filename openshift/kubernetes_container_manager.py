@@ -4,12 +4,14 @@ Manages vLLM pods in Kubernetes/OpenShift using the Kubernetes Python client
 """
 
 import asyncio
+import copy
 import logging
 import os
 import shlex
+import threading
 import time
 from typing import Optional, Dict, Any, AsyncIterator
-from kubernetes import client, config
+from kubernetes import client, config, watch
 from kubernetes.client.rest import ApiException
 from kubernetes.stream import stream
 
@@ -21,7 +23,10 @@ class VLLMKubernetesManager:
     
     POD_NAME = "vllm-service"
     SERVICE_NAME = "vllm-service"
+    REPLICA_INDEX = 0
     DEFAULT_IMAGE = "quay.io/rh_ee_micyang/vllm-mac:v0.11.0"
+    # Server-side timeout of one watch call; bounds how long the watch thread outlives its consumer
+    WATCH_TIMEOUT = 30
     
     def __init__(self, namespace: Optional[str] = None):
         """
@@ -46,6 +51,36 @@ class VLLMKubernetesManager:
         else:
             logger.info("Using ephemeral model cache (emptyDir)")
         
+    def for_replica(self, index: int) -> "VLLMKubernetesManager":
+        """
+        Manager for an additional replica of the vLLM service
+        
+        Each replica gets its own pod and Service (vllm-service-<index>), so the
+        web UI can address replicas individually instead of through one
+        load-balanced Service.
+        
+        Args:
+            index: Replica number (1, 2, ...; the primary pod is replica 0)
+        """
+        replica = copy.copy(self)
+        replica.POD_NAME = f"{self.POD_NAME}-{index}"
+        replica.SERVICE_NAME = f"{self.SERVICE_NAME}-{index}"
+        replica.REPLICA_INDEX = index
+        return replica
+    
+    @property
+    def pod_labels(self) -> Dict[str, str]:
+        """
+        Labels that select this manager's pod
+        
+        The primary keeps the plain app=vllm selector so pods created before
+        replicas existed stay behind vllm-service. Extra replicas use a
+        different app label so the primary Service never routes to them.
+        """
+        if self.REPLICA_INDEX == 0:
+            return {"app": "vllm"}
+        return {"app": "vllm-replica", "vllm-replica": self.POD_NAME}
+    
     def _get_current_namespace(self) -> str:
         """Get current namespace from service account or environment"""
         # Try to read from service account (when running in cluster)
@@ -334,7 +369,7 @@ class VLLMKubernetesManager:
         metadata = client.V1ObjectMeta(
             name=self.POD_NAME,
             labels={
-                "app": "vllm",
+                **self.pod_labels,
                 "managed-by": "vllm-playground"
             }
         )
@@ -560,6 +595,56 @@ class VLLMKubernetesManager:
             logger.error(f"Error deleting pod: {e}")
             return {'status': 'error', 'error': str(e)}
     
+    def _pod_status(self, pod) -> Dict[str, Any]:
+        """
+        Build a status dictionary (same shape as get_container_status) from a pod object
+        
+        Args:
+            pod: V1Pod returned by the Kubernetes API
+        
+        Returns:
+            Dictionary with pod status info
+        """
+        phase = pod.status.phase
+        
+        # Determine if pod is still "running" (including startup phases)
+        # Check both pod phase AND container states
+        is_running = False
+        container_state = None
+        
+        if phase == 'Running':
+            is_running = True
+        elif phase == 'Pending':
+            # Check container states - could be ContainerCreating, Waiting, etc.
+            if pod.status.container_statuses:
+                for container in pod.status.container_statuses:
+                    if container.state.waiting:
+                        # Container is waiting (ContainerCreating, PullImage, etc.)
+                        container_state = container.state.waiting.reason
+                        # Still starting up - consider as "running"
+                        is_running = True
+                    elif container.state.running:
+                        is_running = True
+                        container_state = "Running"
+            else:
+                # No container statuses yet - pod is initializing
+                is_running = True
+                container_state = "Initializing"
+        elif phase in ['Failed', 'Succeeded', 'Unknown']:
+            # Actually stopped or in error state
+            is_running = False
+        
+        status_detail = f"{phase}"
+        if container_state:
+            status_detail = f"{phase} ({container_state})"
+        
+        return {
+            'running': is_running,
+            'status': status_detail,
+            'id': pod.metadata.uid[:12],
+            'name': pod.metadata.name
+        }
+    
     async def get_container_status(self) -> Dict[str, Any]:
         """
         Get current pod status
@@ -577,45 +662,7 @@ class VLLMKubernetesManager:
                     lambda: api.read_namespaced_pod(name=self.POD_NAME, namespace=self.namespace)
                 )
                 
-                phase = pod.status.phase
-                
-                # Determine if pod is still "running" (including startup phases)
-                # Check both pod phase AND container states
-                is_running = False
-                container_state = None
-                
-                if phase == 'Running':
-                    is_running = True
-                elif phase == 'Pending':
-                    # Check container states - could be ContainerCreating, Waiting, etc.
-                    if pod.status.container_statuses:
-                        for container in pod.status.container_statuses:
-                            if container.state.waiting:
-                                # Container is waiting (ContainerCreating, PullImage, etc.)
-                                container_state = container.state.waiting.reason
-                                # Still starting up - consider as "running"
-                                is_running = True
-                            elif container.state.running:
-                                is_running = True
-                                container_state = "Running"
-                    else:
-                        # No container statuses yet - pod is initializing
-                        is_running = True
-                        container_state = "Initializing"
-                elif phase in ['Failed', 'Succeeded', 'Unknown']:
-                    # Actually stopped or in error state
-                    is_running = False
-                
-                status_detail = f"{phase}"
-                if container_state:
-                    status_detail = f"{phase} ({container_state})"
-                
-                return {
-                    'running': is_running,
-                    'status': status_detail,
-                    'id': pod.metadata.uid[:12],
-                    'name': pod.metadata.name
-                }
+                return self._pod_status(pod)
                 
             except ApiException as e:
                 if e.status == 404:
@@ -774,13 +821,75 @@ class VLLMKubernetesManager:
             logger.error(traceback.format_exc())
             yield f"[ERROR] Failed to stream logs: {e}"
     
+    async def watch_events(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Watch lifecycle events of the vLLM pod
+        
+        Uses the Kubernetes watch API (in a worker thread) so callers can track
+        liveness without polling read_namespaced_pod. Watch calls are kept short
+        (WATCH_TIMEOUT) and renewed until the consumer stops iterating, so the
+        worker thread notices the stop signal within one watch call. The
+        generator ends when the API connection drops.
+        
+        Yields:
+            Dictionary with 'event' (ADDED, MODIFIED, DELETED) plus the pod
+            status fields returned by get_container_status
+        """
+        api = self._get_client()
+        loop = asyncio.get_event_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        pod_watch = watch.Watch()
+        stop_event = threading.Event()
+        
+        def _run_watch():
+            try:
+                while not stop_event.is_set():
+                    for event in pod_watch.stream(
+                        api.list_namespaced_pod,
+                        namespace=self.namespace,
+                        field_selector=f"metadata.name={self.POD_NAME}",
+                        timeout_seconds=self.WATCH_TIMEOUT
+                    ):
+                        if stop_event.is_set():
+                            break
+                        loop.call_soon_threadsafe(queue.put_nowait, event)
+            except Exception as e:
+                if not stop_event.is_set():
+                    loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(queue.put_nowait, finished)
+        
+        loop.run_in_executor(None, _run_watch)
+        
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                
+                event_type = item['type']
+                if event_type == 'DELETED':
+                    status = {'running': False, 'status': 'not_found'}
+                else:
+                    status = self._pod_status(item['object'])
+                
+                yield {'event': event_type, **status}
+        finally:
+            stop_event.set()
+            pod_watch.stop()
+    
     async def _ensure_service(self, port: int = 8000):
         """Create or update Service for vLLM pod"""
         api = self._get_client()
         loop = asyncio.get_event_loop()
         
+        # Select only this manager's pod: each replica has its own Service
         service_spec = client.V1ServiceSpec(
-            selector={"app": "vllm"},
+            selector=self.pod_labels,
             ports=[client.V1ServicePort(port=int(port), target_port=int(port), name="http")],
             type="ClusterIP"
         )
@@ -10,6 +10,10 @@ The vLLM recipes repo structure:
   - Each folder contains multiple .md files, one per model/variant
   - Each .md file contains vLLM serve commands with configuration
 
+The whole repository tree is listed with one git trees API call, recipe
+files are fetched concurrently by blob SHA, and a local cache of ETags and
+already-parsed blobs means an unchanged recipe is never downloaded twice.
+
 Usage:
     python recipes/sync_recipes.py
     
@@ -18,12 +22,16 @@ Or to just check what's available without updating:
 """
 
 import argparse
+import base64
 import json
 import os
 import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 try:
     import requests
@@ -33,13 +41,18 @@ except ImportError:
     print("Warning: 'requests' package not installed. Install with: pip install requests")
 
 # GitHub API configuration
-GITHUB_API_BASE = "https://api.github.com"
+GITHUB_API_BASE = os.environ.get("GITHUB_API_BASE", "https://api.github.com")
 RECIPES_REPO = "vllm-project/recipes"
-RECIPES_URL = f"{GITHUB_API_BASE}/repos/{RECIPES_REPO}/contents"
+RECIPES_REF = "main"
+REQUEST_TIMEOUT = (5, 30)  # (connect, read) seconds
+DEFAULT_WORKERS = 8  # Concurrent GitHub requests
 
 # Local paths
 SCRIPT_DIR = Path(__file__).parent
 CATALOG_FILE = SCRIPT_DIR / "recipes_catalog.json"
+# ETags and parsed recipes from previous runs (outside the package, which may be read-only)
+SYNC_CACHE_FILE = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "vllm-playground" / "recipes_sync_cache.json"
+SYNC_CACHE_VERSION = 1  # Bump when parse_recipe_file output changes
 
 # Category icons mapping (empty - no emojis)
 CATEGORY_ICONS = {}
@@ -50,43 +63,116 @@ def get_github_token() -> Optional[str]:
     return os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
 
 
-def fetch_repo_contents(path: str = "") -> List[Dict[str, Any]]:
-    """Fetch contents of the recipes repository"""
-    if not REQUESTS_AVAILABLE:
-        raise RuntimeError("requests package required. Install with: pip install requests")
-    
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    token = get_github_token()
-    if token:
-        headers["Authorization"] = f"token {token}"
-    
-    url = f"{RECIPES_URL}/{path}" if path else RECIPES_URL
-    response = requests.get(url, headers=headers, timeout=30)
-    response.raise_for_status()
-    return response.json()
-
-
-def fetch_file_content(path: str) -> Optional[str]:
-    """Fetch raw file content from GitHub"""
-    if not REQUESTS_AVAILABLE:
-        return None
+class GitHubClient:
+    """
+    Minimal GitHub REST client for the recipes repository.
     
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    token = get_github_token()
-    if token:
-        headers["Authorization"] = f"token {token}"
+    One pooled session is shared by all worker threads. Listing requests are
+    sent with If-None-Match when a previous ETag is known; GitHub answers
+    304 Not Modified without counting it against the rate limit.
+    """
     
+    def __init__(self, api_base: str = GITHUB_API_BASE, repo: str = RECIPES_REPO,
+                 token: Optional[str] = None, workers: int = DEFAULT_WORKERS,
+                 etags: Optional[Dict[str, Dict[str, Any]]] = None):
+        if not REQUESTS_AVAILABLE:
+            raise RuntimeError("requests package required. Install with: pip install requests")
+        
+        self.base_url = f"{api_base.rstrip('/')}/repos/{repo}"
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(1, workers))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept"] = "application/vnd.github.v3+json"
+        if token:
+            self.session.headers["Authorization"] = f"token {token}"
+        
+        self.etags = etags if etags is not None else {}  # url -> {"etag": ..., "body": ...}
+        self.stats = {"requests": 0, "not_modified": 0}
+        self._lock = threading.Lock()
+    
+    def get_json(self, path: str, conditional: bool = True) -> Any:
+        url = f"{self.base_url}/{path}"
+        headers = {}
+        cached = self.etags.get(url) if conditional else None
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+        
+        response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        with self._lock:
+            self.stats["requests"] += 1
+            if response.status_code == 304 and cached:
+                self.stats["not_modified"] += 1
+                return cached["body"]
+        
+        response.raise_for_status()
+        body = response.json()
+        etag = response.headers.get("ETag")
+        if conditional and etag:
+            with self._lock:
+                self.etags[url] = {"etag": etag, "body": body}
+        return body
+    
+    def list_tree(self, ref: str = RECIPES_REF) -> Optional[List[Dict[str, Any]]]:
+        """Every entry in the repository in one call, or None if GitHub truncated the listing"""
+        tree = self.get_json(f"git/trees/{ref}?recursive=1")
+        if tree.get("truncated"):
+            return None
+        return tree.get("tree", [])
+    
+    def list_contents(self, path: str = "") -> List[Dict[str, Any]]:
+        return self.get_json(f"contents/{path}" if path else "contents")
+    
+    def fetch_blob(self, sha: str) -> str:
+        """File content by blob SHA (blobs are immutable, so no ETag is needed)"""
+        blob = self.get_json(f"git/blobs/{sha}", conditional=False)
+        if blob.get("encoding") == "base64":
+            return base64.b64decode(blob["content"]).decode("utf-8")
+        return blob.get("content", "")
+    
+    def close(self):
+        self.session.close()
+
+
+def load_sync_cache() -> Dict[str, Any]:
+    """Load ETags and parsed recipes from previous syncs"""
+    try:
+        with open(SYNC_CACHE_FILE, "r") as f:
+            cache = json.load(f)
+        if cache.get("version") == SYNC_CACHE_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {"version": SYNC_CACHE_VERSION, "etags": {}, "files": {}}
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON to a temp file in the same directory, then rename it over `path`"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file with mode 0600 - keep the existing file's permissions
+        try:
+            mode = path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def save_sync_cache(cache: Dict[str, Any]) -> None:
     try:
-        url = f"{RECIPES_URL}/{path}"
-        response = requests.get(url, headers=headers, timeout=30)
-        if response.status_code == 200:
-            content_data = response.json()
-            if content_data.get("encoding") == "base64":
-                import base64
-                return base64.b64decode(content_data["content"]).decode("utf-8")
-    except Exception as e:
-        print(f"    Warning: Could not fetch {path}: {e}")
-    return None
+        write_json_atomic(SYNC_CACHE_FILE, cache)
+    except OSError as e:
+        print(f"Warning: Could not save sync cache to {SYNC_CACHE_FILE}: {e}")
 
 
 def parse_vllm_command(content: str) -> Dict[str, Any]:
@@ -322,66 +408,155 @@ def parse_recipe_file(content: str, filename: str, folder_name: str) -> Optional
     return recipe
 
 
-def discover_recipes() -> Dict[str, Any]:
+def list_recipe_files(client: GitHubClient, use_tree: bool = True,
+                      workers: int = DEFAULT_WORKERS) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    List the .md files of every model family directory.
+    
+    Returns {directory: [(filename, blob_sha), ...]}. Uses a single git trees
+    call when possible and falls back to walking the contents API (one
+    directory per worker) if the tree is unavailable or truncated.
+    """
+    files: Dict[str, List[Tuple[str, str]]] = {}
+    
+    tree = None
+    if use_tree:
+        try:
+            tree = client.list_tree()
+        except Exception as e:
+            print(f"Git trees API unavailable ({e}), falling back to contents API")
+        if use_tree and tree is None:
+            print("Repository tree unavailable or truncated, falling back to contents API")
+    
+    if tree is not None:
+        for item in tree:
+            parts = item["path"].split("/")
+            if parts[0].startswith("."):
+                continue
+            if item["type"] == "tree" and len(parts) == 1:
+                files.setdefault(parts[0], [])
+            elif item["type"] == "blob" and len(parts) == 2 and parts[1].lower().endswith(".md"):
+                files.setdefault(parts[0], []).append((parts[1], item["sha"]))
+        return files
+    
+    contents = client.list_contents()
+    model_dirs = [
+        item["name"] for item in contents
+        if item["type"] == "dir" and not item["name"].startswith(".")
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(client.list_contents, dir_name): dir_name for dir_name in model_dirs}
+        for future in as_completed(futures):
+            dir_name = futures[future]
+            try:
+                files[dir_name] = [
+                    (item["name"], item["sha"]) for item in future.result()
+                    if item["type"] == "file" and item["name"].lower().endswith(".md")
+                ]
+            except Exception as e:
+                print(f"    Warning: Could not process {dir_name}: {e}")
+    return files
+
+
+def discover_recipes(workers: int = DEFAULT_WORKERS, use_tree: bool = True, use_cache: bool = True,
+                     api_base: str = GITHUB_API_BASE,
+                     progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
     """
     Discover all available recipes from the GitHub repository.
     Returns a dictionary of discovered model families and their recipes.
+    
+    Args:
+        workers: Maximum number of concurrent GitHub requests
+        use_tree: List the repository with the git trees API (one request)
+        use_cache: Reuse ETags and parsed recipes from previous runs
+        api_base: GitHub API base URL (e.g. a GitHub Enterprise or test server)
+        progress: Called with (files_done, files_total) as recipe files are processed
     """
     discovered = {}
+    cache = load_sync_cache() if use_cache else {"version": SYNC_CACHE_VERSION, "etags": {}, "files": {}}
+    cached_files = cache.get("files", {})
     
     print(f"Fetching recipes from {RECIPES_REPO}...")
     
+    client = GitHubClient(api_base=api_base, token=get_github_token(), workers=workers, etags=cache.get("etags"))
     try:
-        contents = fetch_repo_contents()
-    except Exception as e:
-        print(f"Error fetching repository contents: {e}")
-        return discovered
-    
-    # Filter to directories (model families)
-    model_dirs = [
-        item for item in contents 
-        if item["type"] == "dir" and not item["name"].startswith(".")
-    ]
-    
-    print(f"Found {len(model_dirs)} model directories")
-    
-    for model_dir in model_dirs:
-        dir_name = model_dir["name"]
-        print(f"  Processing: {dir_name}")
-        
         try:
-            # Fetch directory contents to get all .md files
-            dir_contents = fetch_repo_contents(dir_name)
-            
-            # Filter to .md files
-            md_files = [
-                item for item in dir_contents 
-                if item["type"] == "file" and item["name"].lower().endswith('.md')
-            ]
-            
-            print(f"    Found {len(md_files)} .md files")
-            
-            recipes = []
-            for md_file in md_files:
-                filename = md_file["name"]
+            recipe_files = list_recipe_files(client, use_tree=use_tree, workers=workers)
+        except Exception as e:
+            print(f"Error fetching repository contents: {e}")
+            return discovered
+        
+        print(f"Found {len(recipe_files)} model directories")
+        
+        # Unchanged blobs reuse the recipe parsed last time; only new or changed files are fetched
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        to_fetch = []
+        for dir_name, md_files in recipe_files.items():
+            for filename, sha in md_files:
+                file_path = f"{dir_name}/{filename}"
+                entry = cached_files.get(file_path)
+                if entry and entry.get("sha") == sha:
+                    results[file_path] = entry.get("recipe")
+                else:
+                    to_fetch.append((dir_name, filename, sha))
+        
+        total = len(results) + len(to_fetch)
+        done = len(results)
+        print(f"Recipe files: {total} total, {len(results)} unchanged, {len(to_fetch)} to fetch")
+        if progress:
+            progress(done, total)
+        
+        def fetch_and_parse(dir_name: str, filename: str, sha: str) -> Optional[Dict[str, Any]]:
+            content = client.fetch_blob(sha)
+            return parse_recipe_file(content, filename, dir_name)
+        
+        new_files = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(fetch_and_parse, dir_name, filename, sha): (dir_name, filename, sha)
+                for dir_name, filename, sha in to_fetch
+            }
+            for future in as_completed(futures):
+                dir_name, filename, sha = futures[future]
                 file_path = f"{dir_name}/{filename}"
-                
-                # Fetch file content
-                content = fetch_file_content(file_path)
-                if content:
-                    recipe = parse_recipe_file(content, filename, dir_name)
+                try:
+                    recipe = future.result()
+                except Exception as e:
+                    print(f"    Warning: Could not fetch {file_path}: {e}")
+                else:
+                    results[file_path] = recipe
+                    new_files[file_path] = {"sha": sha, "recipe": recipe}
                     if recipe:
-                        recipes.append(recipe)
-                        print(f"      ✓ {filename} -> {recipe['model_id']}")
-            
+                        print(f"      ✓ {file_path} -> {recipe['model_id']}")
+                finally:
+                    # Failed fetches count as processed too, so progress always reaches total
+                    done += 1
+                    if progress:
+                        progress(done, total)
+        
+        # Assemble in directory / file name order
+        for dir_name in sorted(recipe_files):
+            recipes = []
+            for filename, _ in sorted(recipe_files[dir_name]):
+                recipe = results.get(f"{dir_name}/{filename}")
+                if recipe:
+                    recipes.append(recipe)
             discovered[dir_name] = {
                 "name": dir_name,
                 "url": f"https://github.com/{RECIPES_REPO}/tree/main/{dir_name}",
                 "recipes": recipes
             }
-            
-        except Exception as e:
-            print(f"    Warning: Could not process {dir_name}: {e}")
+        
+        print(f"GitHub API requests: {client.stats['requests']} ({client.stats['not_modified']} not modified)")
+        
+        if use_cache:
+            # Keep cache entries only for files that still exist
+            current = {f"{d}/{name}" for d, names in recipe_files.items() for name, _ in names}
+            files = {path: entry for path, entry in cached_files.items() if path in current}
+            files.update(new_files)
+            save_sync_cache({"version": SYNC_CACHE_VERSION, "etags": client.etags, "files": files})
+    finally:
+        client.close()
     
     return discovered
 
@@ -395,10 +570,9 @@ def load_current_catalog() -> Dict[str, Any]:
 
 
 def save_catalog(catalog: Dict[str, Any]) -> None:
-    """Save the recipes catalog"""
-    catalog["metadata"]["last_updated"] = datetime.now().strftime("%Y-%m-%d")
-    with open(CATALOG_FILE, "w") as f:
-        json.dump(catalog, f, indent=2)
+    """Save the recipes catalog (atomically, so readers never see a partial file)"""
+    catalog.setdefault("metadata", {})["last_updated"] = datetime.now().strftime("%Y-%m-%d")
+    write_json_atomic(CATALOG_FILE, catalog)
 
 
 def update_catalog_with_discoveries(
@@ -532,6 +706,10 @@ def print_catalog_summary(catalog: Dict[str, Any]) -> None:
     print(f"Last Updated: {last_updated}")
 
 
+def print_progress(done: int, total: int) -> None:
+    print(f"PROGRESS {done}/{total}", flush=True)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Sync vLLM recipes from GitHub")
     parser.add_argument(
@@ -544,6 +722,37 @@ def main():
         action="store_true", 
         help="Force update existing categories with discovered recipes"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Maximum concurrent GitHub requests (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore ETags and parsed recipes from previous runs"
+    )
+    parser.add_argument(
+        "--no-tree",
+        action="store_true",
+        help="Walk the contents API instead of listing the repository with the git trees API"
+    )
+    parser.add_argument(
+        "--api-base",
+        default=GITHUB_API_BASE,
+        help="GitHub API base URL (default: $GITHUB_API_BASE or https://api.github.com)"
+    )
+    parser.add_argument(
+        "--discoveries-out",
+        metavar="PATH",
+        help="Write the discovered recipes as JSON to PATH instead of updating the catalog"
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Print machine-readable 'PROGRESS done/total' lines while fetching"
+    )
     args = parser.parse_args()
     
     if not REQUESTS_AVAILABLE:
@@ -552,7 +761,13 @@ def main():
         return 1
     
     # Discover recipes from GitHub
-    discovered = discover_recipes()
+    discovered = discover_recipes(
+        workers=args.workers,
+        use_tree=not args.no_tree,
+        use_cache=not args.no_cache,
+        api_base=args.api_base,
+        progress=print_progress if args.progress else None
+    )
     
     if not discovered:
         print("No recipes discovered. Check your network connection or GitHub rate limits.")
@@ -566,6 +781,12 @@ def main():
         print("\n[DRY RUN] No changes made to catalog.")
         return 0
     
+    if args.discoveries_out:
+        # The caller (the Web UI) merges these into the catalog itself
+        write_json_atomic(Path(args.discoveries_out), discovered)
+        print(f"\nDiscoveries written to {args.discoveries_out}")
+        return 0
+    
     # Load and update catalog
     catalog = load_current_catalog()
     updated_catalog, stats = update_catalog_with_discoveries(catalog, discovered, args.force)
@@ -0,0 +1,128 @@
+"""
+Tests for the server-side chat history (ChatSessionStore) behind /api/chat.
+
+The web UI is driven in-process through httpx's ASGI transport, with a small
+aiohttp server standing in for vLLM's /v1/chat/completions.
+"""
+
+import types
+
+import httpx
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from vllm_playground import app as webui
+
+
+@pytest.fixture
+async def vllm(monkeypatch):
+    """A fake vLLM server; set `status` to make it fail, `requests` holds the payloads it got"""
+    state = types.SimpleNamespace(status=200, requests=[])
+
+    async def chat_completions(request):
+        state.requests.append(await request.json())
+        if state.status != 200:
+            return web.Response(status=state.status, text="upstream failure")
+        return web.json_response({
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "hi"}, "finish_reason": "stop"}],
+        })
+
+    server_app = web.Application()
+    server_app.router.add_post("/v1/chat/completions", chat_completions)
+    server = TestServer(server_app, host="127.0.0.1")
+    await server.start_server()
+
+    monkeypatch.setattr(webui, "current_run_mode", "subprocess")
+    monkeypatch.setattr(webui, "vllm_process", types.SimpleNamespace(returncode=None, pid=0))
+    monkeypatch.setattr(webui, "current_config", webui.VLLMConfig(host="127.0.0.1", port=server.port))
+    monkeypatch.setattr(webui, "current_model_identifier", "test-model")
+    monkeypatch.setattr(webui, "chat_sessions", webui.ChatSessionStore())
+    monkeypatch.setattr(webui, "request_scheduler", webui.RequestScheduler(max_in_flight=0))
+    monkeypatch.setattr(webui, "upstream_session", None)
+    yield state
+    if webui.upstream_session is not None:
+        await webui.upstream_session.close()
+    await server.close()
+
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=webui.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://webui") as client:
+        yield client
+
+
+def user(content: str):
+    return {"role": "user", "content": content}
+
+
+def assistant(content: str):
+    return {"role": "assistant", "content": content}
+
+
+async def post_chat(client, history_length, messages, session_id="session-1"):
+    return await client.post("/api/chat", json={
+        "session_id": session_id,
+        "history_length": history_length,
+        "messages": messages,
+        "stream": False,
+    })
+
+
+def make_busy(scheduler):
+    """Make every new request's estimated queue wait exceed the deadline"""
+    scheduler.max_in_flight = 1
+    scheduler.in_flight = 1
+    scheduler.service_time = 60.0
+    scheduler.deadline = 1.0
+
+
+def test_prepare_stores_nothing_until_commit():
+    store = webui.ChatSessionStore()
+    session = store.prepare("s", 0, [user("a")])
+
+    with pytest.raises(webui.ChatSessionMismatchError):
+        store.prepare("s", 1, [user("b")])
+
+    store.commit("s", session)
+    continued = store.prepare("s", 1, [assistant("x"), user("b")])
+    assert [m["content"] for m in continued.messages] == ["a", "x", "b"]
+    # The stored session itself is not modified by prepare()
+    assert [m["content"] for m in store.prepare("s", 1, []).messages] == ["a"]
+
+
+async def test_turns_continue_the_stored_history(vllm, client):
+    response = await post_chat(client, 0, [user("one")])
+    assert response.status_code == 200
+
+    response = await post_chat(client, 1, [assistant("hi"), user("two")])
+    assert response.status_code == 200
+    assert [m["content"] for m in vllm.requests[-1]["messages"]] == ["one", "hi", "two"]
+
+
+async def test_shed_request_leaves_the_session_unchanged(vllm, client):
+    assert (await post_chat(client, 0, [user("one")])).status_code == 200
+
+    make_busy(webui.request_scheduler)
+    response = await post_chat(client, 1, [assistant("hi"), user("two")])
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+    # The server still holds the client's last synced history: a retry is accepted as is
+    webui.request_scheduler.in_flight = 0
+    response = await post_chat(client, 1, [assistant("hi"), user("two")])
+    assert response.status_code == 200
+    assert [m["content"] for m in vllm.requests[-1]["messages"]] == ["one", "hi", "two"]
+
+
+async def test_upstream_error_leaves_the_session_unchanged(vllm, client):
+    assert (await post_chat(client, 0, [user("one")])).status_code == 200
+
+    vllm.status = 500
+    response = await post_chat(client, 1, [assistant("hi"), user("two")])
+    assert response.status_code == 500
+
+    response = await post_chat(client, 3, [user("three")])
+    assert response.status_code == 409
+    assert response.json()["detail"]["history_length"] == 1
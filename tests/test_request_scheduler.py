@@ -0,0 +1,185 @@
+"""
+Tests for the admission control in front of vLLM (RequestScheduler, admit_request).
+
+Most tests hold the only slot, queue requests behind it and then hand the
+slot on, so the order in which waiters are admitted is deterministic.
+"""
+
+import asyncio
+import types
+
+import pytest
+
+from vllm_playground import app as webui
+
+
+async def settle():
+    """Let every runnable task advance to its next await"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def admission_order(scheduler, requests):
+    """
+    Queue `requests` ((client, priority, cost) tuples, in arrival order)
+    behind a held slot and return the clients in the order they were admitted.
+    """
+    holder = await scheduler.acquire("holder")
+    order = []
+
+    async def request(client, priority, cost):
+        admitted = await scheduler.acquire(client, priority, cost)
+        order.append(client)
+        scheduler.release(admitted)
+
+    tasks = []
+    for client, priority, cost in requests:
+        tasks.append(asyncio.create_task(request(client, priority, cost)))
+        await settle()
+    scheduler.release(holder)
+    await asyncio.gather(*tasks)
+    return order
+
+
+def idle_request():
+    """Stand-in for a Starlette request whose client stays connected"""
+    async def receive():
+        await asyncio.Event().wait()
+    return types.SimpleNamespace(receive=receive)
+
+
+async def test_clients_share_slots_fairly():
+    scheduler = webui.RequestScheduler(max_in_flight=1, deadline=5, quantum=100)
+    # A sends a burst before B's requests arrive
+    requests = [("A", "interactive", 100)] * 4 + [("B", "interactive", 100)] * 2
+
+    order = await admission_order(scheduler, requests)
+
+    assert order[:4] == ["A", "B", "A", "B"]
+    assert scheduler.in_flight == 0
+
+
+async def test_expensive_requests_get_fewer_turns():
+    scheduler = webui.RequestScheduler(max_in_flight=1, deadline=5, quantum=100)
+    # Each of A's requests costs as much as two of B's
+    requests = [("A", "interactive", 200)] * 2 + [("B", "interactive", 100)] * 4
+
+    order = await admission_order(scheduler, requests)
+
+    # Both clients get about the same number of tokens: two of B's requests per one of A's
+    assert order == ["B", "A", "B", "B", "A", "B"]
+
+
+async def test_batch_never_runs_ahead_of_interactive():
+    scheduler = webui.RequestScheduler(max_in_flight=1, deadline=5)
+    requests = [("batch-1", "batch", 1), ("batch-2", "batch", 1),
+                ("interactive-1", "interactive", 1), ("interactive-2", "interactive", 1)]
+
+    order = await admission_order(scheduler, requests)
+
+    assert order == ["interactive-1", "interactive-2", "batch-1", "batch-2"]
+
+
+async def test_queue_deadline_raises_busy_with_retry_after():
+    scheduler = webui.RequestScheduler(max_in_flight=1, deadline=0.05)
+    scheduler.service_time = 2.5
+    holder = await scheduler.acquire("holder")
+
+    with pytest.raises(webui.SchedulerBusyError) as excinfo:
+        await scheduler.acquire("late")
+
+    # One request ahead (the holder) at 2.5s per slot
+    assert excinfo.value.retry_after == 3
+    assert excinfo.value.to_http().headers == {"Retry-After": "3"}
+    assert scheduler.stats()["queue_depth"] == 0
+    assert scheduler.timed_out == 1
+    scheduler.release(holder)
+    assert scheduler.in_flight == 0
+
+
+async def test_check_sheds_when_estimated_wait_exceeds_deadline():
+    scheduler = webui.RequestScheduler(max_in_flight=1, deadline=5)
+    scheduler.service_time = 10.0
+    await scheduler.acquire("holder")
+
+    with pytest.raises(webui.SchedulerBusyError) as excinfo:
+        scheduler.check("interactive")
+
+    assert excinfo.value.retry_after == 10
+    assert scheduler.shed == 1
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = webui.RequestScheduler(max_in_flight=1, deadline=5)
+    holder = await scheduler.acquire("holder")
+    waiter = asyncio.create_task(scheduler.acquire("waiter"))
+    await settle()
+
+    waiter.cancel()
+    await settle()
+
+    assert scheduler.stats()["queue_depth"] == 0
+    scheduler.release(holder)
+    assert scheduler.in_flight == 0
+
+
+async def test_slot_granted_to_a_cancelled_waiter_is_not_leaked():
+    scheduler = webui.RequestScheduler(max_in_flight=1, deadline=5)
+    holder = await scheduler.acquire("holder")
+    waiter = asyncio.create_task(scheduler.acquire("waiter"))
+    await settle()
+
+    # The slot goes to the waiter, which is cancelled before it resumes
+    scheduler.release(holder)
+    waiter.cancel()
+    await settle()
+
+    # Either the cancellation won and the slot was passed on, or the waiter
+    # got the slot (asyncio.wait_for before Python 3.12) and returns it normally
+    if not waiter.cancelled():
+        scheduler.release(waiter.result())
+    assert scheduler.in_flight == 0
+    assert scheduler.stats()["queue_depth"] == 0
+
+
+async def test_slot_is_released_only_once():
+    scheduler = webui.RequestScheduler(max_in_flight=2, deadline=5)
+    slot = await scheduler.admit("a")
+    await scheduler.admit("b")
+
+    slot.release()
+    slot.release()
+
+    assert scheduler.in_flight == 1
+
+
+async def test_request_joining_a_shared_call_gives_its_slot_back(monkeypatch):
+    scheduler = webui.RequestScheduler(max_in_flight=1, deadline=5)
+    flights = webui.SingleFlight()
+    monkeypatch.setattr(webui, "request_scheduler", scheduler)
+    monkeypatch.setattr(webui, "single_flight", flights)
+    holder = await scheduler.acquire("holder")
+
+    admission = asyncio.create_task(
+        webui.admit_request(idle_request(), "follower", "interactive", 1, flight_key="key")
+    )
+    await settle()
+
+    # An identical call starts while the request is still queued
+    finish = asyncio.Event()
+
+    async def source():
+        await finish.wait()
+        yield b"done"
+
+    flights.join("key", source)
+    scheduler.release(holder)
+    service_time = scheduler.service_time
+
+    assert await admission is None
+    assert scheduler.in_flight == 0
+    # The given-back slot carried no upstream request, so it doesn't count as service time
+    assert scheduler.service_time == service_time
+    assert scheduler.admitted == 2
+    finish.set()
+    await settle()
@@ -0,0 +1,124 @@
+"""
+Tests for request coalescing (SharedCall, SingleFlight).
+
+The upstream calls are async generators driven by events, so a test decides
+exactly when each chunk is produced relative to the subscribers.
+"""
+
+import asyncio
+
+import pytest
+
+from vllm_playground import app as webui
+
+
+async def settle():
+    """Let every runnable task advance to its next await"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class Upstream:
+    """A fake upstream call: yields `first`, then waits for `resume` before yielding `rest`"""
+
+    def __init__(self, first=(b"a",), rest=(b"b",), error=None):
+        self.first = first
+        self.rest = rest
+        self.error = error
+        self.resume = asyncio.Event()
+        self.started = 0
+        self.cancelled = False
+
+    async def stream(self):
+        self.started += 1
+        try:
+            for chunk in self.first:
+                yield chunk
+            await self.resume.wait()
+            for chunk in self.rest:
+                yield chunk
+            if self.error is not None:
+                raise self.error
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+async def collect(call):
+    return [chunk async for chunk in call.subscribe(webui.DisconnectWatcher(None))]
+
+
+async def test_late_subscriber_gets_the_chunks_it_missed():
+    flights = webui.SingleFlight()
+    upstream = Upstream(first=(b"a", b"b"), rest=(b"c",))
+    leader = asyncio.create_task(collect(flights.join("key", upstream.stream)))
+    await settle()
+
+    # Joins after a and b were produced
+    follower = asyncio.create_task(collect(flights.join("key", upstream.stream)))
+    await settle()
+    upstream.resume.set()
+
+    assert await leader == [b"a", b"b", b"c"]
+    assert await follower == [b"a", b"b", b"c"]
+    assert upstream.started == 1
+    assert flights.stats()["coalesced"] == 1
+    assert "key" not in flights
+
+
+async def test_upstream_is_cancelled_when_the_last_subscriber_leaves():
+    flights = webui.SingleFlight()
+    upstream = Upstream()
+    call = flights.join("key", upstream.stream)
+    first = call.subscribe(webui.DisconnectWatcher(None))
+    second = call.subscribe(webui.DisconnectWatcher(None))
+    assert await first.__anext__() == b"a"
+    assert await second.__anext__() == b"a"
+
+    await first.aclose()
+    await settle()
+    assert not upstream.cancelled
+
+    await second.aclose()
+    await settle()
+    assert upstream.cancelled
+    assert "key" not in flights
+
+
+async def test_upstream_error_is_raised_in_every_subscriber():
+    flights = webui.SingleFlight()
+    upstream = Upstream(error=RuntimeError("vLLM went away"))
+    subscribers = [asyncio.create_task(collect(flights.join("key", upstream.stream))) for _ in range(3)]
+    await settle()
+    upstream.resume.set()
+
+    results = await asyncio.gather(*subscribers, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) and str(result) == "vLLM went away" for result in results)
+    assert upstream.started == 1
+    assert "key" not in flights
+
+
+async def test_fetch_shares_one_response_and_its_error():
+    flights = webui.SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def start():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return b'{"ok":true}'
+
+    fetches = [asyncio.create_task(flights.fetch("key", start, None)) for _ in range(2)]
+    await settle()
+    release.set()
+    assert await asyncio.gather(*fetches) == [b'{"ok":true}', b'{"ok":true}']
+    assert calls == 1
+
+    async def failing():
+        raise webui.HTTPException(status_code=502, detail="bad gateway")
+
+    with pytest.raises(webui.HTTPException) as excinfo:
+        await flights.fetch("other", failing, None)
+    assert excinfo.value.status_code == 502
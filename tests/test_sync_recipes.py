@@ -0,0 +1,208 @@
+"""
+Tests for recipes/sync_recipes.py against a local fake GitHub API server.
+
+The fake server serves a git tree and blobs for a small repository, answers
+conditional requests with 304 Not Modified and records every request, so the
+tests can check which GitHub calls a sync makes.
+"""
+
+import base64
+import hashlib
+import importlib.util
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+SYNC_SCRIPT = Path(__file__).resolve().parent.parent / "recipes" / "sync_recipes.py"
+REPO_PATH = "/repos/vllm-project/recipes"
+
+
+def load_sync_module():
+    """Import recipes/sync_recipes.py (the recipes directory is not a package)"""
+    spec = importlib.util.spec_from_file_location("sync_recipes_under_test", SYNC_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def blob_sha(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class FakeGitHub:
+    """Serves a repository of {path: content} the way the GitHub REST API does"""
+
+    def __init__(self, files):
+        self.files = dict(files)
+        self.requests = []  # (path, status) of every request
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def api_base(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tree(self):
+        dirs = sorted({path.split("/")[0] for path in self.files})
+        return {
+            "truncated": False,
+            "tree": [{"path": d, "type": "tree", "sha": blob_sha(d)} for d in dirs] + [
+                {"path": path, "type": "blob", "sha": blob_sha(content)}
+                for path, content in sorted(self.files.items())
+            ],
+        }
+
+    def blob(self, sha: str):
+        for content in self.files.values():
+            if blob_sha(content) == sha:
+                return {"encoding": "base64", "content": base64.b64encode(content.encode("utf-8")).decode()}
+        return None
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path.startswith(f"{REPO_PATH}/git/trees/"):
+                    body = fake.tree()
+                elif path.startswith(f"{REPO_PATH}/git/blobs/"):
+                    body = fake.blob(path.rsplit("/", 1)[1])
+                else:
+                    body = None
+
+                if body is None:
+                    self._send(path, 404, b"{}")
+                    return
+
+                data = json.dumps(body).encode("utf-8")
+                etag = f'"{hashlib.md5(data).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(path, 304, b"", etag)
+                else:
+                    self._send(path, 200, data, etag)
+
+            def _send(self, path, status, data, etag=None):
+                with fake._lock:
+                    fake.requests.append((path, status))
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag)
+                if data:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def take_requests(self):
+        """Requests made since the last call, as (kind, status) pairs"""
+        with self._lock:
+            requests, self.requests = self.requests, []
+        return [(path[len(REPO_PATH) + 1:].split("/")[1], status) for path, status in requests]
+
+
+FILES = {
+    "Qwen/Qwen3.md": "# Qwen3\n\nvllm serve Qwen/Qwen3-8B --tensor-parallel-size 2\n",
+    "Llama/Llama3.md": "# Llama 3\n\nvllm serve meta-llama/Llama-3.1-8B-Instruct\n",
+    "Llama/README.txt": "not a recipe",
+    ".github/workflow.md": "ignored",
+}
+
+
+@pytest.fixture
+def github():
+    fake = FakeGitHub(FILES)
+    fake.thread.start()
+    yield fake
+    fake.server.shutdown()
+    fake.server.server_close()
+
+
+@pytest.fixture
+def sync(tmp_path, monkeypatch):
+    module = load_sync_module()
+    monkeypatch.setattr(module, "SYNC_CACHE_FILE", tmp_path / "recipes_sync_cache.json")
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    monkeypatch.delenv("GH_TOKEN", raising=False)
+    return module
+
+
+def test_client_sends_conditional_requests(github, sync):
+    client = sync.GitHubClient(api_base=github.api_base)
+    try:
+        first = client.list_tree()
+        second = client.list_tree()
+        content = client.fetch_blob(blob_sha(FILES["Qwen/Qwen3.md"]))
+    finally:
+        client.close()
+
+    assert second == first
+    assert content == FILES["Qwen/Qwen3.md"]
+    assert github.take_requests() == [("trees", 200), ("trees", 304), ("blobs", 200)]
+    assert client.stats == {"requests": 3, "not_modified": 1}
+
+
+def test_first_sync_fetches_tree_and_recipe_blobs(github, sync):
+    progress = []
+    discovered = sync.discover_recipes(api_base=github.api_base, progress=lambda done, total: progress.append((done, total)))
+
+    requests = github.take_requests()
+    assert requests[0] == ("trees", 200)
+    # Only the two recipe .md files are downloaded (no README, no dot-directories)
+    assert sorted(requests[1:]) == [("blobs", 200), ("blobs", 200)]
+
+    assert sorted(discovered) == ["Llama", "Qwen"]
+    assert [r["model_id"] for r in discovered["Qwen"]["recipes"]] == ["Qwen/Qwen3-8B"]
+    assert [r["model_id"] for r in discovered["Llama"]["recipes"]] == ["meta-llama/Llama-3.1-8B-Instruct"]
+    assert progress[-1] == (2, 2)
+
+
+def test_resync_without_changes_is_a_single_not_modified_request(github, sync):
+    first = sync.discover_recipes(api_base=github.api_base)
+    github.take_requests()
+
+    second = sync.discover_recipes(api_base=github.api_base)
+
+    assert github.take_requests() == [("trees", 304)]
+    assert second == first
+
+
+def test_resync_fetches_only_the_changed_blob(github, sync):
+    sync.discover_recipes(api_base=github.api_base)
+    github.take_requests()
+
+    changed = FILES["Qwen/Qwen3.md"].replace("Qwen/Qwen3-8B", "Qwen/Qwen3-32B")
+    github.files["Qwen/Qwen3.md"] = changed
+    discovered = sync.discover_recipes(api_base=github.api_base)
+
+    assert github.take_requests() == [("trees", 200), ("blobs", 200)]
+    assert [r["model_id"] for r in discovered["Qwen"]["recipes"]] == ["Qwen/Qwen3-32B"]
+    assert [r["model_id"] for r in discovered["Llama"]["recipes"]] == ["meta-llama/Llama-3.1-8B-Instruct"]
+
+
+def test_progress_reaches_total_when_a_fetch_fails(github, sync, monkeypatch):
+    original_fetch_blob = sync.GitHubClient.fetch_blob
+    broken_sha = blob_sha(FILES["Llama/Llama3.md"])
+
+    def fetch_blob(self, sha):
+        if sha == broken_sha:
+            raise RuntimeError("boom")
+        return original_fetch_blob(self, sha)
+
+    monkeypatch.setattr(sync.GitHubClient, "fetch_blob", fetch_blob)
+    progress = []
+    discovered = sync.discover_recipes(api_base=github.api_base, progress=lambda done, total: progress.append((done, total)))
+
+    # Reported once up front and once per file, including the failed one
+    assert progress == [(0, 2), (1, 2), (2, 2)]
+    assert discovered["Llama"]["recipes"] == []
+    assert [r["model_id"] for r in discovered["Qwen"]["recipes"]] == ["Qwen/Qwen3-8B"]
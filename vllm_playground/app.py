@@ -5,19 +5,36 @@ CONTAINERIZED VERSION - Uses Podman to run vLLM in containers
 import asyncio
 import json
 import logging
+import math
 import os
+import random
 import sys
 import subprocess
+import mmap
+import struct
 import tempfile
+import threading
+import uuid
+import copy
+import gzip
+import hashlib
 import shutil
+import socket
+import time
+import re
+from array import array
+from stat import S_ISREG
+from collections import deque
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Literal, Union
+from typing import Optional, List, Dict, Any, Literal, Union, Tuple, Callable, AsyncIterator, Awaitable
 from pathlib import Path
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
+import aiohttp
 import uvicorn
 
 # Setup logging (must be before imports that use logger)
@@ -36,25 +53,409 @@ except ImportError:
     CONTAINER_MODE_AVAILABLE = False
     logger.warning("container_manager not available - container mode will be disabled")
 
+# Brotli compression for cached responses (optional - gzip is always available)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
 app = FastAPI(title="vLLM Playground", version="1.0.0")
 
 # Get base directory
 BASE_DIR = Path(__file__).parent
 
+ASSET_HASH_LENGTH = 12  # hex digits of the sha256 content hash in `?v=` asset URLs
+
+
+def asset_hash(data: bytes) -> str:
+    """Content hash used to version asset URLs (`?v=<hash>`)"""
+    return hashlib.sha256(data).hexdigest()[:ASSET_HASH_LENGTH]
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves compressed text assets and long-lived caching for versioned URLs.
+    
+    A `.br` or `.gz` file next to the asset is used for plain GET requests when
+    present and up to date; otherwise the compressed variant is built once (in a
+    worker thread) and kept in memory. URLs carrying a `?v=<content hash>` (see
+    IndexPage) are immutable, but only while the hash matches the file: a stale
+    or made-up version must not pin old content in browser caches.
+    """
+    
+    COMPRESSIBLE_SUFFIXES = {'.js', '.css', '.html', '.svg', '.json', '.map', '.txt'}
+    IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._compressed: Dict[tuple, bytes] = {}  # (path, coding, mtime_ns, size) -> body
+        self._hashes: Dict[str, tuple] = {}  # path -> ((mtime_ns, size), content hash)
+    
+    def _current_hash(self, path: str) -> Optional[str]:
+        """Content hash of the file served for `path`, or None if there is no such file"""
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not S_ISREG(stat_result.st_mode):
+            return None
+        signature = (stat_result.st_mtime_ns, stat_result.st_size)
+        cached = self._hashes.get(full_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with open(full_path, 'rb') as f:
+            digest = asset_hash(f.read())
+        self._hashes[full_path] = (signature, digest)
+        return digest
+    
+    def _compress(self, path: str, coding: str, stat_result: os.stat_result) -> bytes:
+        key = (path, coding, stat_result.st_mtime_ns, stat_result.st_size)
+        body = self._compressed.get(key)
+        if body is not None:
+            return body
+        
+        sibling = f"{path}.{'br' if coding == 'br' else 'gz'}"
+        try:
+            if os.stat(sibling).st_mtime_ns >= stat_result.st_mtime_ns:
+                with open(sibling, 'rb') as f:
+                    body = f.read()
+        except OSError:
+            pass
+        
+        if body is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if coding == 'br':
+                body = brotli.compress(data, quality=11)
+            else:
+                body = gzip.compress(data, compresslevel=9, mtime=0)
+        
+        # Drop variants of older versions of this file
+        for old_key in [k for k in self._compressed if k[0] == path and k[1] == coding]:
+            del self._compressed[old_key]
+        self._compressed[key] = body
+        return body
+    
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        
+        query = scope.get("query_string", b"").decode("latin-1")
+        version = next((param[2:] for param in query.split("&") if param.startswith("v=")), None)
+        if version is not None and response.status_code in (200, 304):
+            if version == await asyncio.to_thread(self._current_hash, path):
+                response.headers["Cache-Control"] = self.IMMUTABLE_CACHE_CONTROL
+            else:
+                response.headers["Cache-Control"] = "no-cache"
+        
+        if not isinstance(response, FileResponse) or response.status_code != 200:
+            return response
+        if Path(response.path).suffix.lower() not in self.COMPRESSIBLE_SUFFIXES:
+            return response
+        
+        response.headers["Vary"] = "Accept-Encoding"
+        request = Request(scope)
+        # FileResponse answers HEAD and Range requests from the file itself; only plain GETs get a compressed body
+        if request.method != "GET" or "range" in request.headers:
+            return response
+        accepted = parse_accept_encoding(request.headers.get("accept-encoding", ""))
+        coding = None
+        if BROTLI_AVAILABLE and accepted.get("br", 0) > 0:
+            coding = "br"
+        elif accepted.get("gzip", 0) > 0:
+            coding = "gzip"
+        if coding is None:
+            return response
+        
+        stat_result = os.stat(response.path)
+        body = await asyncio.to_thread(self._compress, str(response.path), coding, stat_result)
+        headers = {
+            key: value for key, value in response.headers.items()
+            if key.lower() not in ("content-length", "etag")
+        }
+        headers["Content-Encoding"] = coding
+        # Weak ETag: same resource, different encoding (If-None-Match compares weakly)
+        headers["ETag"] = f"W/{response.headers['etag']}"
+        return Response(content=body, media_type=response.media_type, headers=headers)
+
+
 # Mount static files (must be before routes)
-app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
-app.mount("/assets", StaticFiles(directory=str(BASE_DIR / "assets")), name="assets")
+app.mount("/static", PrecompressedStaticFiles(directory=str(BASE_DIR / "static")), name="static")
+app.mount("/assets", PrecompressedStaticFiles(directory=str(BASE_DIR / "assets")), name="assets")
 
 # Global state
 container_id: Optional[str] = None  # Container ID (for container mode)
 vllm_process: Optional[asyncio.subprocess.Process] = None  # Process (for subprocess mode)
 vllm_running: bool = False
 current_run_mode: Optional[str] = None  # Track current run mode
-log_queue: asyncio.Queue = asyncio.Queue()
-websocket_connections: List[WebSocket] = []
 latest_vllm_metrics: Dict[str, Any] = {}  # Store latest metrics from logs
 metrics_timestamp: Optional[datetime] = None  # Track when metrics were last updated
 current_model_identifier: Optional[str] = None  # Track the actual model identifier passed to vLLM
+upstream_session: Optional[aiohttp.ClientSession] = None  # Shared HTTP client for all vLLM calls
+
+# Upstream (vLLM) HTTP client settings
+# One pooled session is shared by chat, completion, health, metrics and benchmark calls,
+# so connections to vLLM are kept alive instead of being re-established per request.
+UPSTREAM_POOL_SIZE = int(os.environ.get("WEBUI_UPSTREAM_POOL_SIZE", "100"))
+UPSTREAM_KEEPALIVE_TIMEOUT = float(os.environ.get("WEBUI_UPSTREAM_KEEPALIVE", "30"))
+UPSTREAM_DNS_TTL = int(os.environ.get("WEBUI_UPSTREAM_DNS_TTL", "300"))  # Caches *.svc.cluster.local lookups
+
+# Per-route timeouts for upstream requests
+UPSTREAM_TIMEOUTS: Dict[str, aiohttp.ClientTimeout] = {
+    "chat_stream": aiohttp.ClientTimeout(total=300, connect=10, sock_read=30),
+    "chat": aiohttp.ClientTimeout(total=60, connect=10),
+    "completion": aiohttp.ClientTimeout(total=60, connect=10),
+    "health": aiohttp.ClientTimeout(total=3),
+    "metrics": aiohttp.ClientTimeout(total=2),
+    "benchmark": aiohttp.ClientTimeout(total=60, connect=10),
+    "debug": aiohttp.ClientTimeout(total=5),
+}
+JSON_HEADERS = {"Content-Type": "application/json"}  # For request bodies serialized up front
+
+# Streaming chat proxy
+# Upstream SSE bytes are forwarded to the browser unchanged (no decode, no JSON parsing).
+# For debugging, this fraction of streams (0-1) is additionally parsed and logged.
+CHAT_STREAM_INSPECT_RATE = float(os.environ.get("WEBUI_CHAT_STREAM_INSPECT_RATE", "0"))
+
+
+def get_upstream_session() -> aiohttp.ClientSession:
+    """
+    Get the shared upstream HTTP session, creating it on first use.
+    
+    The session is normally created on application startup and closed on shutdown;
+    lazy creation covers code paths that run before startup (e.g. tests, scripts).
+    """
+    global upstream_session
+    
+    if upstream_session is None or upstream_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=UPSTREAM_POOL_SIZE,
+            limit_per_host=UPSTREAM_POOL_SIZE,
+            keepalive_timeout=UPSTREAM_KEEPALIVE_TIMEOUT,
+            use_dns_cache=True,
+            ttl_dns_cache=UPSTREAM_DNS_TTL,
+        )
+        upstream_session = aiohttp.ClientSession(connector=connector)
+        logger.info(
+            f"Upstream HTTP client created (pool size: {UPSTREAM_POOL_SIZE}, "
+            f"keep-alive: {UPSTREAM_KEEPALIVE_TIMEOUT}s, DNS TTL: {UPSTREAM_DNS_TTL}s)"
+        )
+    
+    return upstream_session
+
+
+class ClientDisconnectedError(Exception):
+    """The browser went away before the upstream (vLLM) request finished"""
+
+
+class DisconnectWatcher:
+    """
+    Aborts upstream requests as soon as the client of the current request disconnects.
+    
+    Steps awaited through `run()` are cancelled on disconnect, and a response
+    registered with `attach()` is closed, which drops the connection to vLLM.
+    vLLM then aborts the sequence and frees its KV cache blocks and batch
+    slot instead of generating up to max_tokens for nobody.
+    
+    Without a request (an upstream call shared by several clients, see
+    SharedCall) nothing is watched; the shared call is cancelled instead.
+    """
+    
+    def __init__(self, http_request: Optional[Request]):
+        self.http_request = http_request
+        self.disconnected = False
+        self._response: Optional[aiohttp.ClientResponse] = None
+        self._pending: set = set()
+        self._task = asyncio.create_task(self._watch()) if http_request is not None else None
+    
+    async def _watch(self):
+        # The request body has been read, so the next ASGI message is the disconnect
+        while (await self.http_request.receive())["type"] != "http.disconnect":
+            pass
+        self.disconnected = True
+        for task in self._pending:
+            task.cancel()
+        if self._response is not None:
+            self._response.close()
+    
+    async def run(self, awaitable):
+        """Await an upstream step; raises ClientDisconnectedError if the client leaves first"""
+        task = asyncio.ensure_future(awaitable)
+        self._pending.add(task)
+        try:
+            return await task
+        except (asyncio.CancelledError, aiohttp.ClientError):
+            if self.disconnected:
+                raise ClientDisconnectedError() from None
+            raise
+        finally:
+            self._pending.discard(task)
+    
+    def attach(self, response: aiohttp.ClientResponse) -> aiohttp.ClientResponse:
+        """Close `response` (its upstream connection) if the client disconnects"""
+        self._response = response
+        if self.disconnected:
+            response.close()
+        return response
+    
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+@app.on_event("startup")
+async def startup_upstream_client():
+    """Create the shared upstream HTTP client"""
+    get_upstream_session()
+
+
+@app.on_event("shutdown")
+async def shutdown_upstream_client():
+    """Close the shared upstream HTTP client"""
+    global upstream_session
+    
+    if upstream_session is not None and not upstream_session.closed:
+        await upstream_session.close()
+        logger.info("Upstream HTTP client closed")
+    upstream_session = None
+
+
+# Container liveness cache settings
+# How long a container status stays valid when no event stream is available (seconds)
+LIVENESS_TTL = float(os.environ.get("WEBUI_LIVENESS_TTL", "5"))
+# How long a container status stays valid while container events are being followed (seconds)
+LIVENESS_EVENT_TTL = float(os.environ.get("WEBUI_LIVENESS_EVENT_TTL", "60"))
+
+
+class ContainerLivenessTracker:
+    """
+    Cached, event-driven view of the vLLM container (or pod) liveness.
+    
+    Request handlers read the cached status instead of running `podman ps`
+    (or a Kubernetes API call) on every request. A background task follows
+    the container manager's lifecycle events and updates the cached status
+    as soon as the container starts or stops. The TTL bounds how stale the
+    status can get when the event stream is unavailable.
+    """
+    
+    def __init__(self, manager, ttl: float = LIVENESS_TTL, event_ttl: float = LIVENESS_EVENT_TTL):
+        self.manager = manager
+        self.ttl = ttl
+        self.event_ttl = event_ttl
+        self._status: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._watching = False  # True while the event stream is connected
+    
+    def _is_fresh(self) -> bool:
+        if self._status is None:
+            return False
+        ttl = self.event_ttl if self._watching else self.ttl
+        return (time.monotonic() - self._checked_at) < ttl
+    
+    def set_status(self, status: Dict[str, Any]):
+        """Store a known container status (e.g. from an event or after start/stop)"""
+        self._status = status
+        self._checked_at = time.monotonic()
+    
+    def apply_event(self, event: Dict[str, Any]):
+        """
+        Merge a lifecycle event into the cached status.
+        
+        Events only carry the fields that changed (running/status, sometimes
+        the id), so the rest of the cached status (name, id, ...) is kept.
+        Without a cached status the next read queries the container manager.
+        """
+        if self._status is None:
+            self.invalidate()
+            return
+        fields = {k: v for k, v in event.items() if k != 'event' and v is not None}
+        self.set_status({**self._status, **fields})
+    
+    def invalidate(self):
+        """Force the next read to query the container manager"""
+        self._status = None
+    
+    async def get_status(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Get the container status, refreshing it only when the cache is stale.
+        
+        Concurrent callers share a single refresh, so a burst of requests
+        still results in at most one `podman ps` call.
+        
+        Args:
+            force: Bypass the cache and query the container manager
+        """
+        if self.manager is None:
+            return {'running': False, 'status': 'unavailable'}
+        
+        self._ensure_watching()
+        
+        if not force and self._is_fresh():
+            return self._status
+        
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return await asyncio.shield(self._refresh_task)
+    
+    async def _refresh(self) -> Dict[str, Any]:
+        status = await self.manager.get_container_status()
+        self.set_status(status)
+        return status
+    
+    def _ensure_watching(self):
+        if not hasattr(self.manager, 'watch_events'):
+            return
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch())
+    
+    async def _watch(self):
+        """Follow container events, reconnecting with backoff when the stream ends"""
+        backoff = 1.0
+        while True:
+            try:
+                async for event in self.manager.watch_events():
+                    self._watching = True
+                    backoff = 1.0
+                    if event.get('running') is None:
+                        # Event doesn't tell us the state - re-check on next read
+                        self.invalidate()
+                    else:
+                        self.apply_event(event)
+                    logger.debug(f"Container event: {event.get('event')} (running: {event.get('running')})")
+            except asyncio.CancelledError:
+                self._watching = False
+                raise
+            except FileNotFoundError as e:
+                # Container runtime not installed - rely on the TTL cache only
+                logger.info(f"Container events unavailable ({e}) - using TTL-based status cache")
+                self._watching = False
+                return
+            except Exception as e:
+                logger.debug(f"Container event stream error: {e}")
+            
+            self._watching = False
+            self.invalidate()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+    
+    async def stop(self):
+        """Stop following container events"""
+        if self._watch_task is not None and not self._watch_task.done():
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._watch_task = None
+        self._watching = False
+
+
+container_liveness = ContainerLivenessTracker(container_manager if CONTAINER_MODE_AVAILABLE else None)
+
+
+@app.on_event("shutdown")
+async def shutdown_liveness_tracker():
+    """Stop following container events"""
+    await container_liveness.stop()
 
 
 class VLLMConfig(BaseModel):
@@ -97,6 +498,11 @@ class VLLMConfig(BaseModel):
     # Options: llama3_json (Llama 3.x), mistral (Mistral), hermes (NousResearch Hermes),
     #          internlm (InternLM), granite-20b-fc (IBM Granite), pythonic (experimental)
     tool_call_parser: Optional[str] = None  # None = auto-detect based on model name
+    # Backend pool: extra replicas of the same model on the following ports (port + 1, ...), see BackendPool
+    replicas: int = Field(default=1, ge=1, le=16)
+    # Devices of each replica: CUDA_VISIBLE_DEVICES values in GPU mode (e.g. ["0", "1"]),
+    # CPU ranges in CPU mode (e.g. ["0-31", "32-63"] for one replica per socket)
+    replica_devices: Optional[List[str]] = None
 
 
 def detect_tool_call_parser(model_name: str) -> Optional[str]:
@@ -250,6 +656,16 @@ class BenchmarkConfig(BaseModel):
     prompt_tokens: int = 100
     output_tokens: int = 100
     use_guidellm: bool = False  # Toggle between built-in and GuideLLM
+    # Built-in benchmark load generation
+    # "open": requests arrive at request_rate regardless of completions (measures batching throughput)
+    # "closed": `concurrency` workers each send the next request when the previous one completes
+    load_mode: Literal["open", "closed"] = "open"
+    concurrency: int = 32  # Closed loop: number of workers
+    # Open loop: arrivals beyond this many requests in flight are dropped and counted (None = no cap)
+    max_in_flight: Optional[int] = Field(default=None, ge=1)
+    arrival_distribution: Literal["poisson", "constant"] = "poisson"  # Open-loop inter-arrival times
+    duration_s: Optional[float] = None  # Stop dispatching new requests after this many seconds
+    stream: bool = True  # Stream responses to measure TTFT / inter-token latency
 
 
 class BenchmarkResults(BaseModel):
@@ -262,6 +678,28 @@ class BenchmarkResults(BaseModel):
     tokens_per_second: float
     total_tokens: int
     success_rate: float  # percentage
+    p90_latency: Optional[float] = None  # milliseconds
+    # Streaming latency metrics (built-in benchmark with stream=True), all in milliseconds
+    # TTFT: time to first token, ITL: gap between consecutive tokens,
+    # TPOT: per-request decode time divided by output tokens after the first
+    avg_ttft: Optional[float] = None
+    p50_ttft: Optional[float] = None
+    p90_ttft: Optional[float] = None
+    p95_ttft: Optional[float] = None
+    p99_ttft: Optional[float] = None
+    avg_itl: Optional[float] = None
+    p50_itl: Optional[float] = None
+    p90_itl: Optional[float] = None
+    p95_itl: Optional[float] = None
+    p99_itl: Optional[float] = None
+    avg_tpot: Optional[float] = None
+    p50_tpot: Optional[float] = None
+    p90_tpot: Optional[float] = None
+    p95_tpot: Optional[float] = None
+    p99_tpot: Optional[float] = None
+    # Open loop: arrivals dropped at the in-flight cap, and arrivals dispatched behind schedule
+    dropped_requests: Optional[int] = None
+    late_requests: Optional[int] = None
     completed: bool = False
     raw_output: Optional[str] = None  # Raw guidellm output for display
     json_output: Optional[str] = None  # JSON output from guidellm
@@ -468,11 +906,191 @@ def get_stop_tokens_for_model(model_name: str) -> List[str]:
         return ["\n\nUser:", "\n\nAssistant:"]
 
 
+LOCAL_MODEL_REQUIRED_FILES = ('config.json', 'tokenizer_config.json')
+LOCAL_MODEL_CACHE_SIZE = 64  # Validated directories remembered (keyed by path + mtimes)
+
+
+def scan_model_directory(path: Path) -> Dict[str, Any]:
+    """
+    Walk a model directory once with os.scandir.
+    
+    Returns the top-level files with their sizes and the total size of the
+    tree. Symlinked files (HuggingFace cache snapshots) count with the size of
+    their target; symlinked directories are not followed.
+    """
+    files: Dict[str, int] = {}
+    total_size = 0
+    stack = [str(path)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                        size = entry.stat().st_size
+                    except OSError:
+                        continue  # Dangling symlink or unreadable entry
+                    total_size += size
+                    if current == str(path):
+                        files[entry.name] = size
+        except OSError as e:
+            logger.warning(f"Could not scan {current}: {e}")
+    return {'files': files, 'total_size': total_size}
+
+
+def read_safetensors_index(path: Path) -> Optional[Dict[str, Any]]:
+    """Shard list and total weight size from model.safetensors.index.json, if present"""
+    index_path = path / 'model.safetensors.index.json'
+    try:
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not read {index_path.name}: {e}")
+        return None
+    return {
+        'shards': sorted(set(index.get('weight_map', {}).values())),
+        'total_size': index.get('metadata', {}).get('total_size'),
+    }
+
+
+# Bytes per element for safetensors dtypes
+SAFETENSORS_DTYPE_BYTES = {
+    'F64': 8, 'I64': 8, 'U64': 8,
+    'F32': 4, 'I32': 4, 'U32': 4,
+    'F16': 2, 'BF16': 2, 'I16': 2, 'U16': 2,
+    'F8_E4M3': 1, 'F8_E5M2': 1, 'I8': 1, 'U8': 1, 'BOOL': 1,
+}
+SAFETENSORS_MAX_HEADER_BYTES = 100 * 1024 * 1024  # Anything larger is not a valid header
+TORCH_DTYPE_BYTES = {'float32': 4, 'float': 4, 'float16': 2, 'half': 2, 'bfloat16': 2, 'fp8': 1, 'float8': 1}
+
+
+def read_safetensors_header(file_path: Path) -> Dict[str, Any]:
+    """
+    Tensor metadata of a .safetensors file without loading any tensor data.
+    
+    The file starts with a little-endian u64 header length N followed by N
+    bytes of JSON; only those 8+N bytes of the memory map are touched.
+    """
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        (header_len,) = struct.unpack('<Q', mm[:8])
+        if header_len > min(SAFETENSORS_MAX_HEADER_BYTES, len(mm) - 8):
+            raise ValueError(f"Invalid safetensors header length {header_len} in {file_path.name}")
+        header = json.loads(mm[8:8 + header_len])
+    header.pop('__metadata__', None)
+    return header
+
+
+def inspect_safetensors_weights(path: Path, shard_names: List[str]) -> Optional[Dict[str, Any]]:
+    """Exact parameter count, per-dtype breakdown and weight bytes from shard headers"""
+    parameters = 0
+    weight_bytes = 0
+    dtypes: Dict[str, int] = {}
+    for name in shard_names:
+        try:
+            header = read_safetensors_header(path / name)
+        except Exception as e:
+            logger.warning(f"Could not read safetensors header of {name}: {e}")
+            return None
+        for tensor in header.values():
+            numel = 1
+            for dim in tensor.get('shape', []):
+                numel *= dim
+            start, end = tensor.get('data_offsets', (0, 0))
+            parameters += numel
+            weight_bytes += end - start
+            dtypes[tensor['dtype']] = dtypes.get(tensor['dtype'], 0) + numel
+    return {'parameters': parameters, 'weight_bytes': weight_bytes, 'dtypes': dtypes}
+
+
+def model_dtype_bytes(model_config: Dict[str, Any], dtype: str = "auto") -> int:
+    """Bytes per value for vLLM's --dtype ("auto" uses the checkpoint's torch_dtype)"""
+    if dtype == "auto":
+        dtype = str(model_config.get('torch_dtype') or model_config.get('dtype') or 'bfloat16')
+    return TORCH_DTYPE_BYTES.get(dtype.replace('torch.', ''), 2)
+
+
+def estimate_kv_cache_bytes_per_token(model_config: Dict[str, Any], dtype_bytes: int = 2) -> Optional[int]:
+    """
+    KV cache size of one token across all layers, from config.json.
+    
+    Standard attention stores K and V per KV head (GQA/MQA aware); MLA models
+    (DeepSeek V2/V3) store one compressed latent plus the rotary key.
+    """
+    text_config = model_config.get('text_config') or model_config
+    layers = text_config.get('num_hidden_layers')
+    if not layers:
+        return None
+    
+    if text_config.get('kv_lora_rank'):
+        latent = text_config['kv_lora_rank'] + text_config.get('qk_rope_head_dim', 0)
+        return layers * latent * dtype_bytes
+    
+    heads = text_config.get('num_attention_heads')
+    hidden_size = text_config.get('hidden_size')
+    if not heads or not hidden_size:
+        return None
+    kv_heads = text_config.get('num_key_value_heads') or heads
+    head_dim = text_config.get('head_dim') or hidden_size // heads
+    return 2 * layers * kv_heads * head_dim * dtype_bytes
+
+
+class LocalModelValidationCache:
+    """
+    Validation results keyed by resolved path.
+    
+    An entry is reused while the mtimes of the directory and of its config,
+    tokenizer config and safetensors index are unchanged, so the validation
+    from the UI and the one in start_server cost a single directory walk.
+    """
+    
+    def __init__(self, max_entries: int = LOCAL_MODEL_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: Dict[str, tuple] = {}  # path -> (signature, result)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def signature(path: Path) -> tuple:
+        mtimes = [path.stat().st_mtime_ns]
+        for name in LOCAL_MODEL_REQUIRED_FILES + ('model.safetensors.index.json',):
+            try:
+                mtimes.append((path / name).stat().st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+    
+    def get(self, key: str, signature: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                return None
+            # Move to the end (most recently used)
+            self._entries[key] = self._entries.pop(key)
+            return copy.deepcopy(entry[1])
+    
+    def put(self, key: str, signature: tuple, result: Dict[str, Any]):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (signature, copy.deepcopy(result))
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+
+local_model_validation_cache = LocalModelValidationCache()
+
+
 def validate_local_model_path(model_path: str) -> Dict[str, Any]:
     """
     Validate that a local model path exists and contains required files.
     Supports ~ for home directory expansion.
     
+    Blocking (walks the directory); call it from async code through
+    `validate_local_model_path_async`.
+    
     Returns:
         dict with keys: 'valid' (bool), 'error' (str if invalid), 'info' (dict with model info)
     """
@@ -496,47 +1114,55 @@ def validate_local_model_path(model_path: str) -> Dict[str, Any]:
             result['error'] = f"Path is not a directory: {model_path}"
             return result
         
-        # Check for required files
-        required_files = {
-            'config.json': False,
-            'tokenizer_config.json': False,
-        }
-        
-        # Check for model weight files (at least one should exist)
-        weight_patterns = [
-            '*.safetensors',
-            '*.bin',
-            'pytorch_model*.bin',
-            'model*.safetensors',
-        ]
+        cache_key = str(path)
+        signature = LocalModelValidationCache.signature(path)
+        cached = local_model_validation_cache.get(cache_key, signature)
+        if cached is not None:
+            return cached
         
-        has_weights = False
-        for pattern in weight_patterns:
-            if list(path.glob(pattern)):
-                has_weights = True
-                result['info']['weight_format'] = pattern
-                break
+        scan = scan_model_directory(path)
+        files = scan['files']
         
         # Check required files
-        for req_file in required_files.keys():
-            file_path = path / req_file
-            if file_path.exists():
-                required_files[req_file] = True
-        
-        # Validation results
-        missing_files = [f for f, exists in required_files.items() if not exists]
-        
+        missing_files = [f for f in LOCAL_MODEL_REQUIRED_FILES if f not in files]
         if missing_files:
             result['error'] = f"Missing required files: {', '.join(missing_files)}"
+            local_model_validation_cache.put(cache_key, signature, result)
             return result
         
-        if not has_weights:
+        # Check for model weight files (at least one should exist)
+        safetensors = [name for name in files if name.endswith('.safetensors')]
+        bins = [name for name in files if name.endswith('.bin')]
+        if safetensors:
+            result['info']['weight_format'] = '*.safetensors'
+            weight_files = safetensors
+        elif bins:
+            result['info']['weight_format'] = '*.bin'
+            weight_files = bins
+        else:
             result['error'] = "No model weight files found (*.safetensors or *.bin)"
+            local_model_validation_cache.put(cache_key, signature, result)
             return result
         
+        # A sharded checkpoint must have every shard its index refers to
+        index = read_safetensors_index(path)
+        if index is not None:
+            missing_shards = [shard for shard in index['shards'] if shard not in files]
+            if missing_shards:
+                result['error'] = (
+                    f"Missing {len(missing_shards)} of {len(index['shards'])} weight shards "
+                    f"listed in model.safetensors.index.json (e.g. {missing_shards[0]})"
+                )
+                local_model_validation_cache.put(cache_key, signature, result)
+                return result
+            weight_files = index['shards']
+        
+        result['info']['weight_files'] = len(weight_files)
+        result['info']['weights_size_mb'] = round(sum(files[name] for name in weight_files) / (1024 * 1024), 2)
+        
         # Try to read model config for additional info
+        config = {}
         try:
-            import json
             config_path = path / 'config.json'
             with open(config_path, 'r') as f:
                 config = json.load(f)
@@ -548,15 +1174,27 @@ def validate_local_model_path(model_path: str) -> Dict[str, Any]:
         except Exception as e:
             logger.warning(f"Could not read config.json: {e}")
         
-        # Calculate directory size
-        total_size = sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
-        result['info']['size_mb'] = round(total_size / (1024 * 1024), 2)
-        result['info']['path'] = str(path.resolve())
+        # Memory footprint from the safetensors headers and config.json
+        if safetensors:
+            weights = inspect_safetensors_weights(path, weight_files)
+            if weights:
+                result['info'].update(weights)
+        text_config = config.get('text_config') or config
+        result['info']['max_position_embeddings'] = text_config.get('max_position_embeddings')
+        result['info']['torch_dtype'] = config.get('torch_dtype') or config.get('dtype')
+        kv_values = estimate_kv_cache_bytes_per_token(config, dtype_bytes=1)  # Values per token
+        if kv_values:
+            result['info']['kv_cache_values_per_token'] = kv_values
+            result['info']['kv_cache_bytes_per_token'] = kv_values * model_dtype_bytes(config)
+        
+        result['info']['size_mb'] = round(scan['total_size'] / (1024 * 1024), 2)
+        result['info']['path'] = str(path)
         
         # Extract and add the display name
-        result['info']['model_name'] = extract_model_name_from_path(str(path.resolve()), result['info'])
+        result['info']['model_name'] = extract_model_name_from_path(str(path), result['info'])
         
         result['valid'] = True
+        local_model_validation_cache.put(cache_key, signature, result)
         return result
         
     except Exception as e:
@@ -564,6 +1202,109 @@ def validate_local_model_path(model_path: str) -> Dict[str, Any]:
         return result
 
 
+async def validate_local_model_path_async(model_path: str) -> Dict[str, Any]:
+    """`validate_local_model_path` in a worker thread, keeping the event loop free"""
+    return await asyncio.to_thread(validate_local_model_path, model_path)
+
+
+def query_gpu_memory_mib() -> Dict[int, int]:
+    """Total memory per GPU index from nvidia-smi (empty if unavailable)"""
+    try:
+        result = subprocess.run(
+            ['nvidia-smi', '--query-gpu=index,memory.total', '--format=csv,noheader,nounits'],
+            capture_output=True, text=True, timeout=5
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return {}
+    memory = {}
+    if result.returncode == 0:
+        for line in result.stdout.strip().splitlines():
+            parts = [p.strip() for p in line.split(',')]
+            if len(parts) == 2 and parts[0].isdigit() and parts[1].isdigit():
+                memory[int(parts[0])] = int(parts[1])
+    return memory
+
+
+def check_model_memory_fit(config: VLLMConfig, info: Dict[str, Any],
+                           gpu_memory_mib: Optional[Dict[int, int]] = None) -> List[str]:
+    """
+    Warnings for configurations whose weights or KV cache won't fit.
+    
+    Uses the weight bytes and KV cache size per token found by
+    `validate_local_model_path`. The estimates ignore activations and CUDA
+    graphs, so a warning means the launch will almost certainly fail, while
+    no warning doesn't guarantee it succeeds.
+    """
+    warnings = []
+    kv_values = info.get('kv_cache_values_per_token')
+    max_len = config.max_model_len or info.get('max_position_embeddings')
+    if not kv_values or not max_len:
+        return warnings
+    
+    gib = 1024 ** 3
+    kv_per_token = kv_values * model_dtype_bytes({'torch_dtype': info.get('torch_dtype')}, config.dtype)
+    kv_per_sequence = kv_per_token * max_len
+    weight_bytes = info.get('weight_bytes') or 0
+    
+    replicas = max(1, config.replicas)
+    if config.use_cpu:
+        kv_space = config.cpu_kvcache_space * gib
+        if kv_space < kv_per_sequence:
+            warnings.append(
+                f"CPU KV cache ({config.cpu_kvcache_space} GB) holds ~{kv_space // kv_per_token:,} tokens, "
+                f"less than one {max_len:,}-token sequence ({kv_per_sequence / gib:.1f} GB). "
+                f"Set cpu_kvcache_space to at least {math.ceil(kv_per_sequence / gib)} GB or lower max_model_len."
+            )
+        try:
+            ram = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+        except (ValueError, OSError, AttributeError):
+            ram = None
+        # Every replica loads its own weights and KV cache
+        if ram and (weight_bytes + kv_space) * replicas > ram:
+            per_server = "" if replicas == 1 else f" per replica for {replicas} replicas"
+            warnings.append(
+                f"Weights ({weight_bytes / gib:.1f} GB) plus CPU KV cache ({config.cpu_kvcache_space} GB){per_server} "
+                f"exceed system memory ({ram / gib:.1f} GB)."
+            )
+        return warnings
+    
+    if not gpu_memory_mib:
+        return warnings
+    
+    tp = max(1, config.tensor_parallel_size)
+    weights_per_gpu = weight_bytes / tp
+    kv_per_gpu = kv_per_sequence / tp
+    memory_utilization = replica_gpu_memory_utilization(config) if replicas > 1 else [config.gpu_memory_utilization]
+    
+    for index, utilization in enumerate(memory_utilization):
+        # Replicas sharing GPUs each get their part of gpu_memory_utilization
+        prefix = "" if replicas == 1 else f"Replica {index}: "
+        devices = replica_device(config, index) if replicas > 1 else config.gpu_device
+        indices = [int(i) for i in (devices or "").split(",") if i.strip().isdigit()]
+        gpus = [gpu_memory_mib[i] for i in indices if i in gpu_memory_mib] or list(gpu_memory_mib.values())
+        gpu_bytes = min(gpus[:tp]) * 1024 * 1024
+        budget = gpu_bytes * utilization
+        
+        if weights_per_gpu >= budget:
+            warnings.append(
+                f"{prefix}Weights need {weights_per_gpu / gib:.1f} GB per GPU but gpu_memory_utilization "
+                f"{utilization} allows {budget / gib:.1f} GB of {gpu_bytes / gib:.1f} GB. "
+                f"Increase tensor_parallel_size or use a quantized model."
+                + ("" if utilization == config.gpu_memory_utilization else " Or give the replicas separate replica_devices.")
+            )
+        elif budget - weights_per_gpu < kv_per_gpu:
+            needed = (weights_per_gpu + kv_per_gpu) / gpu_bytes
+            fitting_tokens = int((budget - weights_per_gpu) * tp // kv_per_token)
+            hint = (f"Raise gpu_memory_utilization to at least {math.ceil(needed * 100) / 100:.2f}"
+                    if needed <= 0.95 and utilization == config.gpu_memory_utilization
+                    else f"Lower max_model_len to about {fitting_tokens:,}")
+            warnings.append(
+                f"{prefix}KV cache for one {max_len:,}-token sequence needs {kv_per_gpu / gib:.2f} GB per GPU, "
+                f"but only {(budget - weights_per_gpu) / gib:.2f} GB is left after weights ({fitting_tokens:,} tokens). {hint}."
+            )
+    return warnings
+
+
 def extract_model_name_from_path(model_path: str, info: Dict[str, Any]) -> str:
     """
     Extract a meaningful model name from the local path.
@@ -618,12 +1359,185 @@ def extract_model_name_from_path(model_path: str, info: Dict[str, Any]) -> str:
     return dir_name
 
 
+# Cached JSON responses
+# Endpoints that return large, rarely-changing structures serialize and compress them once
+# per version and answer conditional requests (If-None-Match) with 304 Not Modified.
+RESPONSE_COMPRESS_MIN_BYTES = 1024  # Smaller bodies aren't worth compressing
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map content codings in an Accept-Encoding header to their q-values"""
+    codings = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding] = q
+    return codings
+
+
+class CachedResponse:
+    """Serialized body (JSON unless given as bytes) plus its precompressed variants, each with a strong ETag"""
+    
+    def __init__(self, content: Any, media_type: str = "application/json"):
+        self.media_type = media_type
+        if isinstance(content, bytes):
+            self.body = content
+        else:
+            self.body = json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        # Strong ETags must differ per content-coding, so each variant gets its own suffix
+        self.variants: Dict[str, tuple] = {"identity": (self.body, f'"{digest}"')}
+        if len(self.body) >= RESPONSE_COMPRESS_MIN_BYTES:
+            self.variants["gzip"] = (gzip.compress(self.body, compresslevel=9, mtime=0), f'"{digest}-gzip"')
+            if BROTLI_AVAILABLE:
+                self.variants["br"] = (brotli.compress(self.body, quality=11), f'"{digest}-br"')
+        self.etags = {etag for _, etag in self.variants.values()}
+    
+    def select(self, accept_encoding: str) -> str:
+        """Pick the smallest variant the client accepts"""
+        accepted = parse_accept_encoding(accept_encoding or "")
+        for coding in ("br", "gzip"):
+            if coding in self.variants and accepted.get(coding, accepted.get('*', 0)) > 0:
+                return coding
+        return "identity"
+    
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return not tags.isdisjoint(self.etags)
+
+
+class ResponseCache:
+    """Per-endpoint cache of CachedResponse objects, rebuilt when the source version changes"""
+    
+    def __init__(self):
+        self.entries: Dict[str, tuple] = {}  # name -> (version, CachedResponse)
+    
+    def get(self, name: str, version: Any, build: Callable[[], Any],
+            media_type: str = "application/json") -> CachedResponse:
+        entry = self.entries.get(name)
+        if entry is None or entry[0] != version:
+            entry = (version, CachedResponse(build(), media_type))
+            self.entries[name] = entry
+        return entry[1]
+    
+    def invalidate(self, name: Optional[str] = None):
+        if name is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(name, None)
+    
+    def respond(self, request: Request, name: str, version: Any, build: Callable[[], Any],
+                media_type: str = "application/json") -> Response:
+        return cached_response(request, self.get(name, version, build, media_type))
+
+
+def cached_response(request: Request, cached: CachedResponse) -> Response:
+    """Respond with the best encoding of a CachedResponse, or 304 if the client's copy is current"""
+    coding = cached.select(request.headers.get("accept-encoding", ""))
+    body, etag = cached.variants[coding]
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",  # Cache, but revalidate (cheap 304) on every use
+        "Vary": "Accept-Encoding",
+    }
+    if cached.not_modified(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    return Response(content=body, media_type=cached.media_type, headers=headers)
+
+
+response_cache = ResponseCache()
+
+
+# index.html references to local assets, e.g. src="/static/js/app.js"
+ASSET_URL_RE = re.compile(r'((?:src|href)=")(/(?:static|assets)/[^"?#]+)(")')
+
+
+class IndexPage:
+    """
+    The application shell (index.html), rendered once with content-hashed asset URLs.
+    
+    `/static/js/app.js` becomes `/static/js/app.js?v=<hash>`, which the static
+    mounts serve with an immutable Cache-Control, so browsers only refetch an
+    asset after it actually changes. The page is re-rendered when index.html
+    or any referenced asset changes on disk.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.asset_paths: List[Path] = []
+        self._cached: Optional[CachedResponse] = None
+        self._version: Optional[tuple] = None
+    
+    def _asset_file(self, url: str) -> Path:
+        return BASE_DIR / url.lstrip('/')
+    
+    def version(self) -> tuple:
+        """(mtime_ns, size) of index.html and every asset it references"""
+        files = [self.path] + self.asset_paths
+        signature = []
+        for file in files:
+            try:
+                stat = file.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def render(self) -> bytes:
+        html = self.path.read_text(encoding='utf-8')
+        asset_paths = []
+        
+        def add_hash(match):
+            url = match.group(2)
+            asset = self._asset_file(url)
+            try:
+                digest = asset_hash(asset.read_bytes())
+            except OSError:
+                return match.group(0)
+            asset_paths.append(asset)
+            return f"{match.group(1)}{url}?v={digest}{match.group(3)}"
+        
+        html = ASSET_URL_RE.sub(add_hash, html)
+        self.asset_paths = asset_paths
+        return html.encode('utf-8')
+    
+    def get(self) -> CachedResponse:
+        """The rendered page, re-rendered only when a file it depends on changed"""
+        if self._cached is None or self.version() != self._version:
+            self._cached = CachedResponse(self.render(), "text/html; charset=utf-8")
+            self._version = self.version()
+        return self._cached
+
+
+index_page = IndexPage(BASE_DIR / "index.html")
+
+
+@app.on_event("startup")
+async def startup_index_page():
+    """Render the application shell once (hashes assets, precompresses the page)"""
+    index_page.get()
+
+
 @app.get("/", response_class=HTMLResponse)
-async def read_root():
+async def read_root(request: Request):
     """Serve the main HTML page"""
-    html_path = Path(__file__).parent / "index.html"
-    with open(html_path, "r") as f:
-        return HTMLResponse(content=f.read())
+    return cached_response(request, index_page.get())
 
 
 @app.get("/api/status")
@@ -636,7 +1550,7 @@ async def get_status() -> ServerStatus:
     
     if current_run_mode == "container":
         # Check container status
-        status = await container_manager.get_container_status()
+        status = await container_liveness.get_status()
         running = status.get('running', False)
     elif current_run_mode == "subprocess":
         # Check subprocess status
@@ -647,8 +1561,8 @@ async def get_status() -> ServerStatus:
     else:
         # If run mode is not set (e.g., after restart), check if container exists
         # This handles the case where Web UI restarts but vLLM pod is still running
-        if CONTAINER_MODE_AVAILABLE and container_manager:
-            status = await container_manager.get_container_status()
+        if CONTAINER_MODE_AVAILABLE:
+            status = await container_liveness.get_status()
             if status.get('running', False):
                 running = True
                 current_run_mode = "container"  # Reconnect to existing container
@@ -748,18 +1662,16 @@ async def test_vllm_connection():
     health_url = f"{base_url}/health"
     
     try:
-        import aiohttp
-        timeout = aiohttp.ClientTimeout(total=5)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(health_url) as response:
-                status = response.status
-                text = await response.text()
-                return {
-                    "success": True,
-                    "status_code": status,
-                    "url_tested": health_url,
-                    "response": text[:500]  # Limit response size
-                }
+        session = get_upstream_session()
+        async with session.get(health_url, timeout=UPSTREAM_TIMEOUTS["debug"]) as response:
+            status = response.status
+            text = await response.text()
+            return {
+                "success": True,
+                "status_code": status,
+                "url_tested": health_url,
+                "response": text[:500]  # Limit response size
+            }
     except Exception as e:
         return {
             "success": False,
@@ -769,8 +1681,7 @@ async def test_vllm_connection():
         }
 
 
-@app.get("/api/features")
-async def get_features():
+def build_features() -> Dict[str, Any]:
     """Check which optional features are available"""
     features = {
         "vllm": True,  # Always available since it's core
@@ -787,6 +1698,13 @@ async def get_features():
     return features
 
 
+@app.get("/api/features")
+async def get_features(request: Request):
+    """Check which optional features are available"""
+    # Installed packages don't change while the server runs - check once
+    return response_cache.respond(request, "features", 0, build_features)
+
+
 @app.get("/api/hardware-capabilities")
 async def get_hardware_capabilities():
     """
@@ -929,30 +1847,346 @@ async def get_gpu_status():
         }
 
 
+# Backend pool: the primary vLLM server plus optional extra replicas of the same model
+REPLICA_HEALTH_INTERVAL = float(os.environ.get("WEBUI_REPLICA_HEALTH_INTERVAL", "5"))  # seconds between /health probes
+REPLICA_EJECT_AFTER = int(os.environ.get("WEBUI_REPLICA_EJECT_AFTER", "2"))  # failed probes before a replica gets no traffic
+
+
+def vllm_base_url(port: int, manager=None) -> str:
+    """Address of a vLLM server listening on `port` in the current run mode"""
+    # In Kubernetes mode, use the service endpoint instead of host:port
+    if current_run_mode == "container" and os.path.exists('/var/run/secrets/kubernetes.io/serviceaccount/token'):
+        manager = manager or container_manager
+        service_name = getattr(manager, 'SERVICE_NAME', 'vllm-service')
+        namespace = getattr(manager, 'namespace', os.getenv('KUBERNETES_NAMESPACE', 'default'))
+        return f"http://{service_name}.{namespace}.svc.cluster.local:{port}"
+    
+    # Use localhost for container mode since 0.0.0.0 is a bind address, not a valid destination
+    if current_run_mode == "container":
+        return f"http://localhost:{port}"
+    return f"http://{current_config.host}:{port}"
+
+
+def vllm_replica_urls() -> List[Tuple[str, str]]:
+    """(name, base URL) of every vLLM server of the backend pool, primary first"""
+    if current_config is None:
+        return []
+    return [("primary", vllm_base_url(current_config.port))] + [
+        (replica.name, replica.base_url) for replica in backend_pool.extras
+    ]
+
+
+def port_in_use(host: str, port: int) -> bool:
+    """Whether a server could not bind `host:port` because something already listens there"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # like uvicorn, ignore TIME_WAIT connections
+        try:
+            sock.bind((host, port))
+        except OSError:
+            return True
+    return False
+
+
+def replica_device(config: VLLMConfig, index: int) -> Optional[str]:
+    """Devices of replica `index`: its replica_devices entry, else the devices of the primary"""
+    if config.replica_devices:
+        return config.replica_devices[index]
+    return config.gpu_device
+
+
+def replica_gpu_memory_utilization(config: VLLMConfig) -> List[float]:
+    """
+    gpu_memory_utilization of each replica.
+    
+    Replicas sharing a GPU split the configured fraction between them,
+    otherwise every replica after the first would run out of memory.
+    A replica without explicit devices uses all GPUs and therefore shares
+    with every other replica.
+    """
+    device_sets = [
+        {d.strip() for d in (replica_device(config, index) or "").split(",") if d.strip()}
+        for index in range(config.replicas)
+    ]
+    utilizations = []
+    for devices in device_sets:
+        sharing = sum(1 for other in device_sets if not devices or not other or devices & other)
+        if sharing == 1:
+            utilizations.append(config.gpu_memory_utilization)
+        else:
+            utilizations.append(math.floor(config.gpu_memory_utilization / sharing * 1000) / 1000)
+    return utilizations
+
+
+class BackendReplica:
+    """One vLLM server of the backend pool"""
+    
+    def __init__(self, index: int, base_url: Optional[str] = None, process: Optional[asyncio.subprocess.Process] = None,
+                 manager=None, healthy: bool = True):
+        self.index = index
+        self.name = "primary" if index == 0 else f"replica-{index}"
+        self.base_url = base_url
+        self.process = process  # subprocess mode
+        self.manager = manager  # container mode (per-replica container manager)
+        self.healthy = healthy
+        self.failed_probes = 0
+        self.last_error: Optional[str] = None
+        self.outstanding = 0
+        self.served = 0
+        self.log_task: Optional[asyncio.Task] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "url": self.base_url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "served": self.served,
+            "failed_probes": self.failed_probes,
+            "last_error": self.last_error,
+        }
+
+
+class BackendPool:
+    """
+    The vLLM servers serving the current model.
+    
+    Replica 0 is the primary server started by /api/start; VLLMConfig.replicas
+    - 1 extra replicas run on the following ports (and, with replica_devices,
+    on their own GPUs or CPU ranges). Each request goes to the healthy
+    replica with the fewest outstanding requests. While extra replicas run,
+    /health is probed in the background: a replica is ejected after
+    REPLICA_EJECT_AFTER failed probes and gets traffic again after the next
+    successful one. Extra replicas only get traffic once they are ready.
+    """
+    
+    def __init__(self):
+        self.primary = BackendReplica(0)
+        self.extras: List[BackendReplica] = []
+        self._health_task: Optional[asyncio.Task] = None
+    
+    @property
+    def replicas(self) -> List[BackendReplica]:
+        return [self.primary] + self.extras
+    
+    def acquire(self) -> BackendReplica:
+        """Pick the replica for one upstream request; pass it to release() afterwards"""
+        self.primary.base_url = vllm_base_url(current_config.port)
+        candidates = [replica for replica in self.replicas if replica.healthy] or [self.primary]
+        replica = min(candidates, key=lambda r: (r.outstanding, r.served))
+        replica.outstanding += 1
+        replica.served += 1
+        return replica
+    
+    def release(self, replica: BackendReplica):
+        replica.outstanding -= 1
+    
+    async def start_replicas(self, config: VLLMConfig, cmd: List[str], env: Dict[str, str],
+                             container_config: Optional[Dict[str, Any]] = None):
+        """Launch the extra replicas like the primary server, one port further each"""
+        memory_utilization = replica_gpu_memory_utilization(config)
+        try:
+            for index in range(1, config.replicas):
+                port = config.port + index
+                device = config.replica_devices[index] if config.replica_devices else None
+                
+                if config.run_mode == "container":
+                    manager = container_manager.for_replica(index)
+                    replica_config = {**container_config, 'port': port}
+                    if device and config.use_cpu:
+                        # Pin the container and bind vLLM's OMP threads to the same CPUs
+                        replica_config['cpuset_cpus'] = device
+                        replica_config['cpu_omp_threads_bind'] = device
+                    elif device:
+                        replica_config['gpu_devices'] = device
+                    if not config.use_cpu:
+                        replica_config['gpu_memory_utilization'] = memory_utilization[index]
+                    await manager.start_container(replica_config)
+                    replica = BackendReplica(index, vllm_base_url(port, manager), manager=manager, healthy=False)
+                    lines = manager.stream_logs()
+                else:
+                    replica_cmd = list(cmd)
+                    replica_cmd[replica_cmd.index("--port") + 1] = str(port)
+                    if "--gpu-memory-utilization" in replica_cmd:
+                        replica_cmd[replica_cmd.index("--gpu-memory-utilization") + 1] = str(memory_utilization[index])
+                    replica_env = dict(env)
+                    if device:
+                        replica_env['VLLM_CPU_OMP_THREADS_BIND' if config.use_cpu else 'CUDA_VISIBLE_DEVICES'] = device
+                    process = await asyncio.create_subprocess_exec(
+                        *replica_cmd,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.STDOUT,
+                        env=replica_env
+                    )
+                    replica = BackendReplica(index, vllm_base_url(port), process=process, healthy=False)
+                    lines = self._process_lines(process)
+                
+                replica.log_task = asyncio.create_task(self._follow_logs(replica, lines))
+                self.extras.append(replica)
+                await broadcast_log(f"[WEBUI] Started {replica.name} on port {port}" + (f" (devices: {device})" if device else ""))
+        except Exception as e:
+            # Don't leave a partial pool running
+            await broadcast_log(f"[WEBUI] ❌ Failed to start replica {index}: {e}")
+            await self.stop_replicas()
+            raise
+        
+        if self.extras:
+            await broadcast_log(f"[WEBUI] Backend pool: {len(self.replicas)} replicas, least-outstanding-requests routing")
+            self._health_task = asyncio.create_task(self._health_loop())
+    
+    async def stop_replicas(self):
+        """Stop the extra replicas and forget the pool's routing state"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        if self.extras:
+            await asyncio.gather(*(self._stop(replica) for replica in self.extras))
+        self.extras = []
+        self.primary = BackendReplica(0)
+    
+    async def close(self):
+        """Shut the pool down when the web UI exits: the extra replicas were started by it, so stop them too"""
+        await self.stop_replicas()
+    
+    async def _stop(self, replica: BackendReplica):
+        if replica.log_task is not None:
+            replica.log_task.cancel()
+        if replica.process is not None and replica.process.returncode is None:
+            replica.process.terminate()
+            try:
+                await asyncio.wait_for(replica.process.wait(), timeout=10.0)
+            except asyncio.TimeoutError:
+                replica.process.kill()
+                await replica.process.wait()
+        elif replica.manager is not None:
+            await replica.manager.stop_container()
+        await broadcast_log(f"[WEBUI] Stopped {replica.name}")
+    
+    @staticmethod
+    async def _process_lines(process: asyncio.subprocess.Process) -> AsyncIterator[str]:
+        async for raw in process.stdout:
+            line = raw.decode(errors='replace').strip()
+            if line:
+                yield line
+    
+    async def _follow_logs(self, replica: BackendReplica, lines: AsyncIterator[str]):
+        try:
+            async for line in lines:
+                await broadcast_log(f"[{replica.name}] {line}")
+        except Exception as e:
+            logger.warning(f"Log stream of {replica.name} ended: {e}")
+    
+    async def _health_loop(self):
+        while True:
+            if current_config is not None:
+                self.primary.base_url = vllm_base_url(current_config.port)
+            await asyncio.gather(*(self._probe(replica) for replica in self.replicas))
+            await asyncio.sleep(REPLICA_HEALTH_INTERVAL)
+    
+    async def _probe(self, replica: BackendReplica):
+        error = None
+        if replica.process is not None and replica.process.returncode is not None:
+            error = f"process exited with code {replica.process.returncode}"
+        else:
+            try:
+                session = get_upstream_session()
+                async with session.get(f"{replica.base_url}/health", timeout=UPSTREAM_TIMEOUTS["health"]) as response:
+                    if response.status != 200:
+                        error = f"HTTP {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        
+        if error is None:
+            replica.failed_probes = 0
+            if not replica.healthy:
+                replica.healthy = True
+                await broadcast_log(f"[WEBUI] ✅ {replica.name} is healthy and receiving requests")
+            return
+        
+        replica.failed_probes += 1
+        replica.last_error = error
+        if replica.healthy and replica.failed_probes >= REPLICA_EJECT_AFTER:
+            replica.healthy = False
+            logger.warning(f"{replica.name} ejected from the backend pool: {error}")
+            await broadcast_log(f"[WEBUI] ⚠️ {replica.name} ejected after {replica.failed_probes} failed health checks ({error})")
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": [replica.to_dict() for replica in self.replicas],
+            "healthy": sum(1 for replica in self.replicas if replica.healthy),
+            "health_interval": REPLICA_HEALTH_INTERVAL,
+        }
+
+
+backend_pool = BackendPool()
+
+
+@app.get("/api/backends")
+async def get_backends():
+    """Replicas of the backend pool with their health and outstanding requests"""
+    return backend_pool.stats()
+
+
+@app.on_event("shutdown")
+async def shutdown_backend_pool():
+    """Stop the extra replicas started by the pool and their health probes"""
+    await backend_pool.close()
+
+
 @app.post("/api/start")
 async def start_server(config: VLLMConfig):
     """Start the vLLM server in subprocess or container mode"""
     global container_id, vllm_process, vllm_running, current_config, server_start_time, current_model_identifier, current_run_mode
     
     # Check if server is already running
-    if current_run_mode == "container" and CONTAINER_MODE_AVAILABLE and container_manager:
-        status = await container_manager.get_container_status()
+    if current_run_mode == "container":
+        status = await container_liveness.get_status(force=True)
         if status.get('running', False):
             raise HTTPException(status_code=400, detail="Server is already running")
     elif current_run_mode == "subprocess":
         if vllm_process is not None and vllm_process.returncode is None:
             raise HTTPException(status_code=400, detail="Server is already running")
     
-    # Determine if using local model or HuggingFace Hub
-    # Local model path takes precedence
-    model_source = None
-    model_display_name = None
+    if config.replica_devices is not None and len(config.replica_devices) < config.replicas:
+        raise HTTPException(
+            status_code=400,
+            detail=f"replica_devices lists {len(config.replica_devices)} entries for {config.replicas} replicas"
+        )
+    
+    # Extra replicas listen on port + 1, ...; a taken port would only show up as a replica that never gets healthy
+    if config.replicas > 1:
+        last_port = config.port + config.replicas - 1
+        if last_port > 65535:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{config.replicas} replicas need ports {config.port}-{last_port}, beyond 65535"
+            )
+        # In Kubernetes every replica is a pod with its own address
+        is_kubernetes = os.path.exists('/var/run/secrets/kubernetes.io/serviceaccount/token')
+        if not (config.run_mode == "container" and is_kubernetes):
+            taken = [port for port in range(config.port + 1, last_port + 1) if port_in_use(config.host, port)]
+            if taken:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Ports already in use, needed by extra replicas: {', '.join(map(str, taken))}"
+                )
+    
+    # A restarted server may serve different weights under the same model name
+    generation_cache.clear()
+    # Don't chart the previous server's series next to the new one's
+    metrics_collector.reset()
+    
+    # Determine if using local model or HuggingFace Hub
+    # Local model path takes precedence
+    model_source = None
+    model_display_name = None
+    model_info = None
     
     if config.local_model_path:
         # Using local model - validate with comprehensive validation
         await broadcast_log("[WEBUI] Validating local model path...")
         
-        validation_result = validate_local_model_path(config.local_model_path)
+        validation_result = await validate_local_model_path_async(config.local_model_path)
         
         if not validation_result['valid']:
             error_msg = validation_result.get('error', 'Invalid local model path')
@@ -975,6 +2209,12 @@ async def start_server(config: VLLMConfig):
             await broadcast_log(f"[WEBUI] Model type: {info['model_type']}")
         if info.get('weight_format'):
             await broadcast_log(f"[WEBUI] Weight format: {info['weight_format']}")
+        if info.get('parameters'):
+            dtypes = ", ".join(f"{dtype}: {count / 1e9:.2f}B" for dtype, count in info['dtypes'].items())
+            await broadcast_log(f"[WEBUI] Parameters: {info['parameters'] / 1e9:.2f}B ({dtypes}), weights {info['weight_bytes'] / 1024 ** 3:.2f} GB")
+        if info.get('kv_cache_bytes_per_token'):
+            await broadcast_log(f"[WEBUI] KV cache: {info['kv_cache_bytes_per_token'] / 1024:.1f} KB per token")
+        model_info = info
     else:
         # Using HuggingFace Hub model
         model_source = config.model
@@ -1019,6 +2259,28 @@ async def start_server(config: VLLMConfig):
                 logger.info("Detected macOS - enabling CPU mode")
                 await broadcast_log("[WEBUI] Detected macOS - using CPU mode")
         
+        # Catch configurations that would OOM before a multi-minute launch
+        if model_info:
+            gpu_memory = None if config.use_cpu else await asyncio.to_thread(query_gpu_memory_mib)
+            for warning in check_model_memory_fit(config, model_info, gpu_memory):
+                logger.warning(warning)
+                await broadcast_log(f"[WEBUI] ⚠️ {warning}")
+        
+        # With several replicas, the primary server is replica 0 of replica_devices
+        if config.replicas > 1 and config.replica_devices:
+            if config.use_cpu:
+                config.cpu_omp_threads_bind = config.replica_devices[0]
+            else:
+                config.gpu_device = config.replica_devices[0]
+        
+        # Replicas on the same GPUs split gpu_memory_utilization between them
+        gpu_memory_utilization = config.gpu_memory_utilization
+        if config.replicas > 1 and not config.use_cpu:
+            memory_utilization = replica_gpu_memory_utilization(config)
+            gpu_memory_utilization = memory_utilization[0]
+            if memory_utilization != [config.gpu_memory_utilization] * config.replicas:
+                await broadcast_log(f"[WEBUI] Replicas share GPUs - gpu_memory_utilization per replica: {', '.join(map(str, memory_utilization))}")
+        
         # Set environment variables for CPU mode
         env = os.environ.copy()
         
@@ -1067,7 +2329,7 @@ async def start_server(config: VLLMConfig):
         if not config.use_cpu:
             cmd.extend([
                 "--tensor-parallel-size", str(config.tensor_parallel_size),
-                "--gpu-memory-utilization", str(config.gpu_memory_utilization),
+                "--gpu-memory-utilization", str(gpu_memory_utilization),
             ])
         else:
             await broadcast_log("[WEBUI] CPU mode - vLLM will auto-detect CPU backend")
@@ -1166,7 +2428,7 @@ async def start_server(config: VLLMConfig):
                 'host': config.host,
                 'port': config.port,
                 'tensor_parallel_size': config.tensor_parallel_size,
-                'gpu_memory_utilization': config.gpu_memory_utilization,
+                'gpu_memory_utilization': gpu_memory_utilization,
                 'max_model_len': config.max_model_len,
                 'dtype': config.dtype,
                 'trust_remote_code': config.trust_remote_code,
@@ -1183,6 +2445,8 @@ async def start_server(config: VLLMConfig):
                 'enable_tool_calling': config.enable_tool_calling,
                 'tool_call_parser': config.tool_call_parser
             }
+            if config.replicas > 1 and config.replica_devices:
+                vllm_config_dict['cpuset_cpus' if config.use_cpu else 'gpu_devices'] = config.replica_devices[0]
             
             logger.info(f"Container config: enable_tool_calling={config.enable_tool_calling}, tool_call_parser={config.tool_call_parser}")
             
@@ -1190,6 +2454,7 @@ async def start_server(config: VLLMConfig):
             container_info = await container_manager.start_container(vllm_config_dict)
             
             container_id = container_info['id']
+            container_liveness.invalidate()  # Container state changed - re-check on next read
             vllm_running = True
             current_config = config
             server_start_time = datetime.now()
@@ -1200,6 +2465,13 @@ async def start_server(config: VLLMConfig):
             # Start log reader task
             asyncio.create_task(read_logs_container())
             
+            # Extra replicas load in parallel with the primary
+            try:
+                await backend_pool.start_replicas(config, cmd, env, vllm_config_dict)
+            except Exception:
+                await abort_server_start()
+                raise
+            
             # Show if container was reused or created new
             if container_info.get('reused', False):
                 await broadcast_log(f"[WEBUI] ⚡ Restarted existing container: {container_id[:12]} (fast!)")
@@ -1216,7 +2488,7 @@ async def start_server(config: VLLMConfig):
             if config.use_cpu:
                 await broadcast_log(f"[WEBUI] Mode: CPU (KV Cache: {config.cpu_kvcache_space}GB)")
             else:
-                await broadcast_log(f"[WEBUI] Mode: GPU (Memory: {int(config.gpu_memory_utilization * 100)}%)")
+                await broadcast_log(f"[WEBUI] Mode: GPU (Memory: {int(gpu_memory_utilization * 100)}%)")
             
             # Wait for vLLM to be ready
             await broadcast_log(f"[WEBUI] ⏳ Waiting for vLLM to initialize and become ready...")
@@ -1280,6 +2552,12 @@ async def start_server(config: VLLMConfig):
             # Start log reader task
             asyncio.create_task(read_logs_subprocess())
             
+            try:
+                await backend_pool.start_replicas(config, cmd, env)
+            except Exception:
+                await abort_server_start()
+                raise
+            
             await broadcast_log(f"[WEBUI] vLLM subprocess started (PID: {vllm_process.pid})")
             await broadcast_log(f"[WEBUI] Model: {model_display_name}")
             if config.local_model_path:
@@ -1289,7 +2567,7 @@ async def start_server(config: VLLMConfig):
             if config.use_cpu:
                 await broadcast_log(f"[WEBUI] Mode: CPU (KV Cache: {config.cpu_kvcache_space}GB)")
             else:
-                await broadcast_log(f"[WEBUI] Mode: GPU (Memory: {int(config.gpu_memory_utilization * 100)}%)")
+                await broadcast_log(f"[WEBUI] Mode: GPU (Memory: {int(gpu_memory_utilization * 100)}%)")
             
             return {"status": "started", "pid": vllm_process.pid, "mode": "subprocess"}
     
@@ -1298,14 +2576,42 @@ async def start_server(config: VLLMConfig):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def abort_server_start():
+    """Stop the primary server after a replica failed to start, so the pool is all-or-nothing"""
+    global container_id, vllm_process, vllm_running, server_start_time, current_model_identifier, current_run_mode
+    
+    try:
+        if current_run_mode == "container" and CONTAINER_MODE_AVAILABLE and container_manager:
+            await container_manager.stop_container()
+            container_liveness.set_status({'running': False, 'status': 'stopped'})
+            container_id = None
+        elif vllm_process is not None and vllm_process.returncode is None:
+            vllm_process.terminate()
+            try:
+                await asyncio.wait_for(vllm_process.wait(), timeout=10.0)
+            except asyncio.TimeoutError:
+                vllm_process.kill()
+                await vllm_process.wait()
+        vllm_process = None
+    except Exception as e:
+        logger.error(f"Failed to stop vLLM after a failed start: {e}")
+    
+    vllm_running = False
+    server_start_time = None
+    current_model_identifier = None
+    current_run_mode = None
+    metrics_collector.reset()
+    await broadcast_log("[WEBUI] ❌ Stopped vLLM - not all replicas could be started")
+
+
 @app.post("/api/stop")
 async def stop_server():
     """Stop the vLLM server (container or subprocess)"""
     global container_id, vllm_process, vllm_running, server_start_time, current_model_identifier, current_run_mode
     
     # Check if server is running based on mode
-    if current_run_mode == "container" and CONTAINER_MODE_AVAILABLE and container_manager:
-        status = await container_manager.get_container_status()
+    if current_run_mode == "container":
+        status = await container_liveness.get_status(force=True)
         if not status.get('running', False):
             raise HTTPException(status_code=400, detail="Server is not running")
     elif current_run_mode == "subprocess":
@@ -1315,11 +2621,14 @@ async def stop_server():
         raise HTTPException(status_code=400, detail="Server is not running")
     
     try:
+        await backend_pool.stop_replicas()
+        
         if current_run_mode == "container":
             await broadcast_log("[WEBUI] Stopping vLLM container...")
             
             # Stop container
             result = await container_manager.stop_container()
+            container_liveness.set_status({'running': False, 'status': 'stopped'})
             
             container_id = None
             await broadcast_log("[WEBUI] vLLM container stopped")
@@ -1347,6 +2656,7 @@ async def stop_server():
         server_start_time = None
         current_model_identifier = None
         current_run_mode = None
+        metrics_collector.reset()
         
         return {"status": "stopped"}
     
@@ -1355,6 +2665,89 @@ async def stop_server():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# vLLM log line metrics
+# vLLM periodically logs a stats line such as:
+#   "Avg prompt throughput: 12.0 tokens/s, Avg generation throughput: 85.3 tokens/s, Running: 4 reqs,
+#    Swapped: 0 reqs, Pending: 2 reqs, GPU KV cache usage: 12.5%, CPU KV cache usage: 0.0%"
+#   "Engine 000: ... Running: 4 reqs, Waiting: 2 reqs, GPU KV cache usage: 12.5%, Prefix cache hit rate: 36.1%"
+# One precompiled alternation extracts every field in a single pass over the line.
+LOG_METRIC_RE = re.compile(
+    r'(?P<key>prompt throughput|generation throughput|running|waiting|pending|swapped'
+    r'|(?:(?P<device>gpu|cpu) )?(?:kv )?cache usage|hit rate)'
+    r'[:\s]+(?:gpu:\s*)?(?P<value>[\d.]+)\s*(?P<unit>%|reqs)?',
+    re.IGNORECASE
+)
+LOG_METRIC_KEYS = {
+    'prompt throughput': 'avg_prompt_throughput',
+    'generation throughput': 'avg_generation_throughput',
+    'running': 'num_requests_running',
+    'waiting': 'num_requests_waiting',
+    'pending': 'num_requests_waiting',
+    'swapped': 'num_requests_swapped',
+    'hit rate': 'prefix_cache_hit_rate',
+}
+LOG_METRICS_NOTICE_INTERVAL = 60.0  # seconds between INFO-level "metrics captured" notices
+_last_log_metrics_notice = 0.0
+
+
+def parse_vllm_log_metrics(line: str) -> Dict[str, float]:
+    """
+    Extract metrics from a vLLM log line.
+    
+    Returns an empty dict for the (vast majority of) lines that carry no stats.
+    """
+    # Cheap substring check first - every stats field is a throughput or a percentage
+    if '%' not in line and 'throughput' not in line:
+        return {}
+    
+    metrics = {}
+    for match in LOG_METRIC_RE.finditer(line):
+        key = match.group('key').lower()
+        unit = match.group('unit')
+        try:
+            value = float(match.group('value'))
+        except ValueError:
+            continue
+        
+        if key.endswith('cache usage'):
+            if unit != '%':
+                continue
+            device = (match.group('device') or 'gpu').lower()
+            metrics['cpu_cache_usage_perc' if device == 'cpu' else 'kv_cache_usage_perc'] = value
+        elif key == 'hit rate':
+            if unit == '%':
+                metrics['prefix_cache_hit_rate'] = value
+        elif key in ('running', 'waiting', 'pending', 'swapped'):
+            # Only request counts ("Running: 4 reqs"), not arbitrary prose
+            if unit == 'reqs':
+                metrics[LOG_METRIC_KEYS[key]] = int(value)
+        else:
+            metrics[LOG_METRIC_KEYS[key]] = value
+    
+    return metrics
+
+
+def record_vllm_log_metrics(line: str):
+    """Parse a vLLM log line and store any metrics it carries"""
+    global metrics_timestamp, _last_log_metrics_notice
+    
+    metrics = parse_vllm_log_metrics(line)
+    if not metrics:
+        return
+    
+    latest_vllm_metrics.update(metrics)
+    metrics_timestamp = datetime.now()
+    latest_vllm_metrics['timestamp'] = metrics_timestamp.isoformat()
+    
+    # Throttle diagnostics - vLLM emits a stats line every few seconds under load
+    now = time.monotonic()
+    if now - _last_log_metrics_notice >= LOG_METRICS_NOTICE_INTERVAL:
+        _last_log_metrics_notice = now
+        logger.info(f"📊 Capturing metrics from vLLM logs: {metrics}")
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Metrics from vLLM log: {metrics}")
+
+
 async def read_logs_container():
     """Read logs from vLLM container"""
     global vllm_running
@@ -1371,6 +2764,7 @@ async def read_logs_container():
             if log_line:
                 line = log_line.strip()
                 if line:  # Only send non-empty lines
+                    record_vllm_log_metrics(line)
                     await broadcast_log(line)
                     logger.debug(f"vLLM: {line}")
             
@@ -1405,6 +2799,7 @@ async def read_logs_subprocess():
                 if line:
                     decoded_line = line.decode().strip()
                     if decoded_line:  # Only send non-empty lines
+                        record_vllm_log_metrics(decoded_line)
                         await broadcast_log(decoded_line)
                         logger.debug(f"vLLM: {decoded_line}")
                 else:
@@ -1428,89 +2823,200 @@ async def read_logs_subprocess():
         await broadcast_log(f"[WEBUI] Error reading logs: {e}")
 
 
-async def broadcast_log(message: str):
-    """Broadcast log message to all connected websockets"""
-    global latest_vllm_metrics, metrics_timestamp
+# Log fan-out settings
+LOG_BATCH_INTERVAL = float(os.environ.get("WEBUI_LOG_BATCH_MS", "50")) / 1000  # At most one frame per client per interval
+LOG_SUBSCRIBER_QUEUE_SIZE = int(os.environ.get("WEBUI_LOG_QUEUE_SIZE", "2000"))  # Lines buffered per client
+LOG_FRAME_MAX_LINES = 500  # Split large backlogs (e.g. history replay) into several frames
+# Log history replayed to clients that connect (or reconnect) later
+LOG_HISTORY_LINES = int(os.environ.get("WEBUI_LOG_HISTORY_LINES", "5000"))
+LOG_HISTORY_BYTES = int(os.environ.get("WEBUI_LOG_HISTORY_BYTES", str(2 * 1024 * 1024)))
+
+
+class LogHistory:
+    """
+    Ring buffer of recent log lines, bounded by both line count and total bytes.
     
-    if not message:
-        return
+    Every line gets a monotonically increasing sequence number, which clients
+    use as a cursor (`/ws/logs?since=<seq>`) to resume without duplicates.
+    """
     
-    # Parse metrics from log messages with more flexible patterns
-    import re
+    def __init__(self, max_lines: int = LOG_HISTORY_LINES, max_bytes: int = LOG_HISTORY_BYTES):
+        self.max_lines = max(1, max_lines)
+        self.max_bytes = max(1, max_bytes)
+        self.entries: deque = deque()  # (seq, line, size)
+        self.total_bytes = 0
+        self.last_seq = 0
+    
+    def append(self, line: str) -> int:
+        self.last_seq += 1
+        size = len(line.encode('utf-8', errors='replace'))
+        self.entries.append((self.last_seq, line, size))
+        self.total_bytes += size
+        while self.entries and (len(self.entries) > self.max_lines or self.total_bytes > self.max_bytes):
+            _, _, evicted_size = self.entries.popleft()
+            self.total_bytes -= evicted_size
+        return self.last_seq
+    
+    @property
+    def first_seq(self) -> int:
+        return self.entries[0][0] if self.entries else self.last_seq + 1
+    
+    def since(self, seq: int) -> List[tuple]:
+        """(seq, line) pairs newer than `seq`, oldest first"""
+        if seq >= self.last_seq:
+            return []
+        skip = max(0, seq - self.first_seq + 1)
+        return [(entry_seq, line) for entry_seq, line, _ in list(self.entries)[skip:]]
+
+
+class LogSubscriber:
+    """
+    One WebSocket client of the log stream.
     
-    metrics_updated = False  # Track if we updated any metrics in this log line
-    
-    # Try various patterns for KV cache usage
-    # Examples: "GPU KV cache usage: 0.3%", "KV cache usage: 0.3%", "cache usage: 0.3%"
-    if "cache usage" in message.lower() and "%" in message:
-        # More flexible pattern - match any number before %
-        match = re.search(r'cache usage[:\s]+([\d.]+)\s*%', message, re.IGNORECASE)
-        if match:
-            cache_usage = float(match.group(1))
-            latest_vllm_metrics['kv_cache_usage_perc'] = cache_usage
-            metrics_updated = True
-            logger.info(f"✓ Captured KV cache usage: {cache_usage}% from: {message[:100]}")
-        else:
-            logger.debug(f"Failed to parse cache usage from: {message[:100]}")
-    
-    # Try various patterns for prefix cache hit rate
-    # Examples: "Prefix cache hit rate: 36.1%", "hit rate: 36.1%", "cache hit rate: 36.1%"
-    if "hit rate" in message.lower() and "%" in message:
-        # More flexible pattern
-        match = re.search(r'hit rate[:\s]+([\d.]+)\s*%', message, re.IGNORECASE)
-        if match:
-            hit_rate = float(match.group(1))
-            latest_vllm_metrics['prefix_cache_hit_rate'] = hit_rate
-            metrics_updated = True
-            logger.info(f"✓ Captured prefix cache hit rate: {hit_rate}% from: {message[:100]}")
-        else:
-            logger.debug(f"Failed to parse hit rate from: {message[:100]}")
-    
-    # Try to parse avg prompt throughput
-    if "prompt throughput" in message.lower():
-        match = re.search(r'prompt throughput[:\s]+([\d.]+)', message, re.IGNORECASE)
-        if match:
-            prompt_throughput = float(match.group(1))
-            latest_vllm_metrics['avg_prompt_throughput'] = prompt_throughput
-            metrics_updated = True
-            logger.info(f"✓ Captured prompt throughput: {prompt_throughput}")
-    
-    # Try to parse avg generation throughput
-    if "generation throughput" in message.lower():
-        match = re.search(r'generation throughput[:\s]+([\d.]+)', message, re.IGNORECASE)
-        if match:
-            generation_throughput = float(match.group(1))
-            latest_vllm_metrics['avg_generation_throughput'] = generation_throughput
-            metrics_updated = True
-            logger.info(f"✓ Captured generation throughput: {generation_throughput}")
-    
-    # Update timestamp if we captured any metrics
-    if metrics_updated:
-        metrics_timestamp = datetime.now()
-        latest_vllm_metrics['timestamp'] = metrics_timestamp.isoformat()
-        logger.info(f"📊 Metrics updated at: {metrics_timestamp.strftime('%H:%M:%S')}")
-    
-    disconnected = []
-    for ws in websocket_connections:
+    Lines are buffered in a bounded queue and sent by the subscriber's own task,
+    batched into one frame per LOG_BATCH_INTERVAL. When the client can't keep
+    up, the oldest lines are dropped and replaced by a single notice, so a slow
+    browser only ever loses its own lines.
+    
+    Frames are JSON: `{"seq": <seq of the last history line>, "lines": [...]}`.
+    Lines meant for this client only (e.g. the connection notice) carry no seq.
+    """
+    
+    def __init__(self, websocket: WebSocket, max_lines: int = LOG_SUBSCRIBER_QUEUE_SIZE,
+                 batch_interval: float = LOG_BATCH_INTERVAL):
+        self.websocket = websocket
+        self.max_lines = max(1, max_lines)
+        self.batch_interval = batch_interval
+        self.queue: deque = deque()  # (seq or None, line)
+        self.dropped = 0
+        self._wakeup = asyncio.Event()
+        self._ping = False
+        self.task: Optional[asyncio.Task] = None
+    
+    def offer(self, line: str, seq: Optional[int] = None):
+        """Queue a line without blocking, dropping the oldest one when full"""
+        if len(self.queue) >= self.max_lines:
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append((seq, line))
+        self._wakeup.set()
+    
+    def preload(self, entries: List[tuple]):
+        """Queue replayed history; not subject to the live queue limit"""
+        self.queue.extend(entries)
+        if entries:
+            self._wakeup.set()
+    
+    def ping(self):
+        """Send an empty keep-alive frame if nothing else is pending"""
+        self._ping = True
+        self._wakeup.set()
+    
+    async def run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            
+            if self.dropped:
+                self.queue.appendleft((None, f"[WEBUI] ⚠️ {self.dropped} log lines dropped (client too slow)"))
+                self.dropped = 0
+            
+            if not self.queue and self._ping:
+                await self.websocket.send_text("")
+            while self.queue:
+                batch = [self.queue.popleft() for _ in range(min(len(self.queue), LOG_FRAME_MAX_LINES))]
+                frame = {"lines": [line for _, line in batch]}
+                seqs = [seq for seq, _ in batch if seq is not None]
+                if seqs:
+                    frame["seq"] = seqs[-1]
+                await self.websocket.send_text(json.dumps(frame))
+            self._ping = False
+            
+            # Let a burst of lines accumulate into the next frame
+            await asyncio.sleep(self.batch_interval)
+
+
+class LogHub:
+    """Fan-out of log lines to WebSocket subscribers without blocking the producer"""
+    
+    def __init__(self):
+        self.subscribers: List[LogSubscriber] = []
+        self.history = LogHistory()
+    
+    def subscribe(self, websocket: WebSocket, since: Optional[int] = None) -> LogSubscriber:
+        """
+        Register a client and queue the history it hasn't seen yet.
+        
+        Args:
+            since: Last sequence number the client received; None replays all history
+        """
+        subscriber = LogSubscriber(websocket)
+        history = self.history
+        
+        if since is not None and since > history.last_seq:
+            # Cursor from before a server restart - sequence numbers started over
+            since = None
+        if since is not None and since + 1 < history.first_seq:
+            missed = history.first_seq - since - 1
+            subscriber.offer(f"[WEBUI] ⚠️ {missed} log lines are no longer in history")
+        subscriber.preload(history.since(since or 0))
+        
+        # No await between replay and registration, so no line is missed or duplicated
+        subscriber.task = asyncio.create_task(self._run_subscriber(subscriber))
+        self.subscribers.append(subscriber)
+        return subscriber
+    
+    async def _run_subscriber(self, subscriber: LogSubscriber):
         try:
-            await ws.send_text(message)
+            await subscriber.run()
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"Error sending to websocket: {e}")
-            disconnected.append(ws)
+            logger.debug(f"Log stream send failed, dropping subscriber: {e}")
+        finally:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+    
+    async def unsubscribe(self, subscriber: LogSubscriber):
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+        if subscriber.task is not None and not subscriber.task.done():
+            subscriber.task.cancel()
+            try:
+                await subscriber.task
+            except (asyncio.CancelledError, Exception):
+                pass
+    
+    def publish(self, message: str):
+        seq = self.history.append(message)
+        for subscriber in self.subscribers:
+            subscriber.offer(message, seq)
+
+
+log_hub = LogHub()
+
+
+async def broadcast_log(message: str):
+    """Broadcast log message to all connected websockets (never blocks on slow clients)"""
+    if not message:
+        return
     
-    # Remove disconnected websockets
-    for ws in disconnected:
-        websocket_connections.remove(ws)
+    log_hub.publish(message)
 
 
 @app.websocket("/ws/logs")
-async def websocket_logs(websocket: WebSocket):
-    """WebSocket endpoint for streaming logs"""
+async def websocket_logs(websocket: WebSocket, since: Optional[int] = None):
+    """
+    WebSocket endpoint for streaming logs.
+    
+    Recent history is replayed on connect; pass `?since=<seq>` (the last `seq`
+    received) to resume after a reconnect without duplicates.
+    """
     await websocket.accept()
-    websocket_connections.append(websocket)
+    subscriber = log_hub.subscribe(websocket, since)
     
     try:
-        await websocket.send_text("[WEBUI] Connected to log stream")
+        subscriber.offer("[WEBUI] Connected to log stream")
         
         # Keep connection alive
         while True:
@@ -1519,15 +3025,14 @@ async def websocket_logs(websocket: WebSocket):
                 await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
             except asyncio.TimeoutError:
                 # Send ping to keep connection alive
-                await websocket.send_text("")
+                subscriber.ping()
     
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        if websocket in websocket_connections:
-            websocket_connections.remove(websocket)
+        await log_hub.unsubscribe(subscriber)
 
 
 class ToolChoice(BaseModel):
@@ -1577,16 +3082,780 @@ class ChatRequestWithStopTokens(BaseModel):
     # See: https://docs.vllm.ai/en/latest/features/structured_outputs.html
     structured_outputs: Optional[StructuredOutputs] = None  # For choice, regex, grammar
     response_format: Optional[ResponseFormat] = None  # For JSON schema (OpenAI-compatible)
+    
+    # Server-side history (see ChatSessionStore): `messages` are only the ones
+    # after the first `history_length` already stored for `session_id`
+    session_id: Optional[str] = Field(default=None, max_length=128)
+    history_length: int = 0
+    
+    seed: Optional[int] = None  # Fixed sampling seed (makes the request cacheable, see GenerationCache)
+    cache: bool = True  # Set to False to bypass the generation cache and request coalescing
+    priority: Literal["interactive", "batch"] = "interactive"  # Admission priority class (see RequestScheduler)
+
+
+# Request/response payload logging
+# Payloads are logged through per-route loggers ("<module>.requests.chat", ...) at DEBUG,
+# so they cost nothing unless enabled. Verbosity is set for all routes and per route, e.g.
+#   WEBUI_REQUEST_LOG_LEVEL=INFO WEBUI_REQUEST_LOG_ROUTES="chat=DEBUG,completion=WARNING"
+REQUEST_LOG_LEVEL = os.environ.get("WEBUI_REQUEST_LOG_LEVEL", "INFO").upper()
+REQUEST_LOG_ROUTES = os.environ.get("WEBUI_REQUEST_LOG_ROUTES", "")
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get("WEBUI_REQUEST_LOG_SAMPLE_RATE", "1.0"))  # Fraction of requests logged
+REQUEST_LOG_MAX_CHARS = int(os.environ.get("WEBUI_REQUEST_LOG_MAX_CHARS", "2000"))  # Truncate rendered payloads
+REQUEST_LOG_REDACT_KEYS = {"authorization", "api_key", "hf_token", "token", "password", "secret"}
+
+request_log_root = logging.getLogger(f"{__name__}.requests")
+request_log_root.setLevel(getattr(logging, REQUEST_LOG_LEVEL, logging.INFO))
+for route_level in filter(None, (item.strip() for item in REQUEST_LOG_ROUTES.split(','))):
+    route, _, level = route_level.partition('=')
+    logging.getLogger(f"{__name__}.requests.{route.strip()}").setLevel(
+        getattr(logging, level.strip().upper(), logging.INFO)
+    )
+
+
+def redact_payload(value: Any) -> Any:
+    """Copy of a JSON-like value with secrets masked"""
+    if isinstance(value, dict):
+        return {
+            key: "***" if str(key).lower() in REQUEST_LOG_REDACT_KEYS else redact_payload(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact_payload(item) for item in value]
+    return value
+
+
+class LoggedPayload:
+    """Renders a payload (redacted, truncated) only when a log record is actually emitted"""
+    
+    __slots__ = ('value', 'max_chars')
+    
+    def __init__(self, value: Any, max_chars: int = REQUEST_LOG_MAX_CHARS):
+        self.value = value
+        self.max_chars = max_chars
+    
+    def __str__(self) -> str:
+        value = self.value
+        if isinstance(value, (dict, list)):
+            try:
+                text = json.dumps(redact_payload(value), ensure_ascii=False, default=str)
+            except (TypeError, ValueError):
+                text = str(value)
+        else:
+            text = str(value)
+        if len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}... [{len(text) - self.max_chars} more chars]"
+        return text
+
+
+class RequestLog:
+    """
+    Per-request payload logger for one route.
+    
+    The sampling decision is made once per request, so a sampled request is
+    logged completely. Use `enabled()` to skip building anything expensive.
+    """
+    
+    __slots__ = ('logger', 'sampled')
+    
+    def __init__(self, route: str):
+        self.logger = logging.getLogger(f"{__name__}.requests.{route}")
+        self.sampled = REQUEST_LOG_SAMPLE_RATE >= 1 or random.random() < REQUEST_LOG_SAMPLE_RATE
+    
+    def enabled(self, level: int = logging.DEBUG) -> bool:
+        return self.sampled and self.logger.isEnabledFor(level)
+    
+    def log(self, level: int, msg: str, *args):
+        """Log with lazy %-style arguments (wrap large values in LoggedPayload)"""
+        if self.enabled(level):
+            self.logger.log(level, msg, *args)
+    
+    def debug(self, msg: str, *args):
+        self.log(logging.DEBUG, msg, *args)
+    
+    def info(self, msg: str, *args):
+        self.log(logging.INFO, msg, *args)
+    
+    def payload(self, label: str, value: Any, level: int = logging.DEBUG):
+        self.log(level, "%s: %s", label, LoggedPayload(value))
+
+
+class ChatStreamInspector:
+    """
+    Debug-only parser for a sampled chat stream.
+    
+    Runs beside the pass-through proxy (see CHAT_STREAM_INSPECT_RATE) and logs
+    tool calls, finish reasons and the complete response text. Partial lines
+    are carried over between chunks, so each byte is scanned once.
+    """
+    
+    def __init__(self):
+        self.pending = b""
+        self.text_parts: List[str] = []
+    
+    def feed(self, chunk: bytes):
+        lines = (self.pending + chunk).split(b"\n")
+        self.pending = lines.pop()
+        for line in lines:
+            self._inspect(line.strip())
+    
+    def _inspect(self, line: bytes):
+        if not line.startswith(b"data: "):
+            return
+        data_str = line[6:].strip()
+        if not data_str or data_str == b"[DONE]":
+            return
+        logger.debug(f"vLLM chunk: {line[:500]!r}")
+        try:
+            data = json.loads(data_str)
+        except ValueError as parse_err:
+            logger.debug(f"Failed to parse SSE data: {parse_err}")
+            return
+        
+        choices = data.get('choices') or []
+        if not choices:
+            return
+        choice = choices[0]
+        delta = choice.get('delta', {})
+        if delta.get('content'):
+            self.text_parts.append(delta['content'])
+        
+        # Log tool calls if present
+        if delta.get('tool_calls'):
+            logger.info(f"🔧 Streaming tool_calls in delta: {delta['tool_calls']}")
+        
+        # Log finish reason for debugging
+        finish_reason = choice.get('finish_reason')
+        if finish_reason:
+            logger.info(f"🏁 Finish reason: {finish_reason}")
+            if finish_reason == 'tool_calls' and not delta.get('tool_calls'):
+                logger.warning(f"⚠️ finish_reason is 'tool_calls' but no tool_calls data in delta!")
+                logger.warning(f"⚠️ Full chunk data: {data}")
+    
+    def finish(self):
+        if self.pending.strip():
+            self._inspect(self.pending.strip())
+            self.pending = b""
+        full_response_text = "".join(self.text_parts)
+        logger.info(f"=== vLLM COMPLETE RESPONSE (sampled) ===")
+        logger.info("Full text: %s", LoggedPayload(full_response_text))
+        logger.info(f"Length: {len(full_response_text)} chars")
+        logger.info(f"========================================")
+
+
+# Server-side chat histories: the browser sends only the messages added since its last request
+CHAT_SESSION_TTL = float(os.environ.get("WEBUI_CHAT_SESSION_TTL", "3600"))  # seconds idle before a session expires
+CHAT_SESSION_MAX_BYTES = int(os.environ.get("WEBUI_CHAT_SESSION_MAX_BYTES", str(64 * 1024 * 1024)))  # all sessions
+CHAT_SESSION_MAX_SESSIONS = 1000
+
+
+class ChatSessionMismatchError(Exception):
+    """The client's idea of the stored history length doesn't match the server's"""
+    
+    def __init__(self, stored_length: int):
+        super().__init__(f"Session holds {stored_length} messages")
+        self.stored_length = stored_length
+
+
+class ChatSession:
+    """One conversation: OpenAI-format messages plus their serialized JSON"""
+    __slots__ = ('messages', 'fragments', 'size', 'last_used')
+    
+    def __init__(self):
+        self.messages: List[Dict[str, Any]] = []
+        self.fragments: List[bytes] = []  # json.dumps of each message, reused verbatim every turn
+        self.size = 0
+        self.last_used = time.monotonic()
+    
+    def extend(self, messages: List[Dict[str, Any]]):
+        for message in messages:
+            fragment = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self.messages.append(message)
+            self.fragments.append(fragment)
+            self.size += len(fragment)
+    
+    def extended(self, messages: List[Dict[str, Any]]) -> "ChatSession":
+        """A copy with `messages` added; the stored fragments are shared, not re-serialized"""
+        session = ChatSession()
+        session.messages = list(self.messages)
+        session.fragments = list(self.fragments)
+        session.size = self.size
+        session.extend(messages)
+        return session
+
+
+class ChatSessionStore:
+    """
+    Conversation histories keyed by a client-chosen session ID.
+    
+    A request names the session, how many messages it believes the server
+    already holds (`history_length`) and only the messages after those. The
+    stored messages are replayed unchanged, so earlier turns are neither
+    re-validated nor re-serialized and the rendered prompt keeps an
+    identical prefix for vLLM's prefix cache. Idle sessions expire after
+    CHAT_SESSION_TTL; the least recently used are evicted beyond the byte
+    budget.
+    
+    New messages are only stored once their request has succeeded
+    (prepare(), then commit()), so a request that is shed or fails leaves
+    the history as the client last saw it.
+    """
+    
+    def __init__(self, ttl: float = CHAT_SESSION_TTL, max_bytes: int = CHAT_SESSION_MAX_BYTES,
+                 max_sessions: int = CHAT_SESSION_MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+        self.total_bytes = 0
+        self._sessions: Dict[str, ChatSession] = {}  # Least recently used first
+    
+    def prepare(self, session_id: str, history_length: int, messages: List[Dict[str, Any]]) -> ChatSession:
+        """
+        The stored history with `messages` added after the first `history_length` messages.
+        
+        Nothing is stored until commit(). history_length 0 starts the session
+        over. Raises ChatSessionMismatchError if the session is unknown
+        (expired, server restarted) or holds a different number of messages;
+        the client then resends everything.
+        """
+        self._expire()
+        session = self._sessions.get(session_id)
+        if history_length == 0:
+            return ChatSession().extended(messages)
+        if session is None or len(session.messages) != history_length:
+            raise ChatSessionMismatchError(len(session.messages) if session is not None else 0)
+        return session.extended(messages)
+    
+    def commit(self, session_id: str, session: ChatSession) -> ChatSession:
+        """Store a session returned by prepare() as the history of `session_id`"""
+        previous = self._sessions.pop(session_id, None)
+        if previous is not None:
+            self.total_bytes -= previous.size
+        
+        session.last_used = time.monotonic()
+        self._sessions[session_id] = session
+        self.total_bytes += session.size
+        
+        # Evict least recently used sessions (never the one just used)
+        while (self.total_bytes > self.max_bytes or len(self._sessions) > self.max_sessions) and len(self._sessions) > 1:
+            oldest_id = next(iter(self._sessions))
+            self.total_bytes -= self._sessions.pop(oldest_id).size
+        return session
+    
+    def delete(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self.total_bytes -= session.size
+        return True
+    
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        while self._sessions:
+            oldest_id = next(iter(self._sessions))
+            if self._sessions[oldest_id].last_used >= cutoff:
+                break
+            self.total_bytes -= self._sessions.pop(oldest_id).size
+
+
+chat_sessions = ChatSessionStore()
+
+
+def encode_chat_payload(payload: Dict[str, Any], message_fragments: Optional[List[bytes]] = None) -> bytes:
+    """Serialize a chat completions payload, splicing in pre-serialized messages when given"""
+    if message_fragments is None:
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    rest = json.dumps({k: v for k, v in payload.items() if k != "messages"}, ensure_ascii=False, separators=(',', ':'))
+    body = b'{"messages":[' + b','.join(message_fragments) + b']'
+    if rest != '{}':
+        body += b',' + rest[1:].encode('utf-8')
+    else:
+        body += b'}'
+    return body
+
+
+# Exact-match cache for deterministic generations (temperature 0 or a fixed seed).
+# Off unless WEBUI_GENERATION_CACHE_BYTES is set; requests can opt out with "cache": false.
+GENERATION_CACHE_BYTES = int(os.environ.get("WEBUI_GENERATION_CACHE_BYTES", "0"))
+GENERATION_CACHE_TTL = float(os.environ.get("WEBUI_GENERATION_CACHE_TTL", "600"))  # seconds
+
+
+def generation_key(payload: Dict[str, Any]) -> Optional[str]:
+    """Canonical hash of a deterministic upstream payload, or None if sampling is random"""
+    if payload.get("temperature") != 0 and payload.get("seed") is None:
+        return None
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class GenerationCache:
+    """
+    LRU cache of upstream responses keyed by a canonical hash of the payload.
+    
+    The payload holds everything that determines the output: model
+    identifier, messages or prompt, tools, response_format / guided decoding
+    parameters, stop tokens and sampling parameters. Only requests with
+    temperature 0 or a seed are eligible (see generation_key). Streamed responses are stored as
+    the list of chunks received from vLLM and replayed with the same
+    chunking.
+    """
+    
+    def __init__(self, max_bytes: int = GENERATION_CACHE_BYTES, ttl: float = GENERATION_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 4
+        self.ttl = ttl
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, tuple] = {}  # key -> (expires_at, chunks, size); least recently used first
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+    
+    def get(self, key: str) -> Optional[List[bytes]]:
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self.total_bytes -= entry[2]
+            self.misses += 1
+            return None
+        self._entries[key] = entry
+        self.hits += 1
+        return entry[1]
+    
+    def put(self, key: str, chunks: List[bytes]):
+        size = sum(len(chunk) for chunk in chunks)
+        if size > self.max_entry_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= old[2]
+        self._entries[key] = (time.monotonic() + self.ttl, chunks, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            self.total_bytes -= self._entries.pop(next(iter(self._entries)))[2]
+    
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+generation_cache = GenerationCache()
+
+
+def replay_stream(chunks: List[bytes]) -> StreamingResponse:
+    """A cached SSE response, sent with the original chunking"""
+    async def generate():
+        for chunk in chunks:
+            yield chunk
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Cache": "HIT"}
+    )
+
+
+# Identical deterministic requests that arrive while one is already running share its upstream call.
+# Opt-in like the generation cache (WEBUI_SINGLE_FLIGHT=1): clients then get a shared answer, not their own.
+SINGLE_FLIGHT = os.environ.get("WEBUI_SINGLE_FLIGHT", "0").lower() in ("1", "true", "yes")
+
+
+class SharedCall:
+    """
+    One upstream call whose output is fanned out to every subscriber.
+    
+    Chunks are kept for the lifetime of the call so that a subscriber joining
+    late first receives the prefix that was already produced. The call is
+    cancelled (and its upstream connection dropped) once the last subscriber
+    has left.
+    """
+    
+    def __init__(self, source: AsyncIterator[bytes], on_done: Callable[[], None]):
+        self.chunks: List[bytes] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self._task = asyncio.create_task(self._run(source, on_done))
+    
+    async def _run(self, source: AsyncIterator[bytes], on_done: Callable[[], None]):
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            on_done()
+            self._notify()
+    
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    async def subscribe(self, watcher: "DisconnectWatcher") -> AsyncIterator[bytes]:
+        """All chunks of the call from the start; re-raises the call's error at the end"""
+        self.subscribers += 1
+        sent = 0
+        try:
+            while True:
+                changed = self._changed
+                while sent < len(self.chunks):
+                    yield self.chunks[sent]
+                    sent += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await watcher.run(changed.wait())
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                self._task.cancel()
+
+
+class SingleFlight:
+    """Coalesces identical in-flight requests (keyed by generation_key) onto one SharedCall"""
+    
+    def __init__(self):
+        self._calls: Dict[str, SharedCall] = {}
+        self.started = 0
+        self.coalesced = 0
+    
+    def join(self, key: str, start: Callable[[], AsyncIterator[bytes]]) -> SharedCall:
+        call = self._calls.get(key)
+        if call is not None:
+            self.coalesced += 1
+            logger.info(f"🔗 Joined identical in-flight request ({len(call.chunks)} chunks replayed)")
+            return call
+        
+        def forget():
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        
+        self.started += 1
+        call = SharedCall(start(), forget)
+        self._calls[key] = call
+        return call
+    
+    async def fetch(self, key: str, start: Callable[[], Awaitable[bytes]], http_request: Request) -> bytes:
+        """Non-streaming variant: the shared call produces a single response body"""
+        async def single():
+            yield await start()
+        
+        call = self.join(key, single)
+        watcher = DisconnectWatcher(http_request)
+        try:
+            return b"".join([chunk async for chunk in call.subscribe(watcher)])
+        finally:
+            watcher.close()
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._calls
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": SINGLE_FLIGHT,
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
+
+
+single_flight = SingleFlight()
+
+
+async def follow_shared_stream(call: SharedCall, http_request: Request):
+    """Stream a shared upstream call to one client, replaying the chunks it missed"""
+    watcher = DisconnectWatcher(http_request)
+    try:
+        async for chunk in call.subscribe(watcher):
+            yield chunk
+    except ClientDisconnectedError:
+        logger.info("Client disconnected from shared streaming request")
+    finally:
+        watcher.close()
+
+
+@app.get("/api/generation-cache")
+async def get_generation_cache_stats():
+    """Exact-match generation cache and request coalescing statistics"""
+    return {**generation_cache.stats(), "single_flight": single_flight.stats()}
+
+
+@app.delete("/api/generation-cache")
+async def clear_generation_cache():
+    """Drop all cached generations"""
+    generation_cache.clear()
+    return {"success": True}
+
+
+# Admission control in front of vLLM: a cap on concurrent upstream requests,
+# fair queuing between clients (deficit round robin) and priority classes.
+# WEBUI_MAX_IN_FLIGHT=0 (the default) forwards everything immediately and only keeps statistics.
+MAX_IN_FLIGHT = int(os.environ.get("WEBUI_MAX_IN_FLIGHT", "0"))
+QUEUE_DEADLINE = float(os.environ.get("WEBUI_QUEUE_DEADLINE", "30"))  # seconds a request may wait for a slot
+SCHEDULER_QUANTUM = float(os.environ.get("WEBUI_SCHEDULER_QUANTUM", "512"))  # tokens credited per client per round
+SCHEDULER_PRIORITIES = ("interactive", "batch")  # served strictly in this order
+
+
+class SchedulerBusyError(Exception):
+    """The request would wait (or has waited) longer than the queue deadline"""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+    
+    def to_http(self) -> HTTPException:
+        return HTTPException(status_code=429, detail=str(self), headers={"Retry-After": str(self.retry_after)})
+
+
+class RequestScheduler:
+    """
+    Grants slots for upstream requests, at most `max_in_flight` at a time.
+    
+    Waiting requests are grouped by priority class and, within a class, by
+    client. Classes are served strictly in SCHEDULER_PRIORITIES order; the
+    clients of a class share it by deficit round robin, where a request
+    costs its max_tokens. A single client sending a burst therefore only
+    delays its own requests.
+    
+    Requests whose estimated wait exceeds the deadline are rejected up front
+    (check()), and requests still queued at the deadline give up.
+    """
+    
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, deadline: float = QUEUE_DEADLINE,
+                 quantum: float = SCHEDULER_QUANTUM):
+        self.max_in_flight = max_in_flight
+        self.deadline = deadline
+        self.quantum = quantum
+        self.in_flight = 0
+        self._queues: Dict[str, Dict[str, deque]] = {p: {} for p in SCHEDULER_PRIORITIES}  # client -> waiters, in round order
+        self._deficits: Dict[tuple, float] = {}
+        self._waiting = {p: 0 for p in SCHEDULER_PRIORITIES}
+        self.service_time: Optional[float] = None  # moving average of slot hold time (seconds)
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.recent_waits: deque = deque(maxlen=1000)  # seconds
+    
+    def estimated_wait(self, priority: str) -> float:
+        """Rough queueing delay for a new request of `priority`"""
+        if self.max_in_flight <= 0 or self.service_time is None:
+            return 0.0
+        ahead = 0
+        for p in SCHEDULER_PRIORITIES:
+            ahead += self._waiting[p]
+            if p == priority:
+                break
+        if ahead == 0 and self.in_flight < self.max_in_flight:
+            return 0.0
+        return (ahead + 1) * self.service_time / self.max_in_flight
+    
+    def check(self, priority: str):
+        """Shed a new request now if it could not be admitted before the deadline"""
+        wait = self.estimated_wait(priority)
+        if wait > self.deadline:
+            self.shed += 1
+            raise SchedulerBusyError(f"vLLM is busy: estimated queue wait {wait:.0f}s", wait)
+    
+    async def acquire(self, client: str, priority: str = "interactive", cost: float = 1) -> float:
+        """Wait for a slot; returns the admission time to pass to release()"""
+        enqueued = time.monotonic()
+        if self.max_in_flight <= 0 or (self.in_flight < self.max_in_flight and not any(self._waiting.values())):
+            self.in_flight += 1
+        else:
+            waiter = (asyncio.get_running_loop().create_future(), max(cost, 1))
+            self._queues[priority].setdefault(client, deque()).append(waiter)
+            self._waiting[priority] += 1
+            try:
+                await asyncio.wait_for(waiter[0], self.deadline)
+            except BaseException as e:
+                if waiter[0].done() and not waiter[0].cancelled():
+                    # Admitted just as we gave up: pass the slot on
+                    self._release_slot()
+                else:
+                    self._forget(priority, client, waiter)
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timed_out += 1
+                    raise SchedulerBusyError(f"vLLM is busy: no slot within {self.deadline:g}s", self.estimated_wait(priority)) from None
+                raise
+        admitted = time.monotonic()
+        self.admitted += 1
+        self.recent_waits.append(admitted - enqueued)
+        return admitted
+    
+    async def admit(self, client: str, priority: str = "interactive", cost: float = 1) -> "SchedulerSlot":
+        """acquire(), returning the slot as an object that is safe to release more than once"""
+        return SchedulerSlot(self, await self.acquire(client, priority, cost))
+    
+    def release(self, admitted: float):
+        held = time.monotonic() - admitted
+        self.service_time = held if self.service_time is None else 0.9 * self.service_time + 0.1 * held
+        self._release_slot()
+    
+    def give_back(self):
+        """Return a slot that never carried an upstream request (not counted as service time)"""
+        self._release_slot()
+    
+    def _release_slot(self):
+        self.in_flight -= 1
+        while self.max_in_flight <= 0 or self.in_flight < self.max_in_flight:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            if not waiter[0].done():  # skip waiters that are just giving up
+                self.in_flight += 1
+                waiter[0].set_result(None)
+    
+    def _next_waiter(self) -> Optional[tuple]:
+        for priority in SCHEDULER_PRIORITIES:
+            clients = self._queues[priority]
+            while clients:
+                client = next(iter(clients))
+                waiters = clients[client]
+                key = (priority, client)
+                deficit = self._deficits.get(key, 0.0)
+                if waiters[0][1] <= deficit:
+                    waiter = waiters.popleft()
+                    self._waiting[priority] -= 1
+                    if waiters:
+                        self._deficits[key] = deficit - waiter[1]
+                    else:
+                        del clients[client]
+                        self._deficits.pop(key, None)
+                    return waiter
+                # This client's turn is over: credit it a quantum and move it to the back of the round
+                self._deficits[key] = deficit + self.quantum
+                del clients[client]
+                clients[client] = waiters
+        return None
+    
+    def _forget(self, priority: str, client: str, waiter: tuple):
+        waiters = self._queues[priority].get(client)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        self._waiting[priority] -= 1
+        if not waiters:
+            del self._queues[priority][client]
+            self._deficits.pop((priority, client), None)
+    
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self.recent_waits)
+        
+        def percentile(q: float) -> Optional[float]:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 1)
+        
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queue_depth": sum(self._waiting.values()),
+            "queue_depth_by_priority": dict(self._waiting),
+            "clients_waiting": sum(len(clients) for clients in self._queues.values()),
+            "deadline": self.deadline,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+            "wait_ms": {
+                "avg": round(sum(waits) / len(waits) * 1000, 1) if waits else None,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(waits[-1] * 1000, 1) if waits else None,
+            },
+            "service_time_ms": round(self.service_time * 1000, 1) if self.service_time is not None else None,
+        }
+
+
+class SchedulerSlot:
+    """A slot granted by RequestScheduler.admit(); release() only returns it the first time"""
+    
+    def __init__(self, scheduler: RequestScheduler, admitted: float):
+        self.scheduler = scheduler
+        self.admitted = admitted
+        self.released = False
+    
+    def release(self, used: bool = True):
+        if self.released:
+            return
+        self.released = True
+        if used:
+            self.scheduler.release(self.admitted)
+        else:
+            self.scheduler.give_back()
+
+
+request_scheduler = RequestScheduler()
+
+
+def scheduler_client_id(http_request: Request, session_id: Optional[str] = None) -> str:
+    """Fair-queuing identity of a request: its chat session, else the client address"""
+    if session_id:
+        return session_id
+    return http_request.client.host if http_request.client else "anonymous"
+
+
+async def admit_request(http_request: Request, client_id: str, priority: str, cost: float,
+                        flight_key: Optional[str] = None) -> Optional[SchedulerSlot]:
+    """
+    Wait for a scheduler slot before any response is started.
+    
+    Handlers admit requests up front so that overload always surfaces as a
+    429 (SchedulerBusyError), never as an error event inside a 200 stream.
+    Raises ClientDisconnectedError if the client leaves while queued.
+    
+    A request about to start a shared call (`flight_key`) gets None instead
+    when an identical call started while it was queued: the slot is given
+    back and the request joins that call.
+    """
+    watcher = DisconnectWatcher(http_request)
+    try:
+        slot = await watcher.run(request_scheduler.admit(client_id, priority, cost))
+    finally:
+        watcher.close()
+    if flight_key is not None and flight_key in single_flight:
+        slot.release(used=False)
+        return None
+    return slot
+
+
+@app.get("/api/scheduler")
+async def get_scheduler_stats():
+    """Admission control statistics: slots in use, queue depth and queue wait times"""
+    return request_scheduler.stats()
+
+
+@app.delete("/api/chat/sessions/{session_id}")
+async def delete_chat_session(session_id: str):
+    """Forget a server-side chat history"""
+    return {"success": True, "deleted": chat_sessions.delete(session_id)}
 
 
 @app.post("/api/chat")
-async def chat(request: ChatRequestWithStopTokens):
+async def chat(request: ChatRequestWithStopTokens, http_request: Request):
     """Proxy chat requests to vLLM server using OpenAI-compatible /v1/chat/completions endpoint"""
     global current_config, current_model_identifier, vllm_running, current_run_mode
     
     # Check server status based on mode
-    if current_run_mode == "container" and CONTAINER_MODE_AVAILABLE and container_manager:
-        status = await container_manager.get_container_status()
+    if current_run_mode == "container":
+        status = await container_liveness.get_status()
         if not status.get('running', False):
             raise HTTPException(status_code=400, detail="vLLM server is not running")
     elif current_run_mode == "subprocess":
@@ -1599,39 +3868,11 @@ async def chat(request: ChatRequestWithStopTokens):
         raise HTTPException(status_code=400, detail="Server configuration not available")
     
     try:
-        import aiohttp
-        
         # Use OpenAI-compatible chat completions endpoint
         # vLLM will automatically handle chat template formatting using the model's tokenizer config
-        # In Kubernetes mode, use the service endpoint instead of host:port
-        # Check if we're in Kubernetes by looking for service account token
-        is_kubernetes = os.path.exists('/var/run/secrets/kubernetes.io/serviceaccount/token')
-        
-        logger.info(f"=== CHAT ENDPOINT ROUTING DEBUG ===")
-        logger.info(f"current_run_mode: {current_run_mode}")
-        logger.info(f"is_kubernetes: {is_kubernetes}")
-        logger.info(f"CONTAINER_MODE_AVAILABLE: {CONTAINER_MODE_AVAILABLE}")
-        
-        if current_run_mode == "container" and is_kubernetes:
-            # Kubernetes mode - connect to vLLM service
-            # Use SERVICE_NAME from container_manager if available
-            service_name = getattr(container_manager, 'SERVICE_NAME', 'vllm-service')
-            namespace = getattr(container_manager, 'namespace', os.getenv('KUBERNETES_NAMESPACE', 'default'))
-            url = f"http://{service_name}.{namespace}.svc.cluster.local:{current_config.port}/v1/chat/completions"
-            logger.info(f"✓ Using Kubernetes service URL: {url}")
-            logger.info(f"  Service Name: {service_name}")
-            logger.info(f"  Namespace: {namespace}")
-            logger.info(f"  Port: {current_config.port}")
-        else:
-            # Subprocess mode or local container mode - connect to localhost
-            # Use localhost for container mode since 0.0.0.0 is a bind address, not a valid destination
-            if current_run_mode == "container":
-                url = f"http://localhost:{current_config.port}/v1/chat/completions"
-            else:
-                url = f"http://{current_config.host}:{current_config.port}/v1/chat/completions"
-            logger.info(f"✓ Using URL: {url}")
-        
-        logger.info(f"=====================================")
+        # The replica (and with it the URL) is picked per upstream call, see BackendPool
+        req_log = RequestLog("chat")
+        req_log.debug("current_run_mode: %s, CONTAINER_MODE_AVAILABLE: %s", current_run_mode, CONTAINER_MODE_AVAILABLE)
         
         # Convert messages to OpenAI format with full tool calling support
         messages_dict = []
@@ -1663,6 +3904,25 @@ async def chat(request: ChatRequestWithStopTokens):
             
             messages_dict.append(msg)
         
+        # Continue a stored conversation: upstream gets the stored history plus the new messages.
+        # The session is only updated once the response is on its way (commit_session below).
+        message_fragments = None
+        chat_session = None
+        if request.session_id:
+            try:
+                chat_session = chat_sessions.prepare(request.session_id, request.history_length, messages_dict)
+            except ChatSessionMismatchError as e:
+                raise HTTPException(
+                    status_code=409,
+                    detail={"error": "session_out_of_sync", "history_length": e.stored_length}
+                )
+            messages_dict = list(chat_session.messages)
+            message_fragments = chat_session.fragments
+        
+        def commit_session():
+            if chat_session is not None:
+                chat_sessions.commit(request.session_id, chat_session)
+        
         # Build payload for OpenAI-compatible endpoint
         # Use current_model_identifier (actual path or HF model) instead of config.model
         payload = {
@@ -1672,6 +3932,8 @@ async def chat(request: ChatRequestWithStopTokens):
             "max_tokens": request.max_tokens,
             "stream": request.stream,
         }
+        if request.seed is not None:
+            payload["seed"] = request.seed
         
         # Tool/Function Calling Support
         # Add tools if provided
@@ -1696,9 +3958,11 @@ async def chat(request: ChatRequestWithStopTokens):
                 '{"name": "<function_name>", "arguments": {<parameters>}}'
             )
             # Inject hint into the last system message or first user message
+            # (into a copy: messages may be shared with a stored chat session)
+            message_fragments = None
             for i, msg in enumerate(messages_dict):
                 if msg.get("role") == "system":
-                    messages_dict[i]["content"] = msg["content"] + tool_format_hint
+                    messages_dict[i] = {**msg, "content": msg["content"] + tool_format_hint}
                     logger.info("🔧 Added tool format hint to system message")
                     break
             else:
@@ -1782,101 +4046,91 @@ async def chat(request: ChatRequestWithStopTokens):
             logger.warning(f"Using stop tokens from request (not recommended): {request.stop_tokens}")
         else:
             # Let vLLM handle stop tokens automatically from model's tokenizer (RECOMMENDED)
-            logger.info(f"✓ Letting vLLM handle stop tokens automatically (recommended for /v1/chat/completions)")
-        
-        # Log the request payload being sent to vLLM
-        logger.info(f"=== vLLM REQUEST ===")
-        logger.info(f"URL: {url}")
-        logger.info(f"Payload: {payload}")
-        logger.info(f"Messages ({len(messages_dict)}): {messages_dict}")
-        logger.info(f"==================")
-        
-        async def generate_stream():
-            """Generator for streaming responses"""
-            full_response_text = ""  # Accumulate response for logging
-            buffer = ""  # Buffer for incomplete lines
+            req_log.debug("✓ Letting vLLM handle stop tokens automatically (recommended for /v1/chat/completions)")
+        
+        # Log the request sent to vLLM: a constant-size summary, the payload only at DEBUG
+        req_log.info("Chat request: %d messages, max_tokens=%s, stream=%s, tools=%d",
+                     len(messages_dict), request.max_tokens, request.stream, len(request.tools or []))
+        req_log.payload("vLLM request payload", payload)
+        
+        # Deterministic requests may be answered from the generation cache or share an in-flight call
+        # (the key serializes the whole payload, so it is only computed when one of them is on)
+        request_key = generation_key(payload) if request.cache and (generation_cache.enabled or SINGLE_FLIGHT) else None
+        cache_key = request_key if generation_cache.enabled else None
+        flight_key = request_key if SINGLE_FLIGHT else None
+        if cache_key is not None:
+            cached = generation_cache.get(cache_key)
+            if cached is not None:
+                req_log.info("Chat response served from generation cache")
+                commit_session()
+                if request.stream:
+                    return replay_stream(cached)
+                return Response(content=cached[0], media_type="application/json", headers={"X-Cache": "HIT"})
+        
+        client_id = scheduler_client_id(http_request, request.session_id)
+        # Admitted under this request's own client and class before anything is sent back.
+        # Requests joining a running shared call (below) don't take a slot at all.
+        slot = None
+        if flight_key is None or flight_key not in single_flight:
+            request_scheduler.check(request.priority)
+            slot = await admit_request(http_request, client_id, request.priority, request.max_tokens, flight_key)
+        
+        body = encode_chat_payload(payload, message_fragments)
+        
+        async def generate_stream(client_request: Optional[Request], slot: SchedulerSlot):
+            """Generator for streaming responses - forwards vLLM's SSE bytes unchanged"""
+            inspector = None
+            if CHAT_STREAM_INSPECT_RATE > 0 and random.random() < CHAT_STREAM_INSPECT_RATE:
+                inspector = ChatStreamInspector()
+            watcher = DisconnectWatcher(client_request)
+            replica = None
             try:
+                replica = backend_pool.acquire()
+                url = f"{replica.base_url}/v1/chat/completions"
+                req_log.debug("✓ Using URL: %s (%s)", url, replica.name)
+                
                 # Set reasonable timeout to prevent hanging
-                timeout = aiohttp.ClientTimeout(total=300, connect=10, sock_read=30)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.post(url, json=payload) as response:
-                        if response.status != 200:
-                            text = await response.text()
-                            logger.error(f"=== vLLM ERROR RESPONSE ===")
-                            logger.error(f"Status: {response.status}")
-                            logger.error(f"Error: {text}")
-                            logger.error(f"==========================")
-                            yield f"data: {{'error': '{text}'}}\n\n"
-                            return
-                        
-                        logger.info(f"=== vLLM STREAMING RESPONSE START ===")
-                        # Stream the response chunk by chunk
-                        # OpenAI-compatible chat completions format
-                        try:
-                            async for chunk in response.content.iter_any():
-                                if chunk:
-                                    # Decode the chunk and add to buffer
-                                    buffer += chunk.decode('utf-8')
-                                    
-                                    # Process complete lines from buffer
-                                    while '\n' in buffer:
-                                        line, buffer = buffer.split('\n', 1)
-                                        line = line.strip()
-                                        
-                                        if line:
-                                            # Log each chunk received
-                                            if line != "data: [DONE]":
-                                                logger.debug(f"vLLM chunk: {line}")
-                                            # Try to extract content from SSE data
-                                            import json
-                                            if line.startswith("data: "):
-                                                try:
-                                                    data_str = line[6:].strip()
-                                                    if data_str and data_str != "[DONE]":
-                                                        data = json.loads(data_str)
-                                                        if 'choices' in data and len(data['choices']) > 0:
-                                                            choice = data['choices'][0]
-                                                            delta = choice.get('delta', {})
-                                                            content = delta.get('content', '')
-                                                            finish_reason = choice.get('finish_reason')
-                                                            
-                                                            if content:
-                                                                full_response_text += content
-                                                            
-                                                            # Log tool calls if present
-                                                            if delta.get('tool_calls'):
-                                                                logger.info(f"🔧 Streaming tool_calls in delta: {delta['tool_calls']}")
-                                                            
-                                                            # Log finish reason for debugging
-                                                            if finish_reason:
-                                                                logger.info(f"🏁 Finish reason: {finish_reason}")
-                                                                if finish_reason == 'tool_calls' and not delta.get('tool_calls'):
-                                                                    logger.warning(f"⚠️ finish_reason is 'tool_calls' but no tool_calls data in delta!")
-                                                                    logger.warning(f"⚠️ Full chunk data: {data}")
-                                                except Exception as parse_err:
-                                                    logger.debug(f"Failed to parse SSE data: {parse_err}")
-                                            # Pass through the SSE formatted data
-                                            yield line + '\n'
-                            
-                            # Process any remaining data in buffer
-                            if buffer.strip():
-                                logger.debug(f"vLLM final chunk: {buffer.strip()}")
-                                yield buffer
-                        
-                        except (aiohttp.ClientError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
-                            # Connection error during streaming (e.g., server stopped)
-                            logger.warning(f"Stream interrupted: {type(e).__name__}: {e}")
-                            # Send a final error message to the client
-                            yield f"data: {{'error': 'Stream interrupted: server may have stopped'}}\n\n"
-                            yield "data: [DONE]\n\n"
-                            return
-                        
-                        # Log the complete response
-                        logger.info(f"=== vLLM COMPLETE RESPONSE ===")
-                        logger.info(f"Full text: {full_response_text}")
-                        logger.info(f"Length: {len(full_response_text)} chars")
-                        logger.info(f"===============================")
+                session = get_upstream_session()
+                upstream = session.post(url, data=body, headers=JSON_HEADERS, timeout=UPSTREAM_TIMEOUTS["chat_stream"])
+                async with watcher.attach(await watcher.run(upstream)) as response:
+                    if response.status != 200:
+                        text = await response.text()
+                        logger.error("vLLM error response (status %s): %s", response.status, LoggedPayload(text))
+                        yield f"data: {{'error': '{text}'}}\n\n"
+                        return
+                    
+                    req_log.debug("vLLM streaming response started")
+                    # Pass the OpenAI-compatible SSE stream through as raw bytes
+                    recorded = [] if cache_key is not None else None
+                    recorded_bytes = 0
+                    try:
+                        async for chunk in response.content.iter_any():
+                            if inspector is not None:
+                                inspector.feed(chunk)
+                            if recorded is not None:
+                                recorded.append(chunk)
+                                recorded_bytes += len(chunk)
+                                if recorded_bytes > generation_cache.max_entry_bytes:
+                                    recorded = None
+                            yield chunk
+                    
+                    except (aiohttp.ClientError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                        if watcher.disconnected:
+                            raise ClientDisconnectedError() from None
+                        # Connection error during streaming (e.g., server stopped)
+                        logger.warning(f"Stream interrupted: {type(e).__name__}: {e}")
+                        # Send a final error message to the client
+                        yield f"data: {{'error': 'Stream interrupted: server may have stopped'}}\n\n"
+                        yield "data: [DONE]\n\n"
+                        return
+                    
+                    if inspector is not None:
+                        inspector.finish()
+                    if recorded is not None:
+                        generation_cache.put(cache_key, recorded)
             
+            except ClientDisconnectedError:
+                logger.info("Client disconnected, aborted streaming chat request to vLLM")
             except (aiohttp.ClientError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
                 # Connection error before streaming started
                 logger.error(f"Failed to connect to vLLM: {type(e).__name__}: {e}")
@@ -1887,57 +4141,98 @@ async def chat(request: ChatRequestWithStopTokens):
                 import traceback
                 logger.error(traceback.format_exc())
                 yield f"data: {{'error': 'Internal error during streaming'}}\n\n"
+            finally:
+                watcher.close()
+                if replica is not None:
+                    backend_pool.release(replica)
+                slot.release()
         
         if request.stream:
+            background = None
+            if flight_key is not None:
+                # The shared call outlives any single client; each one follows it separately
+                stream = follow_shared_stream(single_flight.join(flight_key, lambda: generate_stream(None, slot)), http_request)
+            else:
+                stream = generate_stream(http_request, slot)
+                # The generator returns the slot; this covers a response that is cancelled before it starts
+                background = BackgroundTask(slot.release)
+            
             # Return streaming response using SSE
+            commit_session()
             return StreamingResponse(
-                generate_stream(),
+                stream,
                 media_type="text/event-stream",
                 headers={
                     "Cache-Control": "no-cache",
                     "Connection": "keep-alive",
-                }
+                    **({"X-Cache": "MISS"} if cache_key is not None else {}),
+                },
+                background=background
             )
         else:
             # Non-streaming response
-            # Set reasonable timeout to prevent hanging
-            timeout = aiohttp.ClientTimeout(total=60, connect=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, json=payload) as response:
-                    if response.status != 200:
-                        text = await response.text()
-                        logger.error(f"=== vLLM ERROR RESPONSE (non-streaming) ===")
-                        logger.error(f"Status: {response.status}")
-                        logger.error(f"Error: {text}")
-                        logger.error(f"===========================================")
-                        # Provide meaningful error message even if vLLM returns empty body
-                        error_detail = text.strip() if text.strip() else f"vLLM server returned HTTP {response.status}"
-                        raise HTTPException(status_code=response.status, detail=error_detail)
-                    
-                    data = await response.json()
-                    # Log the complete response
-                    logger.info(f"=== vLLM RESPONSE (non-streaming) ===")
-                    logger.info(f"Full response: {data}")
-                    if 'choices' in data and len(data['choices']) > 0:
-                        message = data['choices'][0].get('message', {})
-                        content = message.get('content', '')
-                        tool_calls = message.get('tool_calls', [])
-                        
-                        if content:
-                            logger.info(f"Response text: {content}")
-                            logger.info(f"Length: {len(content)} chars")
+            async def fetch_response(client_request: Optional[Request], slot: SchedulerSlot) -> bytes:
+                # Set reasonable timeout to prevent hanging
+                session = get_upstream_session()
+                watcher = DisconnectWatcher(client_request)
+                replica = None
+                try:
+                    replica = backend_pool.acquire()
+                    url = f"{replica.base_url}/v1/chat/completions"
+                    req_log.debug("✓ Using URL: %s (%s)", url, replica.name)
+                    upstream = session.post(url, data=body, headers=JSON_HEADERS, timeout=UPSTREAM_TIMEOUTS["chat"])
+                    async with watcher.attach(await watcher.run(upstream)) as response:
+                        if response.status != 200:
+                            text = await watcher.run(response.text())
+                            logger.error("vLLM error response (non-streaming, status %s): %s", response.status, LoggedPayload(text))
+                            # Provide meaningful error message even if vLLM returns empty body
+                            error_detail = text.strip() if text.strip() else f"vLLM server returned HTTP {response.status}"
+                            raise HTTPException(status_code=response.status, detail=error_detail)
                         
-                        if tool_calls:
-                            logger.info(f"🔧 Tool calls detected: {len(tool_calls)}")
-                            for tc in tool_calls:
-                                func = tc.get('function', {})
-                                logger.info(f"  - {func.get('name', 'unknown')}: {func.get('arguments', '{}')}")
-                    logger.info(f"=====================================")
-                    return data
+                        data = await watcher.run(response.json())
+                finally:
+                    watcher.close()
+                    if replica is not None:
+                        backend_pool.release(replica)
+                    slot.release()
+                
+                # Log the response (payload only at DEBUG)
+                req_log.payload("vLLM response (non-streaming)", data)
+                if req_log.enabled(logging.INFO) and data.get('choices'):
+                    message = data['choices'][0].get('message', {})
+                    content = message.get('content') or ''
+                    tool_calls = message.get('tool_calls') or []
+                    req_log.info("Chat response: %d chars, %d tool calls", len(content), len(tool_calls))
+                    for tc in tool_calls:
+                        func = tc.get('function', {})
+                        req_log.info("  🔧 %s: %s", func.get('name', 'unknown'), LoggedPayload(func.get('arguments', '{}')))
+                
+                content = json.dumps(data).encode('utf-8')
+                if cache_key is not None:
+                    generation_cache.put(cache_key, [content])
+                return content
+            
+            if flight_key is not None:
+                content = await single_flight.fetch(flight_key, lambda: fetch_response(None, slot), http_request)
+            else:
+                content = await fetch_response(http_request, slot)
+            commit_session()
+            return Response(
+                content=content,
+                media_type="application/json",
+                headers={"X-Cache": "MISS"} if cache_key is not None else None
+            )
     
     except HTTPException:
         # Re-raise HTTPExceptions as-is (they already have proper status and detail)
         raise
+    except SchedulerBusyError as e:
+        logger.warning(f"Chat request shed: {e}")
+        raise e.to_http()
+    except ClientDisconnectedError:
+        # Nobody is waiting for the answer; 499 = "client closed request"
+        logger.info("Client disconnected, aborted chat request to vLLM")
+        return Response(status_code=499)
     except aiohttp.ClientError as e:
         # Handle aiohttp client errors (connection issues, timeouts, etc.)
         error_msg = f"Connection error to vLLM server: {type(e).__name__}: {str(e) or 'Unknown error'}"
@@ -1957,6 +4252,9 @@ class CompletionRequest(BaseModel):
     prompt: str
     temperature: float = 0.7
     max_tokens: int = 256
+    seed: Optional[int] = None  # Fixed sampling seed (makes the request cacheable)
+    cache: bool = True  # Set to False to bypass the generation cache and request coalescing
+    priority: Literal["interactive", "batch"] = "interactive"  # Admission priority class (see RequestScheduler)
 
 
 class ToolValidationRequest(BaseModel):
@@ -2037,8 +4335,7 @@ async def validate_tools(request: ToolValidationRequest):
     }
 
 
-@app.get("/api/tools/presets")
-async def get_tool_presets():
+def build_tool_presets() -> Dict[str, Any]:
     """
     Get predefined tool presets for common use cases.
     
@@ -2200,8 +4497,13 @@ async def get_tool_presets():
     }
 
 
-@app.get("/api/tools/info")
-async def get_tools_info():
+@app.get("/api/tools/presets")
+async def get_tool_presets(request: Request):
+    """Get predefined tool presets for common use cases"""
+    return response_cache.respond(request, "tools_presets", 0, build_tool_presets)
+
+
+def build_tools_info() -> Dict[str, Any]:
     """
     Get information about tool calling support.
     
@@ -2261,14 +4563,20 @@ async def get_tools_info():
     }
 
 
+@app.get("/api/tools/info")
+async def get_tools_info(request: Request):
+    """Get information about tool calling support"""
+    return response_cache.respond(request, "tools_info", 0, build_tools_info)
+
+
 @app.post("/api/completion")
-async def completion(request: CompletionRequest):
+async def completion(request: CompletionRequest, http_request: Request):
     """Proxy completion requests to vLLM server for base models"""
     global current_config, current_model_identifier, current_run_mode
     
     # Check server status based on mode
-    if current_run_mode == "container" and CONTAINER_MODE_AVAILABLE and container_manager:
-        status = await container_manager.get_container_status()
+    if current_run_mode == "container":
+        status = await container_liveness.get_status()
         if not status.get('running', False):
             raise HTTPException(status_code=400, detail="vLLM server is not running")
     elif current_run_mode == "subprocess":
@@ -2281,26 +4589,7 @@ async def completion(request: CompletionRequest):
         raise HTTPException(status_code=400, detail="Server configuration not available")
     
     try:
-        import aiohttp
-        
-        # In Kubernetes mode, use the service endpoint instead of host:port
-        # Check if we're in Kubernetes by looking for service account token
-        is_kubernetes = os.path.exists('/var/run/secrets/kubernetes.io/serviceaccount/token')
-        
-        if current_run_mode == "container" and is_kubernetes:
-            # Kubernetes mode - connect to vLLM service
-            service_name = getattr(container_manager, 'SERVICE_NAME', 'vllm-service')
-            namespace = getattr(container_manager, 'namespace', os.getenv('KUBERNETES_NAMESPACE', 'default'))
-            url = f"http://{service_name}.{namespace}.svc.cluster.local:{current_config.port}/v1/completions"
-            logger.info(f"Using Kubernetes service URL: {url}")
-        else:
-            # Subprocess mode or local container mode - connect to localhost
-            # Use localhost for container mode since 0.0.0.0 is a bind address, not a valid destination
-            if current_run_mode == "container":
-                url = f"http://localhost:{current_config.port}/v1/completions"
-            else:
-                url = f"http://{current_config.host}:{current_config.port}/v1/completions"
-            logger.info(f"Using URL: {url}")
+        req_log = RequestLog("completion")
         
         payload = {
             "model": current_model_identifier if current_model_identifier else current_config.model,
@@ -2308,24 +4597,78 @@ async def completion(request: CompletionRequest):
             "temperature": request.temperature,
             "max_tokens": request.max_tokens
         }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as response:
-                if response.status != 200:
-                    text = await response.text()
-                    raise HTTPException(status_code=response.status, detail=text)
-                
-                data = await response.json()
-                return data
+        if request.seed is not None:
+            payload["seed"] = request.seed
+        req_log.info("Completion request: %d prompt chars, max_tokens=%s", len(request.prompt), request.max_tokens)
+        req_log.payload("vLLM request payload", payload)
+        
+        request_key = generation_key(payload) if request.cache and (generation_cache.enabled or SINGLE_FLIGHT) else None
+        cache_key = request_key if generation_cache.enabled else None
+        flight_key = request_key if SINGLE_FLIGHT else None
+        if cache_key is not None:
+            cached = generation_cache.get(cache_key)
+            if cached is not None:
+                req_log.info("Completion served from generation cache")
+                return Response(content=cached[0], media_type="application/json", headers={"X-Cache": "HIT"})
+        
+        client_id = scheduler_client_id(http_request)
+        # Admitted under this request's own client and class before anything is sent back.
+        # Requests joining a running shared call (below) don't take a slot at all.
+        slot = None
+        if flight_key is None or flight_key not in single_flight:
+            request_scheduler.check(request.priority)
+            slot = await admit_request(http_request, client_id, request.priority, request.max_tokens, flight_key)
+        
+        async def fetch_response(client_request: Optional[Request], slot: SchedulerSlot) -> bytes:
+            session = get_upstream_session()
+            watcher = DisconnectWatcher(client_request)
+            replica = None
+            try:
+                replica = backend_pool.acquire()
+                url = f"{replica.base_url}/v1/completions"
+                req_log.debug("Using URL: %s (%s)", url, replica.name)
+                upstream = session.post(url, json=payload, timeout=UPSTREAM_TIMEOUTS["completion"])
+                async with watcher.attach(await watcher.run(upstream)) as response:
+                    if response.status != 200:
+                        text = await watcher.run(response.text())
+                        raise HTTPException(status_code=response.status, detail=text)
+                    
+                    data = await watcher.run(response.json())
+            finally:
+                watcher.close()
+                if replica is not None:
+                    backend_pool.release(replica)
+                slot.release()
+            
+            req_log.payload("vLLM response", data)
+            content = json.dumps(data).encode('utf-8')
+            if cache_key is not None:
+                generation_cache.put(cache_key, [content])
+            return content
+        
+        if flight_key is not None:
+            content = await single_flight.fetch(flight_key, lambda: fetch_response(None, slot), http_request)
+        else:
+            content = await fetch_response(http_request, slot)
+        return Response(
+            content=content,
+            media_type="application/json",
+            headers={"X-Cache": "MISS"} if cache_key is not None else None
+        )
     
+    except SchedulerBusyError as e:
+        logger.warning(f"Completion request shed: {e}")
+        raise e.to_http()
+    except ClientDisconnectedError:
+        logger.info("Client disconnected, aborted completion request to vLLM")
+        return Response(status_code=499)
     except Exception as e:
         logger.error(f"Completion error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
-@app.get("/api/models")
-async def list_models():
+def build_models_list() -> Dict[str, Any]:
     """Get list of common models"""
     common_models = [
         # CPU-optimized models (recommended for macOS)
@@ -2342,8 +4685,103 @@ async def list_models():
     return {"models": common_models}
 
 
+@app.get("/api/models")
+async def list_models(request: Request):
+    """Get list of common models"""
+    return response_cache.respond(request, "models", 0, build_models_list)
+
+
+class RecipesCatalog:
+    """
+    In-memory view of recipes/recipes_catalog.json with dict indexes.
+    
+    The file is parsed once and re-read only when its mtime or size changes
+    (e.g. after `sync_recipes.py` or a manual edit). Writes go through
+    `write()`, which replaces the file atomically and updates the indexes.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.catalog: Optional[Dict[str, Any]] = None
+        self.categories: Dict[str, Dict[str, Any]] = {}
+        self.recipes: Dict[tuple, Dict[str, Any]] = {}  # (category_id, recipe_id) -> recipe
+        self.version = 0  # Incremented on every (re)load
+        self._signature: Optional[tuple] = None  # (mtime_ns, size) of the loaded file
+    
+    def exists(self) -> bool:
+        return self.path.exists()
+    
+    def get(self) -> Optional[Dict[str, Any]]:
+        """The catalog (treat as read-only), or None if the file doesn't exist"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._index(None, None)
+            return None
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            with open(self.path, "r") as f:
+                catalog = json.load(f)
+            self._index(catalog, signature)
+            logger.info(f"Loaded recipes catalog ({len(self.categories)} categories, {len(self.recipes)} recipes)")
+        return self.catalog
+    
+    def category(self, category_id: str) -> Optional[Dict[str, Any]]:
+        self.get()
+        return self.categories.get(category_id)
+    
+    def recipe(self, category_id: str, recipe_id: str) -> Optional[Dict[str, Any]]:
+        self.get()
+        return self.recipes.get((category_id, recipe_id))
+    
+    def editable_copy(self) -> Optional[Dict[str, Any]]:
+        """A deep copy of the catalog to modify and pass to `write()`"""
+        catalog = self.get()
+        return copy.deepcopy(catalog) if catalog is not None else None
+    
+    def write(self, catalog: Dict[str, Any]):
+        """Atomically replace the catalog file (temp file + rename) and re-index"""
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent), prefix=".recipes_catalog.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(catalog, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates the file with mode 0600 - keep the catalog's own permissions
+            try:
+                mode = self.path.stat().st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        
+        stat = self.path.stat()
+        self._index(catalog, (stat.st_mtime_ns, stat.st_size))
+    
+    def _index(self, catalog: Optional[Dict[str, Any]], signature: Optional[tuple]):
+        if catalog is None and self.catalog is None:
+            return
+        self.catalog = catalog
+        self._signature = signature
+        self.categories = {}
+        self.recipes = {}
+        for category in (catalog or {}).get("categories", []):
+            self.categories[category["id"]] = category
+            for recipe in category.get("recipes", []):
+                self.recipes[(category["id"], recipe["id"])] = recipe
+        self.version += 1
+
+
+recipes_catalog = RecipesCatalog(BASE_DIR / "recipes" / "recipes_catalog.json")
+
+
 @app.get("/api/recipes")
-async def get_recipes():
+async def get_recipes(request: Request):
     """
     Get the vLLM community recipes catalog.
     
@@ -2352,27 +4790,291 @@ async def get_recipes():
     
     Source: https://github.com/vllm-project/recipes
     """
-    recipes_file = BASE_DIR / "recipes" / "recipes_catalog.json"
+    try:
+        catalog = recipes_catalog.get()
+        if catalog is None:
+            return JSONResponse(
+                status_code=404,
+                content={
+                    "error": "Recipes catalog not found",
+                    "message": "Run 'python recipes/sync_recipes.py' to fetch recipes"
+                }
+            )
+        # Re-serialized only when the catalog file changes (reload or save/delete)
+        return response_cache.respond(request, "recipes", recipes_catalog.version, lambda: catalog)
+    except Exception as e:
+        logger.error(f"Error loading recipes catalog: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Failed to load recipes: {str(e)}"}
+        )
+
+
+# Recipes sync runs as a single background job; a second request joins the running one
+RECIPES_SYNC_TIMEOUT = float(os.environ.get("WEBUI_RECIPES_SYNC_TIMEOUT", "120"))  # seconds
+RECIPES_SYNC_HISTORY = 10  # Finished jobs kept for the status endpoint
+RECIPES_SYNC_PROGRESS_RE = re.compile(r'^PROGRESS (\d+)/(\d+)$')
+
+
+class RecipesSyncJob:
+    """State of one run of recipes/sync_recipes.py"""
+    
+    def __init__(self):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.status = "running"  # running | succeeded | failed
+        self.started_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.done = 0
+        self.total = 0
+        self.message = "Fetching recipes from GitHub..."
+        self.error: Optional[str] = None
+        self.catalog: Dict[str, Any] = {}
+        self.stats: Dict[str, int] = {}
+        self.output: deque = deque(maxlen=50)  # Tail of the script's output
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "progress": {"done": self.done, "total": self.total},
+            "message": self.message,
+            "error": self.error,
+            "catalog": self.catalog,
+            "stats": self.stats,
+            "output": "\n".join(self.output),
+        }
+
+
+class RecipesSyncManager:
+    """
+    Runs recipes/sync_recipes.py as a singleton background job.
+    
+    The script only discovers recipes (`--discoveries-out`); merging them into
+    the catalog happens here, synchronously on the event loop, between one
+    `editable_copy()` and one `write()`. That serializes it with the save and
+    delete endpoints, so neither can overwrite the other's changes.
+    """
+    
+    def __init__(self, script: Path):
+        self.script = script
+        self.current: Optional[RecipesSyncJob] = None
+        self.jobs: Dict[str, RecipesSyncJob] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._sync_module = None
+    
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self, github_token: Optional[str] = None) -> tuple:
+        """Start a sync, or return the running one. Returns (job, coalesced)"""
+        if self.running():
+            return self.current, True
+        
+        job = RecipesSyncJob()
+        self.current = job
+        self.jobs[job.job_id] = job
+        while len(self.jobs) > RECIPES_SYNC_HISTORY:
+            del self.jobs[next(iter(self.jobs))]
+        self._task = asyncio.create_task(self._run(job, github_token))
+        return job, False
+    
+    def get(self, job_id: Optional[str] = None) -> Optional[RecipesSyncJob]:
+        if job_id is None:
+            return self.current
+        return self.jobs.get(job_id)
+    
+    async def stop(self):
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+        if self.running():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+    
+    def _load_sync_module(self):
+        """Import the sync script as a module to reuse its catalog merge logic"""
+        if self._sync_module is None:
+            import importlib.util
+            spec = importlib.util.spec_from_file_location("vllm_playground_sync_recipes", self.script)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self._sync_module = module
+        return self._sync_module
+    
+    async def _run(self, job: RecipesSyncJob, github_token: Optional[str]):
+        await broadcast_log(f"[RECIPES] Sync {job.job_id} started")
+        logger.info(f"Starting recipes sync {job.job_id} from GitHub...")
+        
+        fd, discoveries_path = tempfile.mkstemp(prefix="recipes_discoveries_", suffix=".json")
+        os.close(fd)
+        try:
+            env = os.environ.copy()
+            env["PYTHONUNBUFFERED"] = "1"
+            if github_token:
+                env["GITHUB_TOKEN"] = github_token
+                logger.info("Using provided GitHub token for higher rate limits")
+            
+            self._process = await asyncio.create_subprocess_exec(
+                sys.executable, str(self.script), "--progress", "--discoveries-out", discoveries_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=str(BASE_DIR),
+                env=env
+            )
+            try:
+                await asyncio.wait_for(self._read_output(job), timeout=RECIPES_SYNC_TIMEOUT)
+                returncode = await self._process.wait()
+            except asyncio.TimeoutError:
+                self._process.kill()
+                await self._process.wait()
+                raise
+            
+            if returncode != 0:
+                raise RuntimeError("\n".join(job.output) or f"Sync script exited with code {returncode}")
+            
+            with open(discoveries_path, "r") as f:
+                discovered = json.load(f)
+            
+            # Merge and write without awaiting in between (see class docstring)
+            sync_module = self._load_sync_module()
+            catalog = recipes_catalog.editable_copy() or {"metadata": {}, "categories": []}
+            catalog, job.stats = sync_module.update_catalog_with_discoveries(catalog, discovered)
+            catalog.setdefault("metadata", {})["last_updated"] = datetime.now().strftime("%Y-%m-%d")
+            recipes_catalog.write(catalog)
+            
+            job.catalog = {
+                "categories": len(recipes_catalog.categories),
+                "last_updated": catalog["metadata"]["last_updated"],
+                "total_recipes": len(recipes_catalog.recipes)
+            }
+            job.status = "succeeded"
+            job.message = "Recipes synced successfully from GitHub"
+            logger.info(f"Recipes sync {job.job_id} completed successfully: {job.catalog}")
+            await broadcast_log(
+                f"[RECIPES] Sync {job.job_id} finished: {job.catalog['categories']} categories, "
+                f"{job.catalog['total_recipes']} recipes ({job.stats.get('new_recipes', 0)} new)"
+            )
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Cancelled"
+            job.message = "Sync was cancelled"
+            raise
+        except asyncio.TimeoutError:
+            job.status = "failed"
+            job.error = "Timeout"
+            job.message = "Sync operation timed out. GitHub may be slow or rate-limited."
+            logger.error(f"Recipes sync {job.job_id} timed out")
+            await broadcast_log(f"[RECIPES] Sync {job.job_id} timed out")
+        except Exception as e:
+            job.status = "failed"
+            job.error = type(e).__name__
+            job.message = str(e)[-1000:]
+            logger.error(f"Recipes sync {job.job_id} failed: {e}")
+            await broadcast_log(f"[RECIPES] Sync {job.job_id} failed: {job.message.splitlines()[-1] if job.message else job.error}")
+        finally:
+            job.finished_at = datetime.now()
+            self._process = None
+            if os.path.exists(discoveries_path):
+                os.unlink(discoveries_path)
+    
+    async def _read_output(self, job: RecipesSyncJob):
+        """Collect the script's output, turning PROGRESS lines into job progress and log events"""
+        last_broadcast = 0.0
+        async for raw in self._process.stdout:
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            match = RECIPES_SYNC_PROGRESS_RE.match(line)
+            if not match:
+                if line:
+                    job.output.append(line)
+                continue
+            
+            job.done, job.total = int(match.group(1)), int(match.group(2))
+            job.message = f"Fetched {job.done}/{job.total} recipe files"
+            now = time.monotonic()
+            if now - last_broadcast >= 1.0 or job.done == job.total:
+                last_broadcast = now
+                await broadcast_log(f"[RECIPES] Sync {job.job_id}: {job.done}/{job.total} recipe files")
+
+
+recipes_sync = RecipesSyncManager(BASE_DIR / "recipes" / "sync_recipes.py")
+
+
+@app.on_event("shutdown")
+async def shutdown_recipes_sync():
+    await recipes_sync.stop()
+
+
+@app.post("/api/recipes/sync", status_code=202)
+async def sync_recipes(request: Optional[dict] = None):
+    """
+    Sync recipes from the vLLM recipes GitHub repository.
+    
+    Starts sync_recipes.py as a background job and returns immediately. Only
+    one sync runs at a time: while one is running, further requests return
+    that job instead of starting another. Progress is published on the log
+    WebSocket and via GET /api/recipes/sync/status.
+    
+    Request body (optional):
+        {"github_token": "ghp_xxxxx"}  - GitHub token for higher rate limits
+    
+    Returns:
+        Dictionary with the job ID and status
+    """
+    # Get GitHub token from request body if provided
+    github_token = None
+    if request and isinstance(request, dict):
+        github_token = request.get('github_token')
     
-    if not recipes_file.exists():
+    if not recipes_sync.script.exists():
         return JSONResponse(
             status_code=404,
             content={
-                "error": "Recipes catalog not found",
-                "message": "Run 'python recipes/sync_recipes.py' to fetch recipes"
+                "success": False,
+                "error": "Sync script not found",
+                "message": "recipes/sync_recipes.py is missing"
             }
         )
     
+    # Check if requests is installed
     try:
-        with open(recipes_file, "r") as f:
-            catalog = json.load(f)
-        return catalog
-    except Exception as e:
-        logger.error(f"Error loading recipes catalog: {e}")
+        import requests
+    except ImportError:
         return JSONResponse(
-            status_code=500,
-            content={"error": f"Failed to load recipes: {str(e)}"}
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Missing dependency",
+                "message": "The 'requests' package is required. Install with: pip install requests"
+            }
         )
+    
+    job, coalesced = recipes_sync.start(github_token)
+    return {
+        "success": True,
+        "job_id": job.job_id,
+        "status": job.status,
+        "coalesced": coalesced,
+        "message": "Sync already in progress" if coalesced else "Sync started"
+    }
+
+
+@app.get("/api/recipes/sync/status")
+async def get_recipes_sync_status(job_id: Optional[str] = None):
+    """Status of a recipes sync job (the most recent one if no job_id is given)"""
+    job = recipes_sync.get(job_id)
+    if job is None:
+        if job_id is not None:
+            return JSONResponse(
+                status_code=404,
+                content={"success": False, "error": f"Sync job '{job_id}' not found"}
+            )
+        return {"success": True, "job": None}
+    return {"success": True, "job": job.to_dict()}
 
 
 @app.get("/api/recipes/{category_id}")
@@ -2383,21 +5085,16 @@ async def get_recipes_by_category(category_id: str):
     Args:
         category_id: Category identifier (e.g., 'qwen', 'llama', 'deepseek')
     """
-    recipes_file = BASE_DIR / "recipes" / "recipes_catalog.json"
-    
-    if not recipes_file.exists():
-        return JSONResponse(
-            status_code=404,
-            content={"error": "Recipes catalog not found"}
-        )
-    
     try:
-        with open(recipes_file, "r") as f:
-            catalog = json.load(f)
+        if recipes_catalog.get() is None:
+            return JSONResponse(
+                status_code=404,
+                content={"error": "Recipes catalog not found"}
+            )
         
-        for category in catalog.get("categories", []):
-            if category["id"] == category_id:
-                return category
+        category = recipes_catalog.category(category_id)
+        if category is not None:
+            return category
         
         return JSONResponse(
             status_code=404,
@@ -2423,29 +5120,23 @@ async def get_recipe_config(category_id: str, recipe_id: str):
     Returns:
         Recipe configuration ready to be loaded into the playground
     """
-    recipes_file = BASE_DIR / "recipes" / "recipes_catalog.json"
-    
-    if not recipes_file.exists():
-        return JSONResponse(
-            status_code=404,
-            content={"error": "Recipes catalog not found"}
-        )
-    
     try:
-        with open(recipes_file, "r") as f:
-            catalog = json.load(f)
-        
-        for category in catalog.get("categories", []):
-            if category["id"] == category_id:
-                for recipe in category.get("recipes", []):
-                    if recipe["id"] == recipe_id:
-                        return {
-                            "recipe": recipe,
-                            "category": {
-                                "id": category["id"],
-                                "name": category["name"]
-                            }
-                        }
+        if recipes_catalog.get() is None:
+            return JSONResponse(
+                status_code=404,
+                content={"error": "Recipes catalog not found"}
+            )
+        
+        recipe = recipes_catalog.recipe(category_id, recipe_id)
+        if recipe is not None:
+            category = recipes_catalog.category(category_id)
+            return {
+                "recipe": recipe,
+                "category": {
+                    "id": category["id"],
+                    "name": category["name"]
+                }
+            }
         
         return JSONResponse(
             status_code=404,
@@ -2459,174 +5150,41 @@ async def get_recipe_config(category_id: str, recipe_id: str):
         )
 
 
-@app.post("/api/recipes/sync")
-async def sync_recipes(request: Optional[dict] = None):
+@app.post("/api/recipes/save")
+async def save_recipe(request: dict):
     """
-    Sync recipes from the vLLM recipes GitHub repository.
-    
-    This endpoint runs the sync_recipes.py script to fetch the latest
-    recipes and update the local catalog.
-    
-    Request body (optional):
-        {"github_token": "ghp_xxxxx"}  - GitHub token for higher rate limits
+    Save (add or update) a recipe in the catalog.
     
-    Returns:
-        Dictionary with sync status and any discovered updates
+    Request body:
+    {
+        "category_id": "deepseek",
+        "recipe": { ... recipe data ... },
+        "is_new": true/false,
+        "original_recipe_id": "old-id" (if editing),
+        "original_category_id": "old-category" (if moving),
+        "new_category_name": "New Category" (if creating new category)
+    }
     """
-    import subprocess
-    import sys
-    
-    # Get GitHub token from request body if provided
-    github_token = None
-    if request and isinstance(request, dict):
-        github_token = request.get('github_token')
-    
-    sync_script = BASE_DIR / "recipes" / "sync_recipes.py"
-    
-    if not sync_script.exists():
-        return JSONResponse(
-            status_code=404,
-            content={
-                "success": False,
-                "error": "Sync script not found",
-                "message": "recipes/sync_recipes.py is missing"
-            }
-        )
-    
     try:
-        # Check if requests is installed
-        try:
-            import requests
-        except ImportError:
+        # Load current catalog (a copy, so a failed save leaves the cached one intact)
+        catalog = recipes_catalog.editable_copy()
+        if catalog is None:
             return JSONResponse(
-                status_code=400,
-                content={
-                    "success": False,
-                    "error": "Missing dependency",
-                    "message": "The 'requests' package is required. Install with: pip install requests"
-                }
+                status_code=404,
+                content={"success": False, "error": "Recipes catalog not found"}
             )
         
-        # Run the sync script
-        logger.info("Starting recipes sync from GitHub...")
-        
-        # Prepare environment with optional GitHub token
-        env = os.environ.copy()
-        if github_token:
-            env['GITHUB_TOKEN'] = github_token
-            logger.info("Using provided GitHub token for higher rate limits")
-        
-        result = subprocess.run(
-            [sys.executable, str(sync_script)],
-            capture_output=True,
-            text=True,
-            timeout=60,  # 60 second timeout
-            cwd=str(BASE_DIR),
-            env=env
-        )
+        category_id = request.get("category_id")
+        recipe_data = request.get("recipe")
+        is_new = request.get("is_new", True)
+        original_recipe_id = request.get("original_recipe_id")
+        original_category_id = request.get("original_category_id")
+        new_category_name = request.get("new_category_name")
         
-        if result.returncode == 0:
-            # Parse output for summary
-            output_lines = result.stdout.strip().split('\n')
-            
-            # Reload the catalog to get updated data
-            recipes_file = BASE_DIR / "recipes" / "recipes_catalog.json"
-            catalog_info = {}
-            if recipes_file.exists():
-                with open(recipes_file, "r") as f:
-                    catalog = json.load(f)
-                    catalog_info = {
-                        "categories": len(catalog.get("categories", [])),
-                        "last_updated": catalog.get("metadata", {}).get("last_updated", "unknown"),
-                        "total_recipes": sum(
-                            len(cat.get("recipes", [])) 
-                            for cat in catalog.get("categories", [])
-                        )
-                    }
-            
-            logger.info(f"Recipes sync completed successfully: {catalog_info}")
-            
-            return {
-                "success": True,
-                "message": "Recipes synced successfully from GitHub",
-                "catalog": catalog_info,
-                "output": result.stdout[-2000:] if len(result.stdout) > 2000 else result.stdout  # Limit output size
-            }
-        else:
-            # Combine stdout and stderr for better error reporting
-            error_output = result.stderr or result.stdout or "Unknown error (no output)"
-            logger.error(f"Recipes sync failed: {error_output}")
+        if not category_id or not recipe_data:
             return JSONResponse(
-                status_code=500,
-                content={
-                    "success": False,
-                    "error": "Sync failed",
-                    "message": error_output[-1000:] if len(error_output) > 1000 else error_output,
-                    "return_code": result.returncode
-                }
-            )
-            
-    except subprocess.TimeoutExpired:
-        logger.error("Recipes sync timed out")
-        return JSONResponse(
-            status_code=504,
-            content={
-                "success": False,
-                "error": "Timeout",
-                "message": "Sync operation timed out. GitHub may be slow or rate-limited."
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error syncing recipes: {e}")
-        return JSONResponse(
-            status_code=500,
-            content={
-                "success": False,
-                "error": str(type(e).__name__),
-                "message": str(e)
-            }
-        )
-
-
-@app.post("/api/recipes/save")
-async def save_recipe(request: dict):
-    """
-    Save (add or update) a recipe in the catalog.
-    
-    Request body:
-    {
-        "category_id": "deepseek",
-        "recipe": { ... recipe data ... },
-        "is_new": true/false,
-        "original_recipe_id": "old-id" (if editing),
-        "original_category_id": "old-category" (if moving),
-        "new_category_name": "New Category" (if creating new category)
-    }
-    """
-    try:
-        recipes_file = BASE_DIR / "recipes" / "recipes_catalog.json"
-        
-        if not recipes_file.exists():
-            return JSONResponse(
-                status_code=404,
-                content={"success": False, "error": "Recipes catalog not found"}
-            )
-        
-        # Load current catalog
-        with open(recipes_file, "r") as f:
-            catalog = json.load(f)
-        
-        category_id = request.get("category_id")
-        recipe_data = request.get("recipe")
-        is_new = request.get("is_new", True)
-        original_recipe_id = request.get("original_recipe_id")
-        original_category_id = request.get("original_category_id")
-        new_category_name = request.get("new_category_name")
-        
-        if not category_id or not recipe_data:
-            return JSONResponse(
-                status_code=400,
-                content={"success": False, "error": "Missing category_id or recipe data"}
+                status_code=400,
+                content={"success": False, "error": "Missing category_id or recipe data"}
             )
         
         # Find or create category
@@ -2685,12 +5243,10 @@ async def save_recipe(request: dict):
                 logger.info(f"Added recipe (update-as-new): {recipe_data['id']} to {category_id}")
         
         # Update metadata
-        from datetime import datetime
         catalog.setdefault("metadata", {})["last_updated"] = datetime.now().strftime("%Y-%m-%d")
         
-        # Save catalog
-        with open(recipes_file, "w") as f:
-            json.dump(catalog, f, indent=2)
+        # Save catalog (atomic replace)
+        recipes_catalog.write(catalog)
         
         return {
             "success": True,
@@ -2719,9 +5275,7 @@ async def delete_recipe(request: dict):
     }
     """
     try:
-        recipes_file = BASE_DIR / "recipes" / "recipes_catalog.json"
-        
-        if not recipes_file.exists():
+        if not recipes_catalog.exists():
             return JSONResponse(
                 status_code=404,
                 content={"success": False, "error": "Recipes catalog not found"}
@@ -2736,9 +5290,13 @@ async def delete_recipe(request: dict):
                 content={"success": False, "error": "Missing category_id or recipe_id"}
             )
         
-        # Load current catalog
-        with open(recipes_file, "r") as f:
-            catalog = json.load(f)
+        # Load current catalog (a copy, so a failed delete leaves the cached one intact)
+        catalog = recipes_catalog.editable_copy()
+        if catalog is None:
+            return JSONResponse(
+                status_code=404,
+                content={"success": False, "error": "Recipes catalog not found"}
+            )
         
         # Find category and remove recipe
         recipe_deleted = False
@@ -2758,12 +5316,10 @@ async def delete_recipe(request: dict):
             )
         
         # Update metadata
-        from datetime import datetime
         catalog.setdefault("metadata", {})["last_updated"] = datetime.now().strftime("%Y-%m-%d")
         
-        # Save catalog
-        with open(recipes_file, "w") as f:
-            json.dump(catalog, f, indent=2)
+        # Save catalog (atomic replace)
+        recipes_catalog.write(catalog)
         
         return {
             "success": True,
@@ -2796,7 +5352,7 @@ async def validate_local_model(request: dict):
             content={"valid": False, "error": "No path provided"}
         )
     
-    result = validate_local_model_path(model_path)
+    result = await validate_local_model_path_async(model_path)
     
     if result['valid']:
         return result
@@ -2807,63 +5363,146 @@ async def validate_local_model(request: dict):
         )
 
 
-@app.post("/api/browse-directories")
-async def browse_directories(request: dict):
+BROWSE_CACHE_TTL = float(os.environ.get("WEBUI_BROWSE_CACHE_TTL", "10"))  # seconds a listing is reused
+BROWSE_CACHE_SIZE = 256  # Directory listings kept
+BROWSE_PAGE_SIZE = 100  # Default entries per page
+BROWSE_MAX_PAGE_SIZE = 1000
+
+
+class DirectoryListingCache:
     """
-    Browse directories on the server for folder selection
+    Short-lived cache of subdirectory listings, including whether each one
+    looks like a model directory (has config.json).
     
-    Request body: {"path": "/path/to/directory"}
-    Response: {"directories": [...], "current_path": "..."}
+    On network filesystems every stat is a round trip, so paging through a
+    large directory or navigating back and forth reuses the same scan.
     """
-    try:
-        import os
-        from pathlib import Path
-        
-        requested_path = request.get('path', '~')
-        
-        # Expand ~ to home directory
-        if requested_path == '~':
-            requested_path = str(Path.home())
-        
-        path = Path(requested_path).expanduser().resolve()
-        
-        # Security check: ensure path exists and is a directory
-        if not path.exists():
-            # Try parent directory
-            path = path.parent
-            if not path.exists():
-                path = Path.home()
-        
-        if not path.is_dir():
-            path = path.parent
-        
-        # List only directories (not files)
-        directories = []
-        
+    
+    def __init__(self, ttl: float = BROWSE_CACHE_TTL, max_entries: int = BROWSE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, tuple] = {}  # path -> (expires_at, listing)
+        self._lock = threading.Lock()
+    
+    def get(self, path: str) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        
+        listing = self.scan(path)
+        with self._lock:
+            self._entries.pop(path, None)
+            self._entries[path] = (now + self.ttl, listing)
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+        return listing
+    
+    @staticmethod
+    def scan(path: str) -> List[Dict[str, Any]]:
+        """Non-hidden subdirectories of `path`, sorted by name (one scandir pass)"""
+        listing = []
         try:
-            # Add parent directory option (except for root)
-            if path.parent != path:
-                directories.append({
-                    'name': '..',
-                    'path': str(path.parent)
-                })
-            
-            # List subdirectories
-            for item in sorted(path.iterdir()):
-                if item.is_dir() and not item.name.startswith('.'):
-                    # Check if it might be a model directory (has config.json)
-                    is_model_dir = (item / 'config.json').exists()
-                    directories.append({
-                        'name': item.name + (' 🤖' if is_model_dir else ''),
-                        'path': str(item)
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if not entry.is_dir():
+                            continue
+                    except OSError:
+                        continue
+                    listing.append({
+                        'name': entry.name,
+                        'path': entry.path,
+                        'is_model_dir': os.path.exists(os.path.join(entry.path, 'config.json')),
                     })
         except PermissionError:
             logger.warning(f"Permission denied accessing directory: {path}")
+        listing.sort(key=lambda item: item['name'])
+        return listing
+
+
+directory_listing_cache = DirectoryListingCache()
+
+
+def browse_directory_page(requested_path: str, cursor: Optional[str] = None, limit: int = BROWSE_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    One page of subdirectories of `requested_path` (blocking; run in a thread).
+    
+    `cursor` is the name of the last directory of the previous page, so pages
+    stay consistent when the cached listing is refreshed in between.
+    """
+    # Expand ~ to home directory
+    if requested_path == '~':
+        requested_path = str(Path.home())
+    
+    path = Path(requested_path).expanduser().resolve()
+    
+    # Security check: ensure path exists and is a directory
+    if not path.exists():
+        # Try parent directory
+        path = path.parent
+        if not path.exists():
+            path = Path.home()
+    
+    if not path.is_dir():
+        path = path.parent
+    
+    listing = directory_listing_cache.get(str(path))
+    start = 0
+    if cursor:
+        # First entry sorting after the cursor (bisect on the sorted names)
+        lo, hi = 0, len(listing)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if listing[mid]['name'] <= cursor:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = lo
+    page = listing[start:start + limit]
+    
+    directories = []
+    # Add parent directory option (except for root), on the first page only
+    if not cursor and path.parent != path:
+        directories.append({
+            'name': '..',
+            'path': str(path.parent)
+        })
+    for item in page:
+        directories.append({
+            'name': item['name'] + (' 🤖' if item['is_model_dir'] else ''),
+            'path': item['path'],
+            'is_model_dir': item['is_model_dir']
+        })
+    
+    has_more = start + limit < len(listing)
+    return {
+        "directories": directories,
+        "current_path": str(path),
+        "total": len(listing),
+        "next_cursor": page[-1]['name'] if has_more and page else None
+    }
+
+
+@app.post("/api/browse-directories")
+async def browse_directories(request: dict):
+    """
+    Browse directories on the server for folder selection
+    
+    Request body: {"path": "/path/to/directory", "cursor": "...", "limit": 100}
+    Response: {"directories": [...], "current_path": "...", "total": n, "next_cursor": "..." or null}
+    
+    Pass `next_cursor` back as `cursor` to fetch the next page.
+    """
+    try:
+        requested_path = request.get('path') or '~'
+        cursor = request.get('cursor') or None
+        limit = max(1, min(int(request.get('limit') or BROWSE_PAGE_SIZE), BROWSE_MAX_PAGE_SIZE))
         
-        return {
-            "directories": directories[:100],  # Limit to 100 directories
-            "current_path": str(path)
-        }
+        return await asyncio.to_thread(browse_directory_page, requested_path, cursor, limit)
     
     except Exception as e:
         logger.error(f"Error browsing directories: {e}")
@@ -2873,6 +5512,300 @@ async def browse_directories(request: dict):
         )
 
 
+MODEL_INDEX_FILE = Path(os.environ.get(
+    "WEBUI_MODEL_INDEX_FILE",
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "vllm-playground" / "model_index.json"
+))
+MODEL_INDEX_ROOTS = [p for p in os.environ.get("WEBUI_MODEL_ROOTS", "").split(os.pathsep) if p]  # Extra model directories
+MODEL_INDEX_INTERVAL = float(os.environ.get("WEBUI_MODEL_INDEX_INTERVAL", "60"))  # seconds between incremental rescans
+MODEL_INDEX_MAX_DEPTH = 3  # Directory levels searched below each root
+MODEL_INDEX_VERSION = 1
+
+
+def huggingface_cache_dirs() -> List[Path]:
+    """HuggingFace hub cache locations (the one mounted into vLLM containers is ~/.cache/huggingface)"""
+    dirs = [Path(os.environ[name]) for name in ('HF_HUB_CACHE', 'HUGGINGFACE_HUB_CACHE') if os.environ.get(name)]
+    dirs.append(Path(os.environ.get('HF_HOME', Path.home() / '.cache' / 'huggingface')) / 'hub')
+    return dirs
+
+
+def huggingface_snapshot(repo_dir: Path) -> Optional[Path]:
+    """The snapshot `refs/main` points to in a models--org--name cache entry, else the newest one"""
+    snapshots = repo_dir / 'snapshots'
+    try:
+        revision = (repo_dir / 'refs' / 'main').read_text().strip()
+        if revision and (snapshots / revision).is_dir():
+            return snapshots / revision
+    except OSError:
+        pass
+    try:
+        with os.scandir(snapshots) as entries:
+            candidates = [entry for entry in entries if entry.is_dir()]
+    except OSError:
+        return None
+    if not candidates:
+        return None
+    return Path(max(candidates, key=lambda entry: entry.stat().st_mtime_ns).path)
+
+
+def discover_model_dirs(root: Path, max_depth: int = MODEL_INDEX_MAX_DEPTH) -> Dict[str, str]:
+    """
+    Model directories under `root` as {path: model_id}.
+    
+    HF cache entries (models--org--name) resolve to their current snapshot
+    and are named org/name; any other directory with a config.json is a
+    model named after its path relative to `root`.
+    """
+    found: Dict[str, str] = {}
+    stack = [(root, 0)]
+    while stack:
+        current, depth = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                subdirs = [entry for entry in entries if not entry.name.startswith('.') and entry.is_dir()]
+        except OSError:
+            continue
+        for entry in subdirs:
+            if entry.name.startswith('models--'):
+                snapshot = huggingface_snapshot(Path(entry.path))
+                if snapshot is not None:
+                    found[str(snapshot)] = entry.name[len('models--'):].replace('--', '/')
+            elif os.path.exists(os.path.join(entry.path, 'config.json')):
+                found[entry.path] = os.path.relpath(entry.path, root)
+            elif depth + 1 < max_depth:
+                stack.append((Path(entry.path), depth + 1))
+    return found
+
+
+def describe_model_dir(path: Path, model_id: str) -> Dict[str, Any]:
+    """Inventory entry for one model directory (blocking)"""
+    validation = validate_local_model_path(str(path))
+    info = validation['info']
+    entry = {
+        'path': str(path),
+        'model_id': model_id,
+        'valid': validation['valid'],
+        'error': validation['error'],
+        'architecture': (info.get('architectures') or [None])[0],
+        'model_type': info.get('model_type'),
+        'size_mb': info.get('size_mb'),
+        'shards': info.get('weight_files'),
+        'parameters': info.get('parameters'),
+        'quantization': None,
+        'has_chat_template': False,
+    }
+    
+    try:
+        with open(path / 'config.json', 'r') as f:
+            config = json.load(f)
+        quant = config.get('quantization_config') or config.get('compression_config')
+        if quant:
+            entry['quantization'] = quant.get('quant_method') or quant.get('format') or 'unknown'
+        if not entry['architecture']:
+            entry['architecture'] = (config.get('architectures') or [None])[0]
+    except Exception:
+        pass
+    
+    if (path / 'chat_template.jinja').exists() or (path / 'chat_template.json').exists():
+        entry['has_chat_template'] = True
+    else:
+        try:
+            with open(path / 'tokenizer_config.json', 'r') as f:
+                entry['has_chat_template'] = bool(json.load(f).get('chat_template'))
+        except Exception:
+            pass
+    return entry
+
+
+class ModelInventory:
+    """
+    Persistent index of the models found under the configured roots.
+    
+    Roots are the HuggingFace hub cache, the current `download_dir` and
+    WEBUI_MODEL_ROOTS. The index is loaded from MODEL_INDEX_FILE at startup
+    and refreshed in the background; a refresh re-describes only directories
+    whose validation signature (directory and metadata file mtimes) changed.
+    """
+    
+    def __init__(self, index_file: Path = MODEL_INDEX_FILE):
+        self.index_file = index_file
+        self.models: Dict[str, Dict[str, Any]] = {}  # path -> entry
+        self.scanned_at: Optional[str] = None
+        self.scanning = False
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    def roots(self) -> List[Path]:
+        roots = huggingface_cache_dirs()
+        if current_config is not None and current_config.download_dir:
+            roots.append(Path(current_config.download_dir))
+        roots.extend(Path(p) for p in MODEL_INDEX_ROOTS)
+        unique = []
+        for root in roots:
+            root = root.expanduser()
+            if root not in unique:
+                unique.append(root)
+        return unique
+    
+    def load(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == MODEL_INDEX_VERSION:
+            self.models = data.get('models', {})
+            self.scanned_at = data.get('scanned_at')
+            logger.info(f"Loaded model index ({len(self.models)} models) from {self.index_file}")
+    
+    def save(self):
+        data = {'version': MODEL_INDEX_VERSION, 'scanned_at': self.scanned_at, 'models': self.models}
+        tmp_path = None
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=str(self.index_file.parent), prefix=".model_index.", suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_file)
+        except OSError as e:
+            logger.warning(f"Could not save model index to {self.index_file}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+    
+    def refresh(self) -> Dict[str, int]:
+        """Rescan the roots and update changed entries (blocking; run in a thread)"""
+        with self._lock:
+            self.scanning = True
+            try:
+                found: Dict[str, str] = {}
+                for root in self.roots():
+                    if root.is_dir():
+                        found.update(discover_model_dirs(root))
+                
+                models = {}
+                stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+                for path, model_id in found.items():
+                    try:
+                        signature = list(LocalModelValidationCache.signature(Path(path)))
+                    except OSError:
+                        continue
+                    previous = self.models.get(path)
+                    if previous is not None and previous.get('signature') == signature:
+                        models[path] = previous
+                        stats['unchanged'] += 1
+                        continue
+                    entry = describe_model_dir(Path(path), model_id)
+                    entry['signature'] = signature
+                    models[path] = entry
+                    stats['updated' if previous is not None else 'added'] += 1
+                stats['removed'] = len(set(self.models) - set(models))
+                
+                changed = stats['added'] or stats['updated'] or stats['removed']
+                self.models = models
+                self.scanned_at = datetime.now().isoformat()
+                if changed or not self.index_file.exists():
+                    self.save()
+                    logger.info(f"Model index updated: {len(models)} models ({stats})")
+                return stats
+            finally:
+                self.scanning = False
+    
+    def query(self, q: Optional[str] = None, architecture: Optional[str] = None,
+              quantization: Optional[str] = None, has_chat_template: Optional[bool] = None,
+              valid: Optional[bool] = None, min_size_mb: Optional[float] = None,
+              max_size_mb: Optional[float] = None) -> List[Dict[str, Any]]:
+        results = []
+        for entry in self.models.values():
+            if q and q.lower() not in f"{entry['model_id']} {entry['path']}".lower():
+                continue
+            if architecture and (entry.get('architecture') or '').lower() != architecture.lower():
+                continue
+            if quantization is not None:
+                # "none" matches unquantized models
+                value = (entry.get('quantization') or 'none').lower()
+                if value != quantization.lower():
+                    continue
+            if has_chat_template is not None and entry.get('has_chat_template') != has_chat_template:
+                continue
+            if valid is not None and entry.get('valid') != valid:
+                continue
+            size = entry.get('size_mb') or 0
+            if min_size_mb is not None and size < min_size_mb:
+                continue
+            if max_size_mb is not None and size > max_size_mb:
+                continue
+            results.append({key: value for key, value in entry.items() if key != 'signature'})
+        results.sort(key=lambda entry: entry['model_id'].lower())
+        return results
+    
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.warning(f"Model index refresh failed: {e}")
+            await asyncio.sleep(MODEL_INDEX_INTERVAL)
+    
+    def start(self):
+        if self._task is None or self._task.done():
+            self.load()
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+model_inventory = ModelInventory()
+
+
+@app.on_event("startup")
+async def startup_model_inventory():
+    model_inventory.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_model_inventory():
+    await model_inventory.stop()
+
+
+@app.get("/api/models/local")
+async def list_local_models(
+    q: Optional[str] = None,
+    architecture: Optional[str] = None,
+    quantization: Optional[str] = None,
+    has_chat_template: Optional[bool] = None,
+    valid: Optional[bool] = None,
+    min_size_mb: Optional[float] = None,
+    max_size_mb: Optional[float] = None,
+    refresh: bool = False
+):
+    """
+    Models found in the local HuggingFace cache, download_dir and WEBUI_MODEL_ROOTS.
+    
+    Filters: q (substring of model id or path), architecture, quantization
+    ("none" for unquantized), has_chat_template, valid, min/max_size_mb.
+    refresh=true rescans before answering.
+    """
+    if refresh:
+        await asyncio.to_thread(model_inventory.refresh)
+    
+    models = model_inventory.query(q, architecture, quantization, has_chat_template, valid, min_size_mb, max_size_mb)
+    return {
+        "models": models,
+        "total": len(models),
+        "indexed": len(model_inventory.models),
+        "scanned_at": model_inventory.scanned_at,
+        "scanning": model_inventory.scanning,
+        "roots": [str(root) for root in model_inventory.roots()]
+    }
+
+
 class LocalModelValidationRequest(BaseModel):
     """Request to validate a local model path"""
     path: str
@@ -2941,8 +5874,8 @@ async def validate_local_model(request: LocalModelValidationRequest) -> LocalMod
         # Estimate directory size
         estimated_size_mb = None
         try:
-            total_size = sum(f.stat().st_size for f in model_path.rglob('*') if f.is_file())
-            estimated_size_mb = total_size / (1024 * 1024)  # Convert to MB
+            scan = await asyncio.to_thread(scan_model_directory, model_path)
+            estimated_size_mb = scan['total_size'] / (1024 * 1024)  # Convert to MB
         except Exception as e:
             logger.warning(f"Could not estimate model size: {e}")
         
@@ -3002,8 +5935,8 @@ async def check_vllm_health():
     global current_config, vllm_process, current_run_mode
     
     # Check if server is running
-    if current_run_mode == "container" and CONTAINER_MODE_AVAILABLE and container_manager:
-        status = await container_manager.get_container_status()
+    if current_run_mode == "container":
+        status = await container_liveness.get_status()
         if not status.get('running', False):
             return {"success": False, "status_code": 503, "error": "Server not running"}
     elif current_run_mode == "subprocess":
@@ -3013,26 +5946,464 @@ async def check_vllm_health():
     if current_config is None:
         return {"success": False, "status_code": 503, "error": "No configuration"}
     
-    # Try to call vLLM's health endpoint
-    try:
-        import aiohttp
-        
-        if current_run_mode == "container":
-            base_url = f"http://localhost:{current_config.port}"
-        else:
-            base_url = f"http://{current_config.host}:{current_config.port}"
-        
-        health_url = f"{base_url}/health"
-        
-        timeout = aiohttp.ClientTimeout(total=3)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(health_url) as response:
+    # Try to call vLLM's health endpoint on every replica; readiness follows the primary server,
+    # extra replicas only get traffic once the backend pool finds them healthy
+    async def probe(base_url: str) -> Dict[str, Any]:
+        try:
+            session = get_upstream_session()
+            async with session.get(f"{base_url}/health", timeout=UPSTREAM_TIMEOUTS["health"]) as response:
                 if response.status == 200:
                     return {"success": True, "status_code": 200, "message": "Server is healthy"}
                 else:
                     return {"success": False, "status_code": response.status, "error": "Health check failed"}
-    except Exception as e:
-        return {"success": False, "status_code": 503, "error": str(e)}
+        except Exception as e:
+            return {"success": False, "status_code": 503, "error": str(e)}
+    
+    targets = vllm_replica_urls()
+    results = await asyncio.gather(*(probe(url) for _, url in targets))
+    result = dict(results[0])
+    if len(targets) > 1:
+        result["replicas"] = [{"name": name, **replica_result} for (name, _), replica_result in zip(targets, results)]
+    return result
+
+
+# vLLM /metrics collector settings
+METRICS_SCRAPE_INTERVAL = float(os.environ.get("WEBUI_METRICS_SCRAPE_INTERVAL", "5"))  # seconds
+METRICS_HISTORY_SIZE = int(os.environ.get("WEBUI_METRICS_HISTORY_SIZE", "720"))  # samples per series (1h at 5s)
+METRICS_MAX_SERIES = int(os.environ.get("WEBUI_METRICS_MAX_SERIES", "2000"))  # bounds memory with many label sets
+
+# Prometheus text exposition format: `name{label="value",...} value [timestamp]`
+PROMETHEUS_SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)(?:\s+-?\d+)?\s*$')
+PROMETHEUS_LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*"((?:[^"\\]|\\.)*)"')
+PROMETHEUS_TYPE_SUFFIXES = ('_total', '_bucket', '_count', '_sum', '_created')
+
+
+def _unescape_label_value(value: str) -> str:
+    return value.replace('\\"', '"').replace('\\n', '\n').replace('\\\\', '\\')
+
+
+def parse_prometheus_text(text: str):
+    """
+    Parse Prometheus text exposition format.
+    
+    Returns:
+        (types, samples) where `types` maps metric family name to its type
+        (counter, gauge, histogram, summary, untyped) and `samples` is a list
+        of (name, labels, value) tuples with labels as a sorted tuple of pairs.
+    """
+    types: Dict[str, str] = {}
+    samples = []
+    
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('#'):
+            parts = line.split(None, 3)
+            if len(parts) == 4 and parts[1] == 'TYPE':
+                types[parts[2]] = parts[3].strip()
+            continue
+        
+        match = PROMETHEUS_SAMPLE_RE.match(line)
+        if not match:
+            continue
+        name, label_text, value_text = match.groups()
+        try:
+            value = float(value_text)
+        except ValueError:
+            continue
+        
+        labels = ()
+        if label_text:
+            labels = tuple(sorted(
+                (key, _unescape_label_value(val))
+                for key, val in PROMETHEUS_LABEL_RE.findall(label_text)
+            ))
+        samples.append((name, labels, value))
+    
+    return types, samples
+
+
+def histogram_quantile(q: float, buckets: List[tuple]) -> Optional[float]:
+    """
+    Estimate a quantile from cumulative histogram buckets, like PromQL's histogram_quantile.
+    
+    Args:
+        q: Quantile between 0 and 1
+        buckets: (upper_bound, cumulative_count) pairs sorted by upper bound, ending with +Inf
+    """
+    if not buckets or buckets[-1][1] <= 0:
+        return None
+    
+    rank = q * buckets[-1][1]
+    prev_bound, prev_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float('inf'):
+                # Quantile falls in the overflow bucket - best estimate is the last finite bound
+                return prev_bound
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (count - prev_count)
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+class MetricRingBuffer:
+    """Fixed-size, array-backed ring buffer of (timestamp, value) samples"""
+    
+    __slots__ = ('capacity', 'timestamps', 'values', 'start', 'count')
+    
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.timestamps = array('d', bytes(8 * self.capacity))
+        self.values = array('d', bytes(8 * self.capacity))
+        self.start = 0  # Index of the oldest sample
+        self.count = 0
+    
+    def append(self, timestamp: float, value: float):
+        if self.count < self.capacity:
+            index = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            # Full - overwrite the oldest sample
+            index = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.timestamps[index] = timestamp
+        self.values[index] = value
+    
+    def latest(self) -> Optional[tuple]:
+        if self.count == 0:
+            return None
+        index = (self.start + self.count - 1) % self.capacity
+        return self.timestamps[index], self.values[index]
+    
+    def samples(self, since: float = 0.0) -> List[tuple]:
+        """Samples newer than `since`, oldest first"""
+        result = []
+        for offset in range(self.count):
+            index = (self.start + offset) % self.capacity
+            if self.timestamps[index] >= since:
+                result.append((self.timestamps[index], self.values[index]))
+        return result
+
+
+def counter_rate(samples: List[tuple]) -> List[List[float]]:
+    """Per-second rate between consecutive counter samples, treating decreases as restarts"""
+    rates = []
+    for (t0, v0), (t1, v1) in zip(samples, samples[1:]):
+        elapsed = t1 - t0
+        if elapsed <= 0:
+            continue
+        increase = v1 - v0 if v1 >= v0 else v1
+        rates.append([round(t1, 3), increase / elapsed])
+    return rates
+
+
+def counter_increase(samples: List[tuple]) -> float:
+    """Total increase of a counter over the samples, accounting for restarts"""
+    increase = 0.0
+    for (_, v0), (_, v1) in zip(samples, samples[1:]):
+        increase += v1 - v0 if v1 >= v0 else v1
+    return increase
+
+
+class VLLMMetricsCollector:
+    """
+    Background scraper for vLLM's Prometheus `/metrics` endpoint.
+    
+    Every sample of every series (one per metric name + label set) is kept in a
+    fixed-size ring buffer, so the UI can show trends over the last hour instead
+    of a single, possibly stale gauge value. Rates for counters and quantiles
+    for histograms are derived at query time.
+    """
+    
+    QUANTILES = (0.5, 0.9, 0.95, 0.99)
+    
+    def __init__(self, interval: float = METRICS_SCRAPE_INTERVAL, capacity: int = METRICS_HISTORY_SIZE,
+                 max_series: int = METRICS_MAX_SERIES):
+        self.interval = interval
+        self.capacity = capacity
+        self.max_series = max_series
+        self.series: Dict[tuple, MetricRingBuffer] = {}  # (name, labels) -> samples
+        self.types: Dict[str, str] = {}  # metric family -> Prometheus type
+        self.last_scrape: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dropped_series_warned = False
+    
+    def reset(self):
+        """Drop all series, e.g. when the server stops or another model is started"""
+        self.series.clear()
+        self.types.clear()
+        self.last_scrape = None
+        self.last_error = None
+        self._dropped_series_warned = False
+    
+    def metric_type(self, name: str) -> str:
+        if name in self.types:
+            return self.types[name]
+        for suffix in PROMETHEUS_TYPE_SUFFIXES:
+            if name.endswith(suffix) and name[:-len(suffix)] in self.types:
+                return self.types[name[:-len(suffix)]]
+        return 'untyped'
+    
+    def record(self, text: str, timestamp: Optional[float] = None, replica: Optional[str] = None):
+        """Parse one /metrics response and append its samples, labelled with `replica` if given"""
+        timestamp = timestamp if timestamp is not None else time.time()
+        types, samples = parse_prometheus_text(text)
+        self.types.update(types)
+        
+        for name, labels, value in samples:
+            if name.endswith('_created'):
+                continue  # Creation timestamps, not useful as a time series
+            if replica is not None:
+                labels = tuple(sorted(labels + (('replica', replica),)))
+            key = (name, labels)
+            buffer = self.series.get(key)
+            if buffer is None:
+                if len(self.series) >= self.max_series:
+                    if not self._dropped_series_warned:
+                        logger.warning(f"Metrics collector reached {self.max_series} series - ignoring new series")
+                        self._dropped_series_warned = True
+                    continue
+                buffer = self.series[key] = MetricRingBuffer(self.capacity)
+            buffer.append(timestamp, value)
+        
+        self.last_scrape = timestamp
+        self.last_error = None
+    
+    async def _fetch(self, metrics_url: str) -> str:
+        session = get_upstream_session()
+        async with session.get(metrics_url, timeout=UPSTREAM_TIMEOUTS["metrics"]) as response:
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}")
+            return await response.text()
+    
+    async def scrape_once(self, targets: List[Tuple[str, str]]) -> bool:
+        """
+        Scrape the (replica name, base URL) targets concurrently.
+        
+        With several replicas each series gets a `replica` label; summary()
+        adds them up, so it describes the whole backend pool.
+        """
+        results = await asyncio.gather(*(self._fetch(f"{url}/metrics") for _, url in targets), return_exceptions=True)
+        timestamp = time.time()
+        errors = []
+        for (name, _), result in zip(targets, results):
+            if isinstance(result, Exception):
+                error = str(result) or type(result).__name__
+                errors.append(f"{name}: {error}" if len(targets) > 1 else error)
+            else:
+                self.record(result, timestamp, replica=name if len(targets) > 1 else None)
+        
+        if errors:
+            self.last_error = "; ".join(errors)
+            logger.debug(f"Metrics scrape failed: {self.last_error}")
+        return len(errors) < len(targets)
+    
+    async def _run(self):
+        while True:
+            try:
+                targets = vllm_replica_urls()
+                if vllm_running and targets:
+                    await self.scrape_once(targets)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"Metrics collector error: {e}")
+            await asyncio.sleep(self.interval)
+    
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"📊 Metrics collector started (every {self.interval}s, {self.capacity} samples per series)")
+    
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+    
+    def names(self) -> Dict[str, str]:
+        """Available metric names (histograms by their base name) and their types"""
+        names = {}
+        for name, _ in self.series:
+            metric_type = self.metric_type(name)
+            if metric_type == 'histogram':
+                for suffix in ('_bucket', '_count', '_sum'):
+                    if name.endswith(suffix):
+                        name = name[:-len(suffix)]
+                        break
+            names[name] = metric_type
+        return dict(sorted(names.items()))
+    
+    def history(self, name: str, window: float) -> List[Dict[str, Any]]:
+        """
+        Time series for one metric over the last `window` seconds.
+        
+        Counters include a per-second `rate` series; histograms (queried by base
+        name) include count rate, mean and quantiles over the window plus a
+        quantile series computed from bucket increases between scrapes.
+        """
+        since = time.time() - window
+        metric_type = self.metric_type(name)
+        if metric_type == 'histogram' and not any(n == name for n, _ in self.series):
+            return self._histogram_history(name, since)
+        
+        result = []
+        for (series_name, labels), buffer in self.series.items():
+            if series_name != name:
+                continue
+            samples = buffer.samples(since)
+            entry = {
+                'name': name,
+                'labels': dict(labels),
+                'type': metric_type,
+                'samples': [[round(t, 3), v] for t, v in samples],
+            }
+            if metric_type == 'counter':
+                entry['rate'] = counter_rate(samples)
+            result.append(entry)
+        return result
+    
+    def _histogram_history(self, name: str, since: float) -> List[Dict[str, Any]]:
+        # Group bucket series by their labels (minus `le`)
+        groups: Dict[tuple, Dict[float, List[tuple]]] = {}
+        for (series_name, labels), buffer in self.series.items():
+            if series_name != f"{name}_bucket":
+                continue
+            le = dict(labels).get('le')
+            if le is None:
+                continue
+            group_labels = tuple(pair for pair in labels if pair[0] != 'le')
+            groups.setdefault(group_labels, {})[float(le)] = buffer.samples(since)
+        
+        result = []
+        for group_labels, buckets in groups.items():
+            bounds = sorted(buckets)
+            count_buffer = self.series.get((f"{name}_count", group_labels))
+            sum_buffer = self.series.get((f"{name}_sum", group_labels))
+            count_samples = count_buffer.samples(since) if count_buffer else []
+            sum_samples = sum_buffer.samples(since) if sum_buffer else []
+            
+            # Quantiles over the whole window, from each bucket's increase
+            window_buckets = [(bound, counter_increase(buckets[bound])) for bound in bounds]
+            quantiles = {
+                f"p{int(q * 100)}": histogram_quantile(q, window_buckets) for q in self.QUANTILES
+            }
+            
+            # Quantiles per scrape interval, for trend charts
+            by_time = [dict(buckets[bound]) for bound in bounds]
+            timestamps = [t for t, _ in buckets[bounds[-1]]] if bounds else []
+            quantile_series = {f"p{int(q * 100)}": [] for q in self.QUANTILES}
+            for t0, t1 in zip(timestamps, timestamps[1:]):
+                interval_buckets = []
+                for bound, values in zip(bounds, by_time):
+                    if t0 in values and t1 in values:
+                        v0, v1 = values[t0], values[t1]
+                        interval_buckets.append((bound, v1 - v0 if v1 >= v0 else v1))
+                if len(interval_buckets) != len(bounds) or interval_buckets[-1][1] <= 0:
+                    continue
+                for q in self.QUANTILES:
+                    quantile_series[f"p{int(q * 100)}"].append(
+                        [round(t1, 3), histogram_quantile(q, interval_buckets)]
+                    )
+            
+            count_increase = counter_increase(count_samples)
+            sum_increase = counter_increase(sum_samples)
+            result.append({
+                'name': name,
+                'labels': dict(group_labels),
+                'type': 'histogram',
+                'count': count_increase,
+                'mean': sum_increase / count_increase if count_increase > 0 else None,
+                'quantiles': quantiles,
+                'quantile_series': quantile_series,
+                'count_rate': counter_rate(count_samples),
+            })
+        return result
+    
+    def _latest(self, name: str, average: bool = False) -> Optional[float]:
+        """Latest value of a metric, summed (or averaged) over label sets and replicas"""
+        values = [buffer.latest()[1] for (n, _), buffer in self.series.items() if n == name and buffer.count]
+        if not values:
+            return None
+        return sum(values) / len(values) if average else sum(values)
+    
+    def _recent_rate(self, name: str, window: float = 30.0) -> Optional[float]:
+        """Per-second increase of a counter over the last `window` seconds, summed over label sets"""
+        since = time.time() - window
+        total = 0.0
+        found = False
+        for (n, _), buffer in self.series.items():
+            if n != name:
+                continue
+            samples = buffer.samples(since)
+            if len(samples) >= 2 and samples[-1][0] > samples[0][0]:
+                total += counter_increase(samples) / (samples[-1][0] - samples[0][0])
+                found = True
+        return total if found else None
+    
+    def summary(self) -> Dict[str, Any]:
+        """Headline metrics from the latest scrape, in the shape `/api/vllm/metrics` returns"""
+        if self.last_scrape is None:
+            return {}
+        
+        summary = {}
+        # vLLM v1 renamed gpu_cache_usage_perc to kv_cache_usage_perc (both are 0-1 fractions, averaged over replicas)
+        cache_usage = self._latest('vllm:kv_cache_usage_perc', average=True)
+        if cache_usage is None:
+            cache_usage = self._latest('vllm:gpu_cache_usage_perc', average=True)
+        if cache_usage is not None:
+            summary['kv_cache_usage_perc'] = round(cache_usage * 100, 2)
+        
+        # A rate of 0.0 is a real value (no hits), only fall back to the v0 names when the v1 series is missing
+        hits = self._recent_rate('vllm:prefix_cache_hits_total')
+        if hits is None:
+            hits = self._recent_rate('vllm:gpu_prefix_cache_hits_total')
+        queries = self._recent_rate('vllm:prefix_cache_queries_total')
+        if queries is None:
+            queries = self._recent_rate('vllm:gpu_prefix_cache_queries_total')
+        if hits is not None and queries:
+            summary['prefix_cache_hit_rate'] = round(hits / queries * 100, 2)
+        
+        prompt_rate = self._recent_rate('vllm:prompt_tokens_total')
+        if prompt_rate is not None:
+            summary['avg_prompt_throughput'] = round(prompt_rate, 2)
+        generation_rate = self._recent_rate('vllm:generation_tokens_total')
+        if generation_rate is not None:
+            summary['avg_generation_throughput'] = round(generation_rate, 2)
+        
+        for key, metric in (('num_requests_running', 'vllm:num_requests_running'),
+                            ('num_requests_waiting', 'vllm:num_requests_waiting'),
+                            ('num_requests_swapped', 'vllm:num_requests_swapped')):
+            value = self._latest(metric)
+            if value is not None:
+                summary[key] = int(value)
+        
+        if summary:
+            summary['timestamp'] = datetime.fromtimestamp(self.last_scrape).isoformat()
+            summary['metrics_age_seconds'] = round(time.time() - self.last_scrape, 1)
+        return summary
+
+
+metrics_collector = VLLMMetricsCollector()
+
+
+@app.on_event("startup")
+async def startup_metrics_collector():
+    """Start scraping vLLM's /metrics endpoint in the background"""
+    metrics_collector.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_metrics_collector():
+    """Stop the metrics scraper"""
+    await metrics_collector.stop()
 
 
 @app.get("/api/vllm/metrics")
@@ -3041,8 +6412,8 @@ async def get_vllm_metrics():
     global current_config, latest_vllm_metrics, metrics_timestamp, current_run_mode
     
     # Check server status based on mode
-    if current_run_mode == "container" and CONTAINER_MODE_AVAILABLE and container_manager:
-        status = await container_manager.get_container_status()
+    if current_run_mode == "container":
+        status = await container_liveness.get_status()
         if not status.get('running', False):
             return JSONResponse(
                 status_code=400, 
@@ -3060,94 +6431,64 @@ async def get_vllm_metrics():
             content={"error": "vLLM server is not running"}
         )
     
-    # Calculate how fresh the metrics are
+    # Calculate how fresh the log-parsed metrics are
     metrics_age_seconds = None
     if metrics_timestamp:
         metrics_age_seconds = (datetime.now() - metrics_timestamp).total_seconds()
-        logger.info(f"Returning metrics (age: {metrics_age_seconds:.1f}s): {latest_vllm_metrics}")
-    else:
-        logger.info(f"Returning metrics (no timestamp): {latest_vllm_metrics}")
     
-    # Return metrics parsed from logs with freshness indicator
-    if latest_vllm_metrics:
-        result = latest_vllm_metrics.copy()
-        if metrics_age_seconds is not None:
-            result['metrics_age_seconds'] = round(metrics_age_seconds, 1)
-        return result
+    result = latest_vllm_metrics.copy()
+    if metrics_age_seconds is not None:
+        result['metrics_age_seconds'] = round(metrics_age_seconds, 1)
     
-    # If no metrics captured yet from logs, try the metrics endpoint
-    if current_config is None:
-        return {}
+    # Overlay values from the /metrics collector, which are scraped on a fixed interval
+    # and therefore fresher than the last stats line vLLM happened to log
+    if metrics_collector.last_scrape is None:
+        targets = vllm_replica_urls()
+        if targets:
+            await metrics_collector.scrape_once(targets)
+    result.update(metrics_collector.summary())
     
-    try:
-        import aiohttp
-        
-        # Try to fetch metrics from vLLM's metrics endpoint
-        # In Kubernetes mode, use the service endpoint instead of host:port
-        # Check if we're in Kubernetes by looking for service account token
-        is_kubernetes = os.path.exists('/var/run/secrets/kubernetes.io/serviceaccount/token')
-        
-        if current_run_mode == "container" and is_kubernetes:
-            # Kubernetes mode - connect to vLLM service
-            service_name = getattr(container_manager, 'SERVICE_NAME', 'vllm-service')
-            namespace = getattr(container_manager, 'namespace', os.getenv('KUBERNETES_NAMESPACE', 'default'))
-            metrics_url = f"http://{service_name}.{namespace}.svc.cluster.local:{current_config.port}/metrics"
-        else:
-            # Subprocess mode or local container mode - connect to localhost
-            # Use localhost for container mode since 0.0.0.0 is a bind address, not a valid destination
-            if current_run_mode == "container":
-                metrics_url = f"http://localhost:{current_config.port}/metrics"
-            else:
-                metrics_url = f"http://{current_config.host}:{current_config.port}/metrics"
-        
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(metrics_url, timeout=aiohttp.ClientTimeout(total=2)) as response:
-                    if response.status == 200:
-                        text = await response.text()
-                        
-                        # Parse Prometheus-style metrics
-                        metrics = {}
-                        
-                        # Look for KV cache usage
-                        for line in text.split('\n'):
-                            if 'vllm:gpu_cache_usage_perc' in line and not line.startswith('#'):
-                                try:
-                                    value = float(line.split()[-1])
-                                    metrics['gpu_cache_usage_perc'] = value
-                                except:
-                                    pass
-                            elif 'vllm:cpu_cache_usage_perc' in line and not line.startswith('#'):
-                                try:
-                                    value = float(line.split()[-1])
-                                    metrics['cpu_cache_usage_perc'] = value
-                                except:
-                                    pass
-                            elif 'vllm:avg_prompt_throughput_toks_per_s' in line and not line.startswith('#'):
-                                try:
-                                    value = float(line.split()[-1])
-                                    metrics['avg_prompt_throughput'] = value
-                                except:
-                                    pass
-                            elif 'vllm:avg_generation_throughput_toks_per_s' in line and not line.startswith('#'):
-                                try:
-                                    value = float(line.split()[-1])
-                                    metrics['avg_generation_throughput'] = value
-                                except:
-                                    pass
-                        
-                        return metrics
-                    else:
-                        return {}
-            except asyncio.TimeoutError:
-                return {}
-            except Exception as e:
-                logger.debug(f"Error fetching metrics endpoint: {e}")
-                return {}
+    logger.debug(f"Returning metrics: {result}")
+    return result
+
+
+@app.get("/api/vllm/metrics/history")
+async def get_vllm_metrics_history(series: Optional[str] = None, window: float = 300):
+    """
+    Get time series collected from vLLM's /metrics endpoint.
     
-    except Exception as e:
-        logger.debug(f"Error in get_vllm_metrics: {e}")
-        return {}
+    Args:
+        series: Comma-separated metric names (histograms by base name, e.g.
+            `vllm:e2e_request_latency_seconds`). Omit to list available metrics.
+        window: How far back to look, in seconds
+    """
+    max_window = metrics_collector.interval * metrics_collector.capacity
+    window = max(metrics_collector.interval, min(window, max_window))
+    
+    response = {
+        "interval": metrics_collector.interval,
+        "window": window,
+        "last_scrape": metrics_collector.last_scrape,
+        "last_error": metrics_collector.last_error,
+    }
+    
+    if not series:
+        response["metrics"] = metrics_collector.names()
+        return response
+    
+    names = [name.strip() for name in series.split(',') if name.strip()]
+    results = []
+    for name in names:
+        results.extend(metrics_collector.history(name, window))
+    
+    if not results:
+        return JSONResponse(
+            status_code=404,
+            content={"error": f"No samples for series: {', '.join(names)}"}
+        )
+    
+    response["series"] = results
+    return response
 
 
 @app.post("/api/benchmark/start")
@@ -3156,8 +6497,8 @@ async def start_benchmark(config: BenchmarkConfig):
     global current_config, benchmark_task, benchmark_results, current_run_mode
     
     # Check server status based on mode
-    if current_run_mode == "container" and CONTAINER_MODE_AVAILABLE and container_manager:
-        status = await container_manager.get_container_status()
+    if current_run_mode == "container":
+        status = await container_liveness.get_status()
         if not status.get('running', False):
             raise HTTPException(status_code=400, detail="vLLM server is not running")
     elif current_run_mode == "subprocess":
@@ -3230,103 +6571,232 @@ async def stop_benchmark():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+BENCHMARK_LATE_THRESHOLD = 0.01  # seconds behind schedule before an open-loop arrival counts as late
+
+
 async def run_benchmark(config: BenchmarkConfig, server_config: VLLMConfig):
     """Run a simple benchmark test"""
     global benchmark_results, current_model_identifier, current_run_mode
     
     try:
-        import aiohttp
-        import time
         import random
         import numpy as np
         
         await broadcast_log(f"[BENCHMARK] Configuration: {config.total_requests} requests at {config.request_rate} req/s")
-        
-        # In Kubernetes mode, use the service endpoint instead of host:port
-        # Check if we're in Kubernetes by looking for service account token
-        is_kubernetes = os.path.exists('/var/run/secrets/kubernetes.io/serviceaccount/token')
-        
-        if current_run_mode == "container" and is_kubernetes:
-            # Kubernetes mode - connect to vLLM service
-            service_name = getattr(container_manager, 'SERVICE_NAME', 'vllm-service')
-            namespace = getattr(container_manager, 'namespace', os.getenv('KUBERNETES_NAMESPACE', 'default'))
-            url = f"http://{service_name}.{namespace}.svc.cluster.local:{server_config.port}/v1/chat/completions"
-            logger.info(f"Using Kubernetes service URL for benchmark: {url}")
+        if config.load_mode == "closed":
+            await broadcast_log(f"[BENCHMARK] Load: closed loop with {config.concurrency} concurrent workers")
         else:
-            # Subprocess mode or local container mode - connect to localhost
-            # Use localhost for container mode since 0.0.0.0 is a bind address, not a valid destination
-            if current_run_mode == "container":
-                url = f"http://localhost:{server_config.port}/v1/chat/completions"
-            else:
-                url = f"http://{server_config.host}:{server_config.port}/v1/chat/completions"
-            logger.info(f"Using URL for benchmark: {url}")
+            in_flight_cap = f"max {config.max_in_flight} in flight" if config.max_in_flight else "no in-flight cap"
+            await broadcast_log(f"[BENCHMARK] Load: open loop ({config.arrival_distribution} arrivals, {in_flight_cap})")
+        if config.duration_s:
+            await broadcast_log(f"[BENCHMARK] Duration limit: {config.duration_s}s")
+        
+        # Requests are spread over the backend pool like chat requests
+        replica_urls = [replica.base_url or vllm_base_url(server_config.port) for replica in backend_pool.replicas]
+        logger.info(f"Using vLLM replicas for benchmark: {', '.join(replica_urls)}")
         
         # Generate a sample prompt of specified length
         prompt_text = " ".join(["benchmark" for _ in range(config.prompt_tokens // 10)])
         
-        results = []
-        successful = 0
-        failed = 0
-        start_time = time.time()
+        payload = {
+            "model": current_model_identifier if current_model_identifier else server_config.model,
+            "messages": [{"role": "user", "content": prompt_text}],
+            "max_tokens": config.output_tokens,
+            "temperature": 0.7,
+        }
         
-        # Create session
-        async with aiohttp.ClientSession() as session:
-            # Send requests
-            for i in range(config.total_requests):
-                request_start = time.time()
-                
+        # Add stop tokens only if user configured custom ones
+        # Otherwise let vLLM handle stop tokens automatically
+        if server_config.custom_stop_tokens:
+            payload["stop"] = server_config.custom_stop_tokens
+        
+        if config.stream:
+            # Ask vLLM to append a final usage chunk so token counts stay exact
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+            await broadcast_log("[BENCHMARK] Streaming mode: measuring TTFT and inter-token latency")
+        
+        results = []
+        counters = {"dispatched": 0, "completed": 0, "successful": 0, "failed": 0, "dropped": 0, "late": 0}
+        progress_step = max(1, config.total_requests // 10)
+        concurrency = max(1, config.concurrency)
+        
+        # Reuse the shared upstream session (keep-alive connections)
+        session = get_upstream_session()
+        
+        async def read_stream(response, request_start: float) -> Dict[str, Any]:
+            """Consume an SSE response, timing each content chunk as it arrives"""
+            first_token_time = None
+            last_token_time = None
+            token_gaps = []
+            chunk_count = 0
+            usage = {}
+            
+            async for line in response.content:
+                if not line.startswith(b"data: "):
+                    continue
+                data_str = line[6:].strip()
+                if data_str == b"[DONE]":
+                    break
                 try:
-                    payload = {
-                        "model": current_model_identifier if current_model_identifier else server_config.model,
-                        "messages": [{"role": "user", "content": prompt_text}],
-                        "max_tokens": config.output_tokens,
-                        "temperature": 0.7,
-                    }
-                    
-                    # Add stop tokens only if user configured custom ones
-                    # Otherwise let vLLM handle stop tokens automatically
-                    if server_config.custom_stop_tokens:
-                        payload["stop"] = server_config.custom_stop_tokens
-                    
-                    async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=60)) as response:
-                        if response.status == 200:
+                    data = json.loads(data_str)
+                except json.JSONDecodeError:
+                    continue
+                
+                if data.get('usage'):
+                    usage = data['usage']
+                choices = data.get('choices') or []
+                if choices and choices[0].get('delta', {}).get('content'):
+                    now = time.perf_counter()
+                    if first_token_time is None:
+                        first_token_time = now
+                    else:
+                        token_gaps.append((now - last_token_time) * 1000)
+                    last_token_time = now
+                    chunk_count += 1
+            
+            request_end = time.perf_counter()
+            # Each content chunk carries one token unless usage says otherwise
+            completion_tokens = usage.get('completion_tokens', chunk_count)
+            
+            ttft = None
+            tpot = None
+            if first_token_time is not None:
+                ttft = (first_token_time - request_start) * 1000
+                if completion_tokens > 1:
+                    tpot = (request_end - first_token_time) * 1000 / (completion_tokens - 1)
+            
+            return {
+                'latency': (request_end - request_start) * 1000,
+                'tokens': completion_tokens,
+                'usage': usage,
+                'ttft': ttft,
+                'itl': token_gaps,
+                'tpot': tpot,
+            }
+        
+        async def send_request(i: int, scheduled_at: Optional[float] = None):
+            """
+            Send one benchmark request and record its result.
+            
+            Open-loop requests pass their scheduled arrival time: latency is measured
+            from when the request should have been sent, so time spent waiting to be
+            dispatched is not dropped from the results (coordinated omission).
+            """
+            request_start = scheduled_at if scheduled_at is not None else time.perf_counter()
+            admitted = None
+            replica = None
+            try:
+                # Benchmark traffic queues behind interactive chat (see RequestScheduler)
+                admitted = await request_scheduler.acquire("benchmark", "batch", config.output_tokens)
+                replica = backend_pool.acquire()
+                url = f"{replica.base_url}/v1/chat/completions"
+                async with session.post(url, json=payload, timeout=UPSTREAM_TIMEOUTS["benchmark"]) as response:
+                    if response.status == 200:
+                        if config.stream:
+                            result = await read_stream(response, request_start)
+                            usage = result.pop('usage')
+                        else:
                             data = await response.json()
-                            request_end = time.time()
-                            latency = (request_end - request_start) * 1000  # ms
-                            
-                            # Extract token counts
+                            request_end = time.perf_counter()
                             usage = data.get('usage', {})
-                            completion_tokens = usage.get('completion_tokens', config.output_tokens)
-                            
-                            # Debug: Log token extraction for first few requests
-                            if i < 3:
-                                logger.info(f"[BENCHMARK DEBUG] Request {i+1} usage: {usage}")
-                                logger.info(f"[BENCHMARK DEBUG] Request {i+1} completion_tokens: {completion_tokens}")
-                            
-                            results.append({
-                                'latency': latency,
-                                'tokens': completion_tokens
-                            })
-                            successful += 1
+                            result = {
+                                'latency': (request_end - request_start) * 1000,  # ms
+                                'tokens': usage.get('completion_tokens', config.output_tokens)
+                            }
+                        
+                        # Debug: Log token extraction for first few requests
+                        if i < 3:
+                            logger.info(f"[BENCHMARK DEBUG] Request {i+1} usage: {usage}")
+                            logger.info(f"[BENCHMARK DEBUG] Request {i+1} completion_tokens: {result['tokens']}")
+                        
+                        results.append(result)
+                        counters["successful"] += 1
+                    else:
+                        counters["failed"] += 1
+                        logger.warning(f"Request {i+1} failed with status {response.status}")
+            
+            except Exception as e:
+                counters["failed"] += 1
+                logger.error(f"Request {i+1} error: {e}")
+            finally:
+                if replica is not None:
+                    backend_pool.release(replica)
+                if admitted is not None:
+                    request_scheduler.release(admitted)
+            
+            # Progress update
+            counters["completed"] += 1
+            if counters["completed"] % progress_step == 0:
+                progress = (counters["completed"] / config.total_requests) * 100
+                await broadcast_log(f"[BENCHMARK] Progress: {progress:.0f}% ({counters['completed']}/{config.total_requests} requests)")
+        
+        def time_left() -> bool:
+            """Whether the optional duration limit still allows new requests"""
+            return config.duration_s is None or (time.time() - start_time) < config.duration_s
+        
+        start_time = time.time()
+        
+        if config.load_mode == "closed":
+            # Closed loop: N workers, each sends its next request as soon as the previous one completes
+            async def worker():
+                while counters["dispatched"] < config.total_requests and time_left():
+                    i = counters["dispatched"]
+                    counters["dispatched"] += 1
+                    await send_request(i)
+            
+            workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+        else:
+            # Open loop: dispatch at the target arrival rate regardless of completions.
+            # The arrival loop never waits for a slot: arrivals over the optional in-flight
+            # cap are dropped and counted, so a saturated server can't slow the arrivals down.
+            pending = set()
+            next_send = time.perf_counter()
+            
+            try:
+                for i in range(config.total_requests):
+                    if not time_left():
+                        break
+                    
+                    # Wait for this request's scheduled arrival time
+                    scheduled_at = next_send
+                    delay = scheduled_at - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    elif -delay > BENCHMARK_LATE_THRESHOLD:
+                        counters["late"] += 1
+                    if config.request_rate > 0:
+                        if config.arrival_distribution == "poisson":
+                            next_send += random.expovariate(config.request_rate)
                         else:
-                            failed += 1
-                            logger.warning(f"Request {i+1} failed with status {response.status}")
-                
-                except Exception as e:
-                    failed += 1
-                    logger.error(f"Request {i+1} error: {e}")
-                
-                # Progress update
-                if (i + 1) % max(1, config.total_requests // 10) == 0:
-                    progress = ((i + 1) / config.total_requests) * 100
-                    await broadcast_log(f"[BENCHMARK] Progress: {progress:.0f}% ({i+1}/{config.total_requests} requests)")
+                            next_send += 1.0 / config.request_rate
+                    
+                    if config.max_in_flight and len(pending) >= config.max_in_flight:
+                        counters["dropped"] += 1
+                        continue
+                    
+                    counters["dispatched"] += 1
+                    task = asyncio.create_task(send_request(i, scheduled_at))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
                 
-                # Rate limiting
-                if config.request_rate > 0:
-                    await asyncio.sleep(1.0 / config.request_rate)
+                if pending:
+                    await asyncio.gather(*pending)
+            finally:
+                for task in list(pending):
+                    task.cancel()
+        
+        if counters["dropped"] or counters["late"]:
+            await broadcast_log(f"[BENCHMARK] Open loop: {counters['dropped']} arrivals dropped at the in-flight cap, {counters['late']} dispatched late")
         
         end_time = time.time()
         duration = end_time - start_time
+        successful = counters["successful"]
         
         # Calculate metrics
         if results:
@@ -3336,11 +6806,13 @@ async def run_benchmark(config: BenchmarkConfig, server_config: VLLMConfig):
             throughput = len(results) / duration
             avg_latency = np.mean(latencies)
             p50_latency = np.percentile(latencies, 50)
+            p90_latency = np.percentile(latencies, 90)
             p95_latency = np.percentile(latencies, 95)
             p99_latency = np.percentile(latencies, 99)
             tokens_per_second = sum(tokens) / duration
             total_tokens = sum(tokens) + (len(results) * config.prompt_tokens)
-            success_rate = (successful / config.total_requests) * 100
+            # Dropped arrivals count against the success rate
+            success_rate = (successful / max(1, counters["dispatched"] + counters["dropped"])) * 100
             
             # Debug logging
             logger.info(f"[BENCHMARK DEBUG] Total output tokens: {sum(tokens)}")
@@ -3349,20 +6821,45 @@ async def run_benchmark(config: BenchmarkConfig, server_config: VLLMConfig):
             logger.info(f"[BENCHMARK DEBUG] tokens_per_second: {tokens_per_second:.2f}")
             logger.info(f"[BENCHMARK DEBUG] total_tokens: {int(total_tokens)}")
             
+            # Streaming latency distributions (empty in non-streaming mode)
+            streaming_metrics = {}
+            if config.stream:
+                distributions = {
+                    'ttft': [r['ttft'] for r in results if r.get('ttft') is not None],
+                    'itl': [gap for r in results for gap in r.get('itl', [])],
+                    'tpot': [r['tpot'] for r in results if r.get('tpot') is not None],
+                }
+                for name, values in distributions.items():
+                    if not values:
+                        continue
+                    streaming_metrics[f'avg_{name}'] = round(float(np.mean(values)), 2)
+                    for pct in (50, 90, 95, 99):
+                        streaming_metrics[f'p{pct}_{name}'] = round(float(np.percentile(values, pct)), 2)
+            
             benchmark_results = BenchmarkResults(
                 throughput=round(throughput, 2),
                 avg_latency=round(avg_latency, 2),
                 p50_latency=round(p50_latency, 2),
+                p90_latency=round(p90_latency, 2),
                 p95_latency=round(p95_latency, 2),
                 p99_latency=round(p99_latency, 2),
                 tokens_per_second=round(tokens_per_second, 2),
                 total_tokens=int(total_tokens),
                 success_rate=round(success_rate, 2),
-                completed=True
+                dropped_requests=counters["dropped"] if config.load_mode == "open" else None,
+                late_requests=counters["late"] if config.load_mode == "open" else None,
+                completed=True,
+                **streaming_metrics
             )
             
             await broadcast_log(f"[BENCHMARK] Completed! Throughput: {throughput:.2f} req/s, Avg Latency: {avg_latency:.2f}ms")
             await broadcast_log(f"[BENCHMARK] Token Throughput: {tokens_per_second:.2f} tok/s, Total Tokens: {int(total_tokens)}")
+            if 'p50_ttft' in streaming_metrics:
+                await broadcast_log(f"[BENCHMARK] TTFT p50/p90/p99: {streaming_metrics['p50_ttft']:.1f}/{streaming_metrics['p90_ttft']:.1f}/{streaming_metrics['p99_ttft']:.1f}ms")
+            if 'p50_itl' in streaming_metrics:
+                await broadcast_log(f"[BENCHMARK] ITL p50/p90/p99: {streaming_metrics['p50_itl']:.1f}/{streaming_metrics['p90_itl']:.1f}/{streaming_metrics['p99_itl']:.1f}ms")
+            if 'p50_tpot' in streaming_metrics:
+                await broadcast_log(f"[BENCHMARK] TPOT p50/p90/p99: {streaming_metrics['p50_tpot']:.1f}/{streaming_metrics['p90_tpot']:.1f}/{streaming_metrics['p99_tpot']:.1f}ms")
         else:
             await broadcast_log(f"[BENCHMARK] Failed - No successful requests")
             benchmark_results = None
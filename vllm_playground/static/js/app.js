@@ -3,6 +3,9 @@ class VLLMWebUI {
     constructor() {
         this.ws = null;
         this.chatHistory = [];
+        // Server-side copy of the conversation: only new messages are sent each turn
+        this.chatSessionId = this.newChatSessionId();
+        this.chatSessionSynced = [];  // JSON of the messages the server holds for chatSessionId
         this.serverRunning = false;
         this.serverReady = false;  // Track if server startup is complete
         this.healthCheckStarted = false;  // Track if health check polling is active
@@ -1170,7 +1173,9 @@ number ::= [0-9]+`
 
     connectWebSocket() {
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-        const wsUrl = `${protocol}//${window.location.host}/ws/logs`;
+        // Resume from the last log line we received, so a reconnect doesn't replay duplicates
+        const since = this.lastLogSeq !== undefined ? `?since=${this.lastLogSeq}` : '';
+        const wsUrl = `${protocol}//${window.location.host}/ws/logs${since}`;
         
         this.ws = new WebSocket(wsUrl);
         
@@ -1180,9 +1185,25 @@ number ::= [0-9]+`
         };
         
         this.ws.onmessage = (event) => {
-            if (event.data) {
+            // The server batches log lines into JSON frames: {"seq": <last seq>, "lines": [...]}
+            if (!event.data) {
+                return;  // keep-alive
+            }
+            let frame;
+            try {
+                frame = JSON.parse(event.data);
+            } catch (e) {
                 this.addLog(event.data);
+                return;
+            }
+            if (frame.seq !== undefined) {
+                this.lastLogSeq = frame.seq;
             }
+            (frame.lines || []).forEach(line => {
+                if (line) {
+                    this.addLog(line);
+                }
+            });
         };
         
         this.ws.onerror = (error) => {
@@ -1493,6 +1514,9 @@ number ::= [0-9]+`
             // Show local model section, hide HF hub section
             this.elements.localModelSection.style.display = 'block';
             this.elements.hubModelSection.style.display = 'none';
+            
+            // Suggest models already on disk
+            this.loadLocalModelSuggestions();
         } else {
             this.elements.modelSourceHubLabel.classList.add('active');
             this.elements.modelSourceLocalLabel.classList.remove('active');
@@ -1509,6 +1533,28 @@ number ::= [0-9]+`
         this.updateCommandPreview();
     }
 
+    async loadLocalModelSuggestions() {
+        const datalist = document.getElementById('local-model-suggestions');
+        if (!datalist) return;
+        
+        try {
+            const response = await fetch('/api/models/local?valid=true');
+            if (!response.ok) return;
+            const data = await response.json();
+            
+            datalist.innerHTML = '';
+            data.models.forEach(model => {
+                const option = document.createElement('option');
+                option.value = model.path;
+                const details = [model.architecture, model.quantization, model.size_mb ? `${model.size_mb} MB` : null].filter(Boolean);
+                option.label = details.length ? `${model.model_id} (${details.join(', ')})` : model.model_id;
+                datalist.appendChild(option);
+            });
+        } catch (error) {
+            console.warn('Could not load local model index:', error);
+        }
+    }
+
     async validateLocalModelPath() {
         const path = this.elements.localModelPath.value.trim();
         
@@ -1656,7 +1702,7 @@ number ::= [0-9]+`
             const data = await response.json();
             
             // Create and show a simple folder browser modal
-            this.showFolderBrowserModal(data.directories, data.current_path);
+            this.showFolderBrowserModal(data.directories, data.current_path, data.next_cursor);
             
         } catch (error) {
             console.error('Backend browser error:', error);
@@ -1671,7 +1717,7 @@ number ::= [0-9]+`
         }
     }
 
-    showFolderBrowserModal(directories, currentPath) {
+    showFolderBrowserModal(directories, currentPath, nextCursor = null) {
         // Create a simple modal for browsing directories
         // This is a fallback UI when File System Access API is not available
         
@@ -1705,14 +1751,8 @@ number ::= [0-9]+`
             <div style="margin-bottom: 16px; padding: 12px; background: #0f172a; border-radius: 6px; font-family: monospace; word-break: break-all;">
                 ${currentPath}
             </div>
-            <div id="folder-list" style="margin-bottom: 16px;">
-                ${directories.map(dir => `
-                    <div class="folder-item" data-path="${dir.path}" style="padding: 8px 12px; margin: 4px 0; background: #334155; border-radius: 6px; cursor: pointer; display: flex; align-items: center; gap: 8px;">
-                        <span style="font-size: 1.2em;">📁</span>
-                        <span>${dir.name}</span>
-                    </div>
-                `).join('')}
-            </div>
+            <div id="folder-list" style="margin-bottom: 16px;"></div>
+            <button id="browser-more-btn" class="btn btn-secondary btn-sm" style="display: none; margin-bottom: 16px;">Load more</button>
             <div style="display: flex; gap: 8px; justify-content: flex-end;">
                 <button id="browser-select-btn" class="btn btn-primary">Select This Folder</button>
                 <button id="browser-cancel-btn" class="btn btn-secondary">Cancel</button>
@@ -1722,6 +1762,64 @@ number ::= [0-9]+`
         modal.appendChild(content);
         document.body.appendChild(modal);
         
+        const folderList = document.getElementById('folder-list');
+        const moreBtn = document.getElementById('browser-more-btn');
+        
+        // Navigate to subdirectory on click
+        const appendFolders = (dirs) => {
+            dirs.forEach(dir => {
+                const item = document.createElement('div');
+                item.className = 'folder-item';
+                item.style.cssText = 'padding: 8px 12px; margin: 4px 0; background: #334155; border-radius: 6px; cursor: pointer; display: flex; align-items: center; gap: 8px;';
+                item.innerHTML = '<span style="font-size: 1.2em;">📁</span><span></span>';
+                item.lastChild.textContent = dir.name;
+                item.addEventListener('click', async () => {
+                    document.body.removeChild(modal);
+                    
+                    // Fetch subdirectory contents
+                    try {
+                        const response = await fetch('/api/browse-directories', {
+                            method: 'POST',
+                            headers: { 'Content-Type': 'application/json' },
+                            body: JSON.stringify({ path: dir.path })
+                        });
+                        const data = await response.json();
+                        this.showFolderBrowserModal(data.directories, data.current_path, data.next_cursor);
+                    } catch (error) {
+                        this.showNotification('Failed to browse directory', 'error');
+                    }
+                });
+                folderList.appendChild(item);
+            });
+        };
+        
+        // Large directories are listed a page at a time
+        const updateMore = () => {
+            moreBtn.style.display = nextCursor ? '' : 'none';
+        };
+        
+        moreBtn.addEventListener('click', async () => {
+            moreBtn.disabled = true;
+            try {
+                const response = await fetch('/api/browse-directories', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ path: currentPath, cursor: nextCursor })
+                });
+                const data = await response.json();
+                appendFolders(data.directories);
+                nextCursor = data.next_cursor;
+                updateMore();
+            } catch (error) {
+                this.showNotification('Failed to browse directory', 'error');
+            } finally {
+                moreBtn.disabled = false;
+            }
+        });
+        
+        appendFolders(directories);
+        updateMore();
+        
         // Add event listeners
         document.getElementById('browser-select-btn').addEventListener('click', () => {
             this.elements.localModelPath.value = currentPath;
@@ -1732,27 +1830,6 @@ number ::= [0-9]+`
         document.getElementById('browser-cancel-btn').addEventListener('click', () => {
             document.body.removeChild(modal);
         });
-        
-        // Navigate to subdirectory on click
-        document.querySelectorAll('.folder-item').forEach(item => {
-            item.addEventListener('click', async () => {
-                const path = item.getAttribute('data-path');
-                document.body.removeChild(modal);
-                
-                // Fetch subdirectory contents
-                try {
-                    const response = await fetch('/api/browse-directories', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ path: path })
-                    });
-                    const data = await response.json();
-                    this.showFolderBrowserModal(data.directories, data.current_path);
-                } catch (error) {
-                    this.showNotification('Failed to browse directory', 'error');
-                }
-            });
-        });
     }
 
     getConfig() {
@@ -2036,8 +2113,18 @@ number ::= [0-9]+`
                 console.log('Structured outputs enabled:', structuredConfig);
             }
             
-            // Use streaming
-            const response = await fetch('/api/chat', {
+            // Send only the messages the server doesn't hold yet (it keeps the history per session).
+            // If the start of the conversation changed (e.g. a new system prompt), start the session over.
+            const serialized = messagesToSend.map(msg => JSON.stringify(msg));
+            const synced = this.chatSessionSynced;
+            const historyLength = synced.length < serialized.length && synced.every((msg, i) => msg === serialized[i])
+                ? synced.length
+                : 0;
+            requestBody.session_id = this.chatSessionId;
+            requestBody.history_length = historyLength;
+            requestBody.messages = messagesToSend.slice(historyLength);
+            
+            const postChat = () => fetch('/api/chat', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -2045,6 +2132,20 @@ number ::= [0-9]+`
                 body: JSON.stringify(requestBody)
             });
             
+            // Use streaming
+            let response = await postChat();
+            
+            if (response.status === 409) {
+                // Server lost or diverged from our history (expired, restarted) - resend all of it
+                requestBody.history_length = 0;
+                requestBody.messages = messagesToSend;
+                response = await postChat();
+            }
+            
+            if (response.ok) {
+                this.chatSessionSynced = serialized;
+            }
+            
             if (!response.ok) {
                 const errorText = await response.text();
                 throw new Error(errorText || 'Failed to send message');
@@ -2120,6 +2221,9 @@ number ::= [0-9]+`
             
             console.log('Starting to read streaming response...');
             
+            // Network chunks don't align with SSE lines - carry partial lines over
+            let sseBuffer = '';
+            
             // Track raw response data for debugging tool call failures
             let rawChunks = [];
             let toolsWereRequested = requestBody.tools && requestBody.tools.length > 0;
@@ -2133,8 +2237,9 @@ number ::= [0-9]+`
                 }
                 
                 // Decode the chunk
-                const chunk = decoder.decode(value, {stream: true});
-                const lines = chunk.split('\n');
+                sseBuffer += decoder.decode(value, {stream: true});
+                const lines = sseBuffer.split('\n');
+                sseBuffer = lines.pop();
                 
                 for (const line of lines) {
                     if (line.startsWith('data: ')) {
@@ -2505,8 +2610,20 @@ number ::= [0-9]+`
         return messageDiv;
     }
 
+    newChatSessionId() {
+        if (window.crypto?.randomUUID) {
+            return window.crypto.randomUUID();
+        }
+        return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+    }
+
     clearChat() {
         this.chatHistory = [];
+        
+        // Drop the server-side history and start a new session
+        fetch(`/api/chat/sessions/${encodeURIComponent(this.chatSessionId)}`, { method: 'DELETE' }).catch(() => {});
+        this.chatSessionId = this.newChatSessionId();
+        this.chatSessionSynced = [];
         this.elements.chatContainer.innerHTML = `
             <div class="chat-message system">
                 <div class="message-content">
@@ -3289,6 +3406,25 @@ number ::= [0-9]+`
             document.getElementById('metric-success-rate').textContent = 
                 results.success_rate !== undefined ? `${results.success_rate.toFixed(1)} %` : '-- %';
 
+            // Streaming latency metrics (only present when the benchmark streamed responses)
+            const streamingMetrics = {
+                ttft: 'Time to first token',
+                itl: 'Inter-token latency',
+                tpot: 'Time per output token'
+            };
+            Object.entries(streamingMetrics).forEach(([name, description]) => {
+                const valueEl = document.getElementById(`metric-${name}`);
+                const subtextEl = document.getElementById(`metric-${name}-subtext`);
+                const p50 = results[`p50_${name}`];
+                const p99 = results[`p99_${name}`];
+                if (valueEl) {
+                    valueEl.textContent = p50 != null ? `${p50.toFixed(2)} ms` : '-- ms';
+                }
+                if (subtextEl) {
+                    subtextEl.textContent = p99 != null ? `${description} · P99 ${p99.toFixed(2)} ms` : description;
+                }
+            });
+            
             // Animate cards
             document.querySelectorAll('.metric-card').forEach((card, index) => {
                 setTimeout(() => {
@@ -4434,7 +4570,13 @@ number ::= [0-9]+`
                 })
             });
             
-            const data = await response.json();
+            const started = await response.json();
+            
+            // The sync runs in the background; poll its job until it finishes
+            let data = started;
+            if (started.success && started.job_id) {
+                data = await this.waitForRecipesSync(started.job_id);
+            }
             
             if (data.success) {
                 // Clear cached data to force reload
@@ -4496,6 +4638,36 @@ number ::= [0-9]+`
         }
     }
     
+    async waitForRecipesSync(jobId) {
+        const progressEl = this.elements.recipesCategories?.querySelector('.recipes-loading p:last-child');
+        
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            
+            const response = await fetch(`/api/recipes/sync/status?job_id=${encodeURIComponent(jobId)}`);
+            const data = await response.json();
+            const job = data.job;
+            if (!response.ok || !job) {
+                return { success: false, error: data.error || 'Sync job not found' };
+            }
+            
+            if (job.status === 'running') {
+                if (progressEl && job.progress.total) {
+                    progressEl.textContent = `${job.progress.done} / ${job.progress.total} recipe files`;
+                }
+                continue;
+            }
+            
+            return {
+                success: job.status === 'succeeded',
+                message: job.message,
+                error: job.error,
+                catalog: job.catalog,
+                output: job.output
+            };
+        }
+    }
+    
     // ===============================================
     // RECIPE EDIT/ADD FUNCTIONALITY
     // ===============================================